@@ -0,0 +1,99 @@
+"""Composite and partial indexes for per-user listings and dashboard stats
+
+Revision ID: 002
+Revises: 001
+Create Date: 2025-02-03
+
+Listings filter by user_id (and optionally status) and page by
+(created_at DESC, id DESC); dashboard counts filter by user_id plus a fixed
+status set. The composite indexes cover the plain user_id lookups, so the
+single-column user_id indexes from 001 are dropped.
+
+Indexes are built CONCURRENTLY so the tables stay writable during the
+migration. Status columns hold enum member names.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '002'
+down_revision = '001'
+branch_labels = None
+depends_on = None
+
+
+ACTIVE_SHIPMENT_STATUSES = (
+    "'PENDING', 'PROCESSING', 'PICKED_UP', 'IN_TRANSIT', 'CUSTOMS', 'OUT_FOR_DELIVERY'"
+)
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        # Shipments
+        op.create_index(
+            'ix_shipments_user_id_created_at',
+            'shipments',
+            ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_shipments_user_id_status_created_at',
+            'shipments',
+            ['user_id', 'status', sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_shipments_user_id_active',
+            'shipments',
+            ['user_id'],
+            postgresql_where=sa.text(f"status IN ({ACTIVE_SHIPMENT_STATUSES})"),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_shipments_user_id_actual_cost',
+            'shipments',
+            ['user_id', 'actual_cost'],
+            postgresql_where=sa.text('actual_cost IS NOT NULL'),
+            postgresql_concurrently=True,
+        )
+        op.drop_index('ix_shipments_user_id', table_name='shipments', postgresql_concurrently=True)
+
+        # Quotes
+        op.create_index(
+            'ix_quotes_user_id_created_at',
+            'quotes',
+            ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_quotes_user_id_status_created_at',
+            'quotes',
+            ['user_id', 'status', sa.text('created_at DESC'), sa.text('id DESC')],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_quotes_user_id_pending',
+            'quotes',
+            ['user_id'],
+            postgresql_where=sa.text("status = 'PENDING'"),
+            postgresql_concurrently=True,
+        )
+        op.drop_index('ix_quotes_user_id', table_name='quotes', postgresql_concurrently=True)
+
+    op.execute('ANALYZE shipments')
+    op.execute('ANALYZE quotes')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_quotes_user_id', 'quotes', ['user_id'], postgresql_concurrently=True)
+        op.drop_index('ix_quotes_user_id_pending', table_name='quotes', postgresql_concurrently=True)
+        op.drop_index('ix_quotes_user_id_status_created_at', table_name='quotes', postgresql_concurrently=True)
+        op.drop_index('ix_quotes_user_id_created_at', table_name='quotes', postgresql_concurrently=True)
+
+        op.create_index('ix_shipments_user_id', 'shipments', ['user_id'], postgresql_concurrently=True)
+        op.drop_index('ix_shipments_user_id_actual_cost', table_name='shipments', postgresql_concurrently=True)
+        op.drop_index('ix_shipments_user_id_active', table_name='shipments', postgresql_concurrently=True)
+        op.drop_index('ix_shipments_user_id_status_created_at', table_name='shipments', postgresql_concurrently=True)
+        op.drop_index('ix_shipments_user_id_created_at', table_name='shipments', postgresql_concurrently=True)
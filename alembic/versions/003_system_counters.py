@@ -0,0 +1,59 @@
+"""System counters for admin statistics
+
+Revision ID: 003
+Revises: 002
+Create Date: 2025-02-10
+
+Counters are seeded from the current data; afterwards the services keep
+them up to date and the periodic reconciliation corrects any drift.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '003'
+down_revision = '002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'system_counters',
+        sa.Column('name', sa.String(100), primary_key=True),
+        sa.Column('value', sa.Numeric(18, 2), nullable=False, server_default='0'),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('NOW()')),
+    )
+
+    op.execute("""
+        INSERT INTO system_counters (name, value)
+        SELECT 'users.total', count(*) FROM users
+        UNION ALL
+        SELECT 'users.active', count(*) FILTER (WHERE is_active) FROM users
+        UNION ALL
+        SELECT 'users.created:' || to_char(created_at::date, 'YYYY-MM-DD'), count(*)
+        FROM users
+        WHERE created_at >= CURRENT_DATE - 31
+        GROUP BY created_at::date
+        UNION ALL
+        SELECT 'shipments.total', count(*) FROM shipments
+        UNION ALL
+        SELECT 'shipments.active', count(*) FILTER (
+            WHERE status IN ('PENDING', 'PROCESSING', 'IN_TRANSIT', 'CUSTOMS', 'OUT_FOR_DELIVERY')
+        ) FROM shipments
+        UNION ALL
+        SELECT 'shipments.delivered', count(*) FILTER (WHERE status = 'DELIVERED') FROM shipments
+        UNION ALL
+        SELECT 'shipments.revenue', coalesce(sum(actual_cost), 0) FROM shipments
+        UNION ALL
+        SELECT 'quotes.total', count(*) FROM quotes
+        UNION ALL
+        SELECT 'quotes.pending', count(*) FILTER (WHERE status = 'PENDING') FROM quotes
+        UNION ALL
+        SELECT 'messages.unread', count(*) FILTER (WHERE status = 'NEW') FROM contact_messages
+    """)
+
+
+def downgrade() -> None:
+    op.drop_table('system_counters')
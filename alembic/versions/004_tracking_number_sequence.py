@@ -0,0 +1,29 @@
+"""Sequence backing the tracking number generator
+
+Revision ID: 004
+Revises: 003
+Create Date: 2025-02-17
+
+Each nextval reserves a block of 1000 values that an API process turns
+into tracking numbers without further round trips. The increment must
+match TRACKING_NUMBER_BLOCK_SIZE in app/models/shipment.py.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '004'
+down_revision = '003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute(
+        'CREATE SEQUENCE tracking_number_seq '
+        'INCREMENT BY 1000 MINVALUE 0 START WITH 0'
+    )
+
+
+def downgrade() -> None:
+    op.execute('DROP SEQUENCE tracking_number_seq')
@@ -0,0 +1,51 @@
+"""Timeline index on shipment events
+
+Revision ID: 005
+Revises: 004
+Create Date: 2025-02-24
+
+Timelines read one shipment's events in (timestamp, id) order and page by
+that key. The composite index serves those reads and the plain
+shipment_id lookups, so the single-column shipment_id index from 001 is
+dropped.
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '005'
+down_revision = '004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_shipment_events_shipment_id_timestamp',
+            'shipment_events',
+            ['shipment_id', 'timestamp', 'id'],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_shipment_events_shipment_id',
+            table_name='shipment_events',
+            postgresql_concurrently=True,
+        )
+
+    op.execute('ANALYZE shipment_events')
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_shipment_events_shipment_id',
+            'shipment_events',
+            ['shipment_id'],
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            'ix_shipment_events_shipment_id_timestamp',
+            table_name='shipment_events',
+            postgresql_concurrently=True,
+        )
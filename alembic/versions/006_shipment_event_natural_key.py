@@ -0,0 +1,54 @@
+"""Natural key on shipment events
+
+Revision ID: 006
+Revises: 005
+Create Date: 2025-03-03
+
+Carrier batches are deduplicated with ON CONFLICT on
+(shipment_id, event_type, timestamp, coalesce(location, '')). Existing
+duplicates of that key are removed first, keeping the earliest-created
+row, so the unique index can be built.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '006'
+down_revision = '005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        DELETE FROM shipment_events
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY shipment_id, event_type, timestamp, coalesce(location, '')
+                    ORDER BY created_at, id
+                ) AS duplicate
+                FROM shipment_events
+            ) ranked
+            WHERE duplicate > 1
+        )
+    """)
+
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'uq_shipment_events_natural_key',
+            'shipment_events',
+            ['shipment_id', 'event_type', 'timestamp', sa.text("coalesce(location, '')")],
+            unique=True,
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'uq_shipment_events_natural_key',
+            table_name='shipment_events',
+            postgresql_concurrently=True,
+        )
@@ -0,0 +1,134 @@
+"""Partition shipment_events by month
+
+Revision ID: 007
+Revises: 006
+Create Date: 2025-03-10
+
+shipment_events becomes a RANGE (timestamp) partitioned table with one
+partition per calendar month (shipment_events_pYYYYMM) and a default
+partition for out-of-range timestamps. Partitions are created for every
+month that has data and for the next three months. After that, the API's
+partition maintenance job (or scripts/manage_partitions.py) creates them
+ahead of time and applies retention.
+
+The primary key becomes (id, timestamp), since unique constraints on a
+partitioned table must include the partition key. The single-column id
+and timestamp indexes are not recreated: the primary key and partition
+pruning cover them.
+
+The existing rows are copied in one INSERT ... SELECT while the table is
+renamed away, so run this in a maintenance window.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+# revision identifiers, used by Alembic.
+revision = '007'
+down_revision = '006'
+branch_labels = None
+depends_on = None
+
+
+PREMAKE_MONTHS = 3
+
+
+def upgrade() -> None:
+    op.rename_table('shipment_events', 'shipment_events_unpartitioned')
+
+    op.create_table(
+        'shipment_events',
+        sa.Column('id', UUID(as_uuid=True), nullable=False),
+        sa.Column('shipment_id', UUID(as_uuid=True), sa.ForeignKey('shipments.id'), nullable=False),
+        sa.Column('event_type', sa.String(100), nullable=False),
+        sa.Column('location', sa.String(255), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('NOW()')),
+        sa.PrimaryKeyConstraint('id', 'timestamp', name='pk_shipment_events'),
+        postgresql_partition_by='RANGE (timestamp)',
+    )
+    op.execute('CREATE TABLE shipment_events_default PARTITION OF shipment_events DEFAULT')
+
+    # One partition per month from the oldest event to PREMAKE_MONTHS ahead
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month date;
+        BEGIN
+            FOR month IN
+                SELECT generate_series(
+                    date_trunc('month', least(
+                        (SELECT min(timestamp) FROM shipment_events_unpartitioned),
+                        now()::timestamp
+                    )),
+                    date_trunc('month', now()) + interval '{PREMAKE_MONTHS} months',
+                    interval '1 month'
+                )::date
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF shipment_events FOR VALUES FROM (%L) TO (%L)',
+                    'shipment_events_p' || to_char(month, 'YYYYMM'),
+                    month,
+                    (month + interval '1 month')::date
+                );
+            END LOOP;
+        END
+        $$
+    """)
+
+    op.execute("""
+        INSERT INTO shipment_events (id, shipment_id, event_type, location, description, timestamp, created_at)
+        SELECT id, shipment_id, event_type, location, description, timestamp, created_at
+        FROM shipment_events_unpartitioned
+    """)
+    op.drop_table('shipment_events_unpartitioned')
+
+    # Defined on the parent, so every partition (present and future) gets them
+    op.create_index(
+        'ix_shipment_events_shipment_id_timestamp',
+        'shipment_events',
+        ['shipment_id', 'timestamp', 'id'],
+    )
+    op.create_index(
+        'uq_shipment_events_natural_key',
+        'shipment_events',
+        ['shipment_id', 'event_type', 'timestamp', sa.text("coalesce(location, '')")],
+        unique=True,
+    )
+    op.execute('ANALYZE shipment_events')
+
+
+def downgrade() -> None:
+    op.rename_table('shipment_events', 'shipment_events_partitioned')
+
+    op.create_table(
+        'shipment_events',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True),
+        sa.Column('shipment_id', UUID(as_uuid=True), sa.ForeignKey('shipments.id'), nullable=False),
+        sa.Column('event_type', sa.String(100), nullable=False),
+        sa.Column('location', sa.String(255), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('timestamp', sa.DateTime(), nullable=False, index=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('NOW()')),
+    )
+    op.execute("""
+        INSERT INTO shipment_events (id, shipment_id, event_type, location, description, timestamp, created_at)
+        SELECT id, shipment_id, event_type, location, description, timestamp, created_at
+        FROM shipment_events_partitioned
+    """)
+    op.drop_table('shipment_events_partitioned')
+
+    op.create_index('ix_shipment_events_id', 'shipment_events', ['id'])
+    op.create_index(
+        'ix_shipment_events_shipment_id_timestamp',
+        'shipment_events',
+        ['shipment_id', 'timestamp', 'id'],
+    )
+    op.create_index(
+        'uq_shipment_events_natural_key',
+        'shipment_events',
+        ['shipment_id', 'event_type', 'timestamp', sa.text("coalesce(location, '')")],
+        unique=True,
+    )
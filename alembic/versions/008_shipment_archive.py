@@ -0,0 +1,79 @@
+"""Archive tables for finished shipments
+
+Revision ID: 008
+Revises: 007
+Create Date: 2025-03-17
+
+shipments_archive and shipment_events_archive receive delivered and
+cancelled shipments (with their events) once they are old enough; see
+app/services/archive_service.py. Same columns as the hot tables, without
+foreign keys, plus archived_at on shipments.
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+# revision identifiers, used by Alembic.
+revision = '008'
+down_revision = '007'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'shipments_archive',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True),
+        sa.Column('tracking_number', sa.String(50), nullable=False),
+        sa.Column('user_id', UUID(as_uuid=True), nullable=False),
+        sa.Column('origin_city', sa.String(100), nullable=False),
+        sa.Column('origin_country', sa.String(100), nullable=False),
+        sa.Column('origin_address', sa.String(500), nullable=True),
+        sa.Column('origin_postal_code', sa.String(20), nullable=True),
+        sa.Column('destination_city', sa.String(100), nullable=False),
+        sa.Column('destination_country', sa.String(100), nullable=False),
+        sa.Column('destination_address', sa.String(500), nullable=True),
+        sa.Column('destination_postal_code', sa.String(20), nullable=True),
+        sa.Column('service_type', sa.String(50), nullable=False),
+        sa.Column('status', sa.String(50), nullable=False),
+        sa.Column('weight', sa.Numeric(10, 2), nullable=True),
+        sa.Column('dimensions', sa.JSON(), nullable=True),
+        sa.Column('package_count', sa.Numeric(10, 0), nullable=False),
+        sa.Column('estimated_cost', sa.Numeric(10, 2), nullable=True),
+        sa.Column('actual_cost', sa.Numeric(10, 2), nullable=True),
+        sa.Column('currency', sa.String(3), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.Column('estimated_delivery', sa.DateTime(), nullable=True),
+        sa.Column('actual_delivery', sa.DateTime(), nullable=True),
+        sa.Column('special_instructions', sa.String(1000), nullable=True),
+        sa.Column('insurance', sa.Boolean(), nullable=False),
+        sa.Column('signature_required', sa.Boolean(), nullable=False),
+        sa.Column('archived_at', sa.DateTime(), nullable=False, server_default=sa.text('NOW()')),
+    )
+    op.create_index(
+        'ix_shipments_archive_tracking_number', 'shipments_archive', ['tracking_number'], unique=True
+    )
+    op.create_index('ix_shipments_archive_user_id', 'shipments_archive', ['user_id'])
+
+    op.create_table(
+        'shipment_events_archive',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True),
+        sa.Column('shipment_id', UUID(as_uuid=True), nullable=False),
+        sa.Column('event_type', sa.String(100), nullable=False),
+        sa.Column('location', sa.String(255), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('timestamp', sa.DateTime(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+    )
+    op.create_index(
+        'ix_shipment_events_archive_shipment_id_timestamp',
+        'shipment_events_archive',
+        ['shipment_id', 'timestamp', 'id'],
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('shipment_events_archive')
+    op.drop_table('shipments_archive')
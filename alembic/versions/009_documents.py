@@ -0,0 +1,59 @@
+"""Content-addressed shipping documents
+
+Revision ID: 009
+Revises: 008
+Create Date: 2025-03-24
+
+documents has one row per distinct document content (SHA-256) with a
+reference count; shipment_documents attaches documents to shipments.
+Blobs live in the document storage (app/services/document_storage.py).
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects.postgresql import UUID
+
+
+# revision identifiers, used by Alembic.
+revision = '009'
+down_revision = '008'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'documents',
+        sa.Column('sha256', sa.String(64), primary_key=True),
+        sa.Column('size', sa.BigInteger(), nullable=False),
+        sa.Column('content_type', sa.String(255), nullable=True),
+        sa.Column('ref_count', sa.Integer(), nullable=False, server_default='0'),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('NOW()')),
+        sa.Column('updated_at', sa.DateTime(), nullable=False, server_default=sa.text('NOW()')),
+    )
+    op.create_index(
+        'ix_documents_unreferenced',
+        'documents',
+        ['updated_at'],
+        postgresql_where=sa.text('ref_count <= 0'),
+    )
+
+    op.create_table(
+        'shipment_documents',
+        sa.Column('id', UUID(as_uuid=True), primary_key=True),
+        sa.Column('shipment_id', UUID(as_uuid=True), nullable=False),
+        sa.Column('document_sha256', sa.String(64), sa.ForeignKey('documents.sha256'), nullable=False),
+        sa.Column('uploaded_by', UUID(as_uuid=True), sa.ForeignKey('users.id'), nullable=True),
+        sa.Column('filename', sa.String(255), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False, server_default=sa.text('NOW()')),
+    )
+    op.create_index(
+        'uq_shipment_documents_shipment_id_document',
+        'shipment_documents',
+        ['shipment_id', 'document_sha256'],
+        unique=True,
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('shipment_documents')
+    op.drop_table('documents')
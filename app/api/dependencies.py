@@ -4,13 +4,14 @@ API dependencies for authentication and authorization.
 from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from uuid import UUID
 
-from app.db.session import get_db
+from app.db.session import get_async_db, get_async_read_db
 from app.core.security import decode_token, validate_token_type
-from app.services.user_service import user_service
-from app.models.user import User
+from app.services.user_service import user_service, async_user_service
+from app.services.principal_cache import Principal
+from app.services.read_your_writes import read_your_writes
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
@@ -18,17 +19,20 @@ security = HTTPBearer()
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_async_db)
+) -> Principal:
     """
     Get current authenticated user from JWT token.
     
+    The user is resolved through the principal cache, so most requests
+    do not touch the database.
+    
     Args:
         credentials: HTTP Bearer credentials
-        db: Database session
+        db: Database session (used on cache miss)
         
     Returns:
-        User: Current authenticated user
+        Principal: Current authenticated user
         
     Raises:
         HTTPException: If token is invalid or user not found
@@ -55,8 +59,8 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Get user from database
-    user = user_service.get_by_id(db, UUID(user_id))
+    # Get user from cache, falling back to the async database session
+    user = await async_user_service.get_principal(db, UUID(user_id))
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -74,8 +78,8 @@ async def get_current_user(
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """
     Get current active user.
     
@@ -83,7 +87,7 @@ async def get_current_active_user(
         current_user: Current authenticated user
         
     Returns:
-        User: Current active user
+        Principal: Current active user
         
     Raises:
         HTTPException: If user is inactive
@@ -97,8 +101,8 @@ async def get_current_active_user(
 
 
 async def get_current_superuser(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """
     Get current superuser.
     
@@ -106,7 +110,7 @@ async def get_current_superuser(
         current_user: Current authenticated user
         
     Returns:
-        User: Current superuser
+        Principal: Current superuser
         
     Raises:
         HTTPException: If user is not a superuser
@@ -117,3 +121,28 @@ async def get_current_superuser(
             detail="Not enough permissions"
         )
     return current_user
+
+
+async def get_user_read_db(
+    current_user: Principal = Depends(get_current_user),
+    primary_db: AsyncSession = Depends(get_async_db),
+    read_db: AsyncSession = Depends(get_async_read_db)
+) -> AsyncSession:
+    """
+    Get a read-only session for the current user's own data.
+    
+    Routed to a replica, except within the read-your-writes window after
+    a write to the user's data, when the primary is used. Sessions connect
+    lazily, so the unused one costs nothing.
+    
+    Args:
+        current_user: Current authenticated user
+        primary_db: Primary database session
+        read_db: Replica-routed database session
+        
+    Returns:
+        AsyncSession: Session to read the user's data with
+    """
+    if await read_your_writes.is_recent(current_user.id):
+        return primary_db
+    return read_db
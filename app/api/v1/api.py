@@ -11,6 +11,7 @@ from app.api.v1.endpoints import (
     quotes,
     contact,
     dashboard,
+    upload,
     admin
 )
 
@@ -26,6 +27,7 @@ api_router.include_router(shipments.router, prefix="/shipments", tags=["Shipment
 api_router.include_router(shipment_events.router, prefix="/events", tags=["Shipment Events"])
 api_router.include_router(quotes.router, prefix="/quotes", tags=["Quotes"])
 api_router.include_router(dashboard.router, prefix="/dashboard", tags=["Dashboard"])
+api_router.include_router(upload.router, prefix="/upload", tags=["Uploads"])
 
 # Admin endpoints
 api_router.include_router(admin.router, prefix="/admin", tags=["Admin"])
@@ -1,18 +1,18 @@
 """
 Admin-only endpoints for system management.
 """
-from fastapi import APIRouter, Depends, Query, HTTPException, status
+from fastapi import APIRouter, Depends, Query, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
-from typing import List
-from datetime import datetime, timedelta
+from sqlalchemy import select
+from typing import List, Optional
+from datetime import datetime
 
-from app.db.session import get_db
+from app.db.session import get_db, get_read_db
 from app.api.dependencies import get_current_superuser
-from app.models.user import User
+from app.services.principal_cache import Principal
 from app.models.shipment import Shipment, ShipmentStatus
 from app.models.quote import Quote, QuoteStatus
-from app.models.contact_message import ContactMessage
 from app.schemas.user import UserResponse
 from app.schemas.shipment import ShipmentResponse, ShipmentUpdate
 from app.schemas.quote import QuoteResponse, QuoteUpdate
@@ -21,108 +21,114 @@ from app.services.user_service import user_service
 from app.services.shipment_service import shipment_service
 from app.services.quote_service import quote_service
 from app.services.contact_message_service import contact_message_service
+from app.services.stats_service import stats_service
+from app.services.export_service import EXPORT_MEDIA_TYPES, ExportFormat, shipment_export_service
+from app.utils.fieldsets import fieldset_list_adapter, json_response, parse_fields
+from app.utils.pagination import CountMode, paginate, split_page
 
 router = APIRouter()
 
 
 @router.get("/stats")
 def get_system_stats(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_superuser)
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_superuser)
 ):
-    """Get system statistics (admin only)."""
-    
-    # User stats
-    total_users = db.query(func.count(User.id)).scalar()
-    active_users = db.query(func.count(User.id)).filter(User.is_active == True).scalar()
-    new_users_30d = db.query(func.count(User.id)).filter(
-        User.created_at >= datetime.utcnow() - timedelta(days=30)
-    ).scalar()
-    
-    # Shipment stats
-    total_shipments = db.query(func.count(Shipment.id)).scalar()
-    active_shipments = db.query(func.count(Shipment.id)).filter(
-        Shipment.status.in_([
-            ShipmentStatus.PENDING,
-            ShipmentStatus.PROCESSING,
-            ShipmentStatus.IN_TRANSIT,
-            ShipmentStatus.CUSTOMS,
-            ShipmentStatus.OUT_FOR_DELIVERY
-        ])
-    ).scalar()
-    delivered_shipments = db.query(func.count(Shipment.id)).filter(
-        Shipment.status == ShipmentStatus.DELIVERED
-    ).scalar()
-    
-    # Quote stats
-    total_quotes = db.query(func.count(Quote.id)).scalar()
-    pending_quotes = db.query(func.count(Quote.id)).filter(
-        Quote.status == QuoteStatus.PENDING
-    ).scalar()
+    """
+    Get system statistics (admin only).
     
-    # Contact message stats
-    unread_messages = db.query(func.count(ContactMessage.id)).filter(
-        ContactMessage.status == "new"
-    ).scalar()
-    
-    # Revenue (sum of actual costs)
-    total_revenue = db.query(func.sum(Shipment.actual_cost)).filter(
-        Shipment.actual_cost.isnot(None)
-    ).scalar() or 0
-    
-    return {
-        "users": {
-            "total": total_users,
-            "active": active_users,
-            "new_last_30_days": new_users_30d
-        },
-        "shipments": {
-            "total": total_shipments,
-            "active": active_shipments,
-            "delivered": delivered_shipments
-        },
-        "quotes": {
-            "total": total_quotes,
-            "pending": pending_quotes
-        },
-        "messages": {
-            "unread": unread_messages
-        },
-        "revenue": {
-            "total": float(total_revenue),
-            "currency": "USD"
-        }
-    }
+    Read from incrementally maintained counters, not table scans.
+    """
+    return stats_service.get_system_stats(db)
 
 
 @router.get("/users", response_model=List[UserResponse])
 def get_all_users(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_superuser)
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_superuser)
 ):
     """Get all users (admin only)."""
     users = user_service.get_multi(db, skip=skip, limit=limit)
     return users
 
 
+@router.put("/users/{user_id}/deactivate", response_model=UserResponse)
+def deactivate_user(
+    user_id: str,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_superuser)
+):
+    """Deactivate a user account (admin only)."""
+    from uuid import UUID
+    
+    user = user_service.deactivate(db, UUID(user_id))
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    return user
+
+
 @router.get("/shipments", response_model=List[ShipmentResponse])
 def get_all_shipments(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
     status: ShipmentStatus = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_superuser)
+    cursor: Optional[str] = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return per shipment"),
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_superuser)
 ):
-    """Get all shipments (admin only)."""
-    query = db.query(Shipment)
+    """
+    Get all shipments (admin only).
+    
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    fields limits each shipment to those fields, and only their columns
+    are read.
+    """
+    fieldset = parse_fields(fields, ShipmentResponse)
+    stmt = select(Shipment)
     
     if status:
-        query = query.filter(Shipment.status == status)
+        stmt = stmt.where(Shipment.status == status)
     
-    shipments = query.order_by(desc(Shipment.created_at)).offset(skip).limit(limit).all()
-    return shipments
+    rows = db.scalars(paginate(stmt, Shipment, skip, limit, cursor, fieldset)).all()
+    shipments, next_cursor = split_page(rows, limit)
+    if fieldset:
+        adapter = fieldset_list_adapter(ShipmentResponse, fieldset)
+        response = json_response(adapter.dump_json(adapter.validate_python(shipments)))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return response if fieldset else shipments
+
+
+@router.get("/shipments/export")
+def export_shipments(
+    format: ExportFormat = ExportFormat.CSV,
+    status: ShipmentStatus = None,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to export"),
+    current_user: Principal = Depends(get_current_superuser)
+):
+    """
+    Export all shipments as CSV or NDJSON (admin only).
+    
+    Takes the same filters as the shipment listing. The file is streamed
+    from a read replica as it is read, so exports of any size run in
+    constant memory.
+    """
+    fieldset = parse_fields(fields, ShipmentResponse)
+    filename = f"shipments-{datetime.utcnow():%Y%m%d-%H%M%S}.{format.value}"
+    
+    return StreamingResponse(
+        shipment_export_service.stream(format, status, fieldset),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
 
 
 @router.put("/shipments/{shipment_id}/status", response_model=ShipmentResponse)
@@ -130,7 +136,7 @@ def update_shipment_status_admin(
     shipment_id: str,
     shipment_update: ShipmentUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_superuser)
+    current_user: Principal = Depends(get_current_superuser)
 ):
     """Update shipment status (admin only)."""
     from uuid import UUID
@@ -147,19 +153,28 @@ def update_shipment_status_admin(
 
 @router.get("/quotes", response_model=List[QuoteResponse])
 def get_all_quotes(
+    response: Response,
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
     status: QuoteStatus = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_superuser)
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_superuser)
 ):
-    """Get all quotes (admin only)."""
-    query = db.query(Quote)
+    """
+    Get all quotes (admin only).
+    
+    The cursor for the next page is returned in the X-Next-Cursor header.
+    """
+    stmt = select(Quote)
     
     if status:
-        query = query.filter(Quote.status == status)
+        stmt = stmt.where(Quote.status == status)
     
-    quotes = query.order_by(desc(Quote.created_at)).offset(skip).limit(limit).all()
+    rows = db.scalars(paginate(stmt, Quote, skip, limit, cursor)).all()
+    quotes, next_cursor = split_page(rows, limit)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return quotes
 
 
@@ -168,7 +183,7 @@ def update_quote_admin(
     quote_id: str,
     quote_update: QuoteUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_superuser)
+    current_user: Principal = Depends(get_current_superuser)
 ):
     """Update quote (admin only)."""
     from uuid import UUID
@@ -187,9 +202,10 @@ def update_quote_admin(
 def get_all_messages(
     skip: int = Query(0, ge=0),
     limit: int = Query(100, ge=1, le=500),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_superuser)
+    db: Session = Depends(get_read_db),
+    current_user: Principal = Depends(get_current_superuser)
 ):
     """Get all contact messages (admin only)."""
-    messages, _ = contact_message_service.get_all(db, skip=skip, limit=limit)
-    return messages
+    return contact_message_service.get_all(
+        db, skip=skip, limit=limit, count=CountMode.NONE
+    ).items
@@ -10,7 +10,7 @@ from app.schemas.user import UserCreate, UserLogin, UserResponse, Token
 from app.services.user_service import user_service
 from app.core.security import create_access_token, create_refresh_token
 from app.api.dependencies import get_current_user
-from app.models.user import User
+from app.services.principal_cache import Principal
 
 router = APIRouter()
 
@@ -77,7 +77,7 @@ def login(
 
 @router.get("/me", response_model=UserResponse)
 def get_current_user_info(
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get current user information.
@@ -87,7 +87,7 @@ def get_current_user_info(
 
 @router.post("/logout")
 def logout(
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Logout user (client should discard tokens).
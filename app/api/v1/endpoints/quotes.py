@@ -3,6 +3,7 @@ Quote management API endpoints.
 """
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 from uuid import UUID
 from math import ceil
@@ -15,9 +16,10 @@ from app.schemas.quote import (
     QuoteListResponse
 )
 from app.models.quote import QuoteStatus
-from app.services.quote_service import quote_service
-from app.api.dependencies import get_current_user
-from app.models.user import User
+from app.services.quote_service import quote_service, async_quote_service
+from app.api.dependencies import get_current_user, get_user_read_db
+from app.utils.pagination import CountMode
+from app.services.principal_cache import Principal
 
 router = APIRouter()
 
@@ -26,7 +28,7 @@ router = APIRouter()
 def create_quote(
     quote_in: QuoteCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Create a new quote request.
@@ -36,25 +38,34 @@ def create_quote(
 
 
 @router.get("/", response_model=QuoteListResponse)
-def read_quotes(
+async def read_quotes(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     status: Optional[QuoteStatus] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = None,
+    count: CountMode = CountMode.EXACT,
+    db: AsyncSession = Depends(get_user_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get current user's quotes with pagination.
+    
+    Pass the returned next_cursor as cursor to fetch the following page;
+    skip is still accepted for backward compatibility. count picks how the
+    total is computed (exact, estimated, cached or none); with none, total
+    and pages are null.
     """
-    quotes, total = quote_service.get_user_quotes(
+    quotes, total, next_cursor = await async_quote_service.get_user_quotes(
         db,
         current_user.id,
         skip=skip,
         limit=limit,
-        status=status
+        status=status,
+        cursor=cursor,
+        count=count
     )
     
-    pages = ceil(total / limit) if limit > 0 else 0
+    pages = ceil(total / limit) if total is not None else None
     page = (skip // limit) + 1 if limit > 0 else 1
     
     return {
@@ -62,20 +73,21 @@ def read_quotes(
         "total": total,
         "page": page,
         "page_size": limit,
-        "pages": pages
+        "pages": pages,
+        "next_cursor": next_cursor
     }
 
 
 @router.get("/{quote_id}", response_model=QuoteResponse)
-def read_quote(
+async def read_quote(
     quote_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_user_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get quote by ID.
     """
-    quote = quote_service.get_by_id(db, quote_id)
+    quote = await async_quote_service.get_by_id(db, quote_id)
     if not quote:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -97,7 +109,7 @@ def update_quote(
     quote_id: UUID,
     quote_in: QuoteUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Update quote (admin only in production).
@@ -1,34 +1,39 @@
 """
 Shipment event/timeline API endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from uuid import UUID
 
-from app.db.session import get_db
+from app.db.session import get_db, get_async_read_db
 from app.schemas.shipment_event import (
     ShipmentEventCreate,
-    ShipmentTimelineResponse
+    ShipmentEventResponse,
+    ShipmentTimelineResponse,
+    CarrierEventBatch,
+    CarrierEventBatchResponse
 )
-from app.services.shipment_service import shipment_service
-from app.services.shipment_event_service import shipment_event_service
-from app.api.dependencies import get_current_user
-from app.models.user import User
+from app.services.shipment_service import shipment_service, async_shipment_service
+from app.services.shipment_event_service import shipment_event_service, async_shipment_event_service
+from app.api.dependencies import get_current_user, get_current_superuser, get_user_read_db
+from app.services.principal_cache import Principal
 
 router = APIRouter()
 
 
-@router.post("/", status_code=status.HTTP_201_CREATED)
+@router.post("/", response_model=ShipmentEventResponse, status_code=status.HTTP_201_CREATED)
 def create_shipment_event(
     event_in: ShipmentEventCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Create a new shipment event.
     """
     # Verify shipment exists and user owns it
-    shipment = shipment_service.get_by_id(db, event_in.shipment_id)
+    shipment = shipment_service.get_snapshot(db, event_in.shipment_id)
     if not shipment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -45,17 +50,38 @@ def create_shipment_event(
     return event
 
 
+@router.post("/batch", response_model=CarrierEventBatchResponse)
+def ingest_carrier_events(
+    batch_in: CarrierEventBatch,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_superuser)
+):
+    """
+    Ingest a batch of carrier scan events keyed by tracking number.
+    
+    Events already recorded (same shipment, type, timestamp and location)
+    are skipped, events dated over a week before their shipment was
+    created are rejected, and shipment statuses only move forward.
+    Integration accounts only.
+    """
+    return shipment_event_service.ingest_batch(db, batch_in.events)
+
+
 @router.get("/{shipment_id}/timeline", response_model=ShipmentTimelineResponse)
-def get_shipment_timeline(
+async def get_shipment_timeline(
     shipment_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_user_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
-    Get shipment timeline/events.
+    Get shipment timeline/events, oldest first.
+    
+    Pass the returned next_cursor as cursor to fetch the following page.
     """
     # Verify shipment exists and user owns it
-    shipment = shipment_service.get_by_id(db, shipment_id)
+    shipment = await async_shipment_service.get_snapshot(db, shipment_id)
     if not shipment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -68,32 +94,42 @@ def get_shipment_timeline(
             detail="Not enough permissions"
         )
     
-    events = shipment_event_service.get_shipment_timeline(db, shipment_id)
+    events, _, next_cursor = await async_shipment_event_service.get_shipment_timeline(
+        db, shipment_id, limit=limit, cursor=cursor, shipment_created_at=shipment.created_at
+    )
     
     return {
         "tracking_number": shipment.tracking_number,
-        "events": events
+        "events": events,
+        "next_cursor": next_cursor
     }
 
 
 @router.get("/track/{tracking_number}/timeline", response_model=ShipmentTimelineResponse)
-def track_shipment_timeline(
+async def track_shipment_timeline(
     tracking_number: str,
-    db: Session = Depends(get_db)
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Public endpoint to get shipment timeline by tracking number.
+    
+    Pass the returned next_cursor as cursor to fetch the following page.
     """
-    shipment = shipment_service.get_by_tracking_number(db, tracking_number)
+    shipment = await async_shipment_service.get_by_tracking_number(db, tracking_number)
     if not shipment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Shipment not found"
         )
     
-    events = shipment_event_service.get_shipment_timeline(db, shipment.id)
+    events, _, next_cursor = await async_shipment_event_service.get_shipment_timeline(
+        db, shipment.id, limit=limit, cursor=cursor, shipment_created_at=shipment.created_at
+    )
     
     return {
         "tracking_number": shipment.tracking_number,
-        "events": events
+        "events": events,
+        "next_cursor": next_cursor
     }
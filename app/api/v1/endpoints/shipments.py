@@ -1,23 +1,36 @@
 """
 Shipment management API endpoints.
 """
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, File, HTTPException, status, Query, Request, UploadFile
+from fastapi.responses import RedirectResponse
 from sqlalchemy.orm import Session
-from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import List, Optional
 from uuid import UUID
 from math import ceil
+import uuid
 
-from app.db.session import get_db
+from app.db.session import get_db, get_async_read_db
 from app.schemas.shipment import (
     ShipmentCreate,
     ShipmentUpdate,
     ShipmentResponse,
-    ShipmentListResponse
+    ShipmentListResponse,
+    ShipmentBulkCreate,
+    ShipmentBulkResponse,
+    ShipmentImportJob,
+    ShipmentDocumentResponse
 )
 from app.models.shipment import ShipmentStatus
-from app.services.shipment_service import shipment_service
-from app.api.dependencies import get_current_user
-from app.models.user import User
+from app.services.shipment_service import shipment_service, async_shipment_service
+from app.services.shipment_import_service import shipment_import_service
+from app.services.document_service import document_service
+from app.utils.background_tasks import import_shipments_task
+from app.api.dependencies import get_current_user, get_user_read_db
+from app.utils.downloads import etag_matches, file_download_response, not_modified_response
+from app.utils.fieldsets import fieldset_page_model, json_response, parse_fields
+from app.utils.pagination import CountMode
+from app.services.principal_cache import Principal
 
 router = APIRouter()
 
@@ -26,7 +39,7 @@ router = APIRouter()
 def create_shipment(
     shipment_in: ShipmentCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Create a new shipment.
@@ -35,47 +48,125 @@ def create_shipment(
     return shipment
 
 
+@router.post("/bulk", response_model=ShipmentBulkResponse)
+def create_shipments_bulk(
+    bulk_in: ShipmentBulkCreate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Create many shipments at once.
+    
+    Each row is validated independently: valid rows are created, invalid
+    ones are reported in errors by their index in the request.
+    """
+    return shipment_service.create_bulk(db, current_user.id, bulk_in.shipments)
+
+
+@router.post("/import", response_model=ShipmentImportJob, status_code=status.HTTP_202_ACCEPTED)
+async def import_shipments(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Import shipments from a CSV file.
+    
+    The header row names ShipmentCreate fields (dimensions as a JSON
+    object). The import runs in the background: poll
+    GET /shipments/import/{job_id} for progress and rejected rows.
+    """
+    if not file.filename or not file.filename.lower().endswith(".csv"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="File type not allowed. Allowed: csv"
+        )
+    
+    job_id = uuid.uuid4()
+    path = await shipment_import_service.stage_upload(file, job_id)
+    job = await shipment_import_service.acreate_job(job_id, current_user.id, file.filename)
+    background_tasks.add_task(import_shipments_task, job["job_id"], current_user.id, path)
+    return job
+
+
+@router.get("/import/{job_id}", response_model=ShipmentImportJob)
+async def read_shipment_import(
+    job_id: UUID,
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Get the progress of a CSV shipment import.
+    """
+    job = await shipment_import_service.aget_job(job_id)
+    if not job or job["user_id"] != str(current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Import job not found"
+        )
+    
+    return job
+
+
 @router.get("/", response_model=ShipmentListResponse)
-def read_shipments(
+async def read_shipments(
     skip: int = Query(0, ge=0),
     limit: int = Query(10, ge=1, le=100),
     status: Optional[ShipmentStatus] = None,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    cursor: Optional[str] = None,
+    count: CountMode = CountMode.EXACT,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return per shipment"),
+    db: AsyncSession = Depends(get_user_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get current user's shipments with pagination.
+    
+    Pass the returned next_cursor as cursor to fetch the following page;
+    skip is still accepted for backward compatibility. count picks how the
+    total is computed (exact, estimated, cached or none); with none, total
+    and pages are null. fields (e.g. tracking_number,status,estimated_delivery)
+    limits each item to those fields, and only their columns are read.
     """
-    shipments, total = shipment_service.get_user_shipments(
+    fieldset = parse_fields(fields, ShipmentResponse)
+    
+    shipments, total, next_cursor = await async_shipment_service.get_user_shipments(
         db,
         current_user.id,
         skip=skip,
         limit=limit,
-        status=status
+        status=status,
+        cursor=cursor,
+        count=count,
+        fields=fieldset
     )
     
-    pages = ceil(total / limit) if limit > 0 else 0
+    pages = ceil(total / limit) if total is not None else None
     page = (skip // limit) + 1 if limit > 0 else 1
     
-    return {
+    result = {
         "items": shipments,
         "total": total,
         "page": page,
         "page_size": limit,
-        "pages": pages
+        "pages": pages,
+        "next_cursor": next_cursor
     }
+    if fieldset:
+        model = fieldset_page_model(ShipmentListResponse, ShipmentResponse, fieldset)
+        return json_response(model.model_validate(result).model_dump_json())
+    return result
 
 
 @router.get("/{shipment_id}", response_model=ShipmentResponse)
-def read_shipment(
+async def read_shipment(
     shipment_id: UUID,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_user_read_db),
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get shipment by ID.
     """
-    shipment = shipment_service.get_by_id(db, shipment_id)
+    shipment = await async_shipment_service.get_snapshot(db, shipment_id)
     if not shipment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -97,12 +188,12 @@ def update_shipment(
     shipment_id: UUID,
     shipment_in: ShipmentUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Update shipment.
     """
-    shipment = shipment_service.get_by_id(db, shipment_id)
+    shipment = shipment_service.get_snapshot(db, shipment_id)
     if not shipment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -120,15 +211,137 @@ def update_shipment(
     return updated_shipment
 
 
+@router.get("/{shipment_id}/documents", response_model=List[ShipmentDocumentResponse])
+def read_shipment_documents(
+    shipment_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Get the documents attached to a shipment (upload them with
+    POST /upload/document).
+    """
+    shipment = shipment_service.get_snapshot(db, shipment_id)
+    if not shipment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Shipment not found"
+        )
+    
+    # Check ownership
+    if shipment.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    return document_service.get_shipment_documents(db, shipment_id)
+
+
+@router.api_route("/{shipment_id}/documents/{document_id}/content", methods=["GET", "HEAD"])
+def download_shipment_document(
+    shipment_id: UUID,
+    document_id: UUID,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Download a document attached to a shipment.
+
+    The ETag is the content's SHA-256, so If-None-Match answers 304 for a
+    copy the client already has, and Range requests resume interrupted
+    downloads (206). With the S3 backend the client is redirected to a
+    short-lived presigned URL.
+    """
+    shipment = shipment_service.get_snapshot(db, shipment_id)
+    if not shipment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Shipment not found"
+        )
+    
+    # Check ownership
+    if shipment.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    attachment = document_service.get_attachment(db, shipment_id, document_id)
+    if not attachment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+    
+    document = attachment.document
+    etag = f'"{document.sha256}"'
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return not_modified_response(etag)
+    
+    storage = document_service.storage
+    path = storage.local_path(document.sha256)
+    if path is None:
+        url = storage.download_url(document.sha256, attachment.filename, document.content_type)
+        return RedirectResponse(url, status_code=status.HTTP_307_TEMPORARY_REDIRECT)
+    
+    if not path.is_file():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document content not found"
+        )
+    
+    return file_download_response(
+        request,
+        path,
+        document.size,
+        etag,
+        attachment.filename,
+        document.content_type
+    )
+
+
+@router.delete("/{shipment_id}/documents/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_shipment_document(
+    shipment_id: UUID,
+    document_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    """
+    Remove a document from a shipment.
+    """
+    shipment = shipment_service.get_snapshot(db, shipment_id)
+    if not shipment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Shipment not found"
+        )
+    
+    # Check ownership
+    if shipment.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+    
+    if not document_service.detach(db, shipment_id, document_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Document not found"
+        )
+
+
 @router.get("/track/{tracking_number}", response_model=ShipmentResponse)
-def track_shipment(
+async def track_shipment(
     tracking_number: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ):
     """
     Public endpoint to track shipment by tracking number.
     """
-    shipment = shipment_service.get_by_tracking_number(db, tracking_number)
+    shipment = await async_shipment_service.get_by_tracking_number(db, tracking_number)
     if not shipment:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -1,54 +1,67 @@
 """
 File upload endpoints for shipping documents.
 """
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status
-from typing import List
-import uuid
-import os
-from pathlib import Path
+from fastapi import APIRouter, UploadFile, File, Form, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from uuid import UUID
 
 from app.core.config import settings
+from app.db.session import get_db
 from app.api.dependencies import get_current_user
-from app.models.user import User
+from app.services.principal_cache import Principal
+from app.schemas.shipment import ShipmentDocumentResponse
+from app.services.document_service import document_service
+from app.services.shipment_service import shipment_service
+from app.utils.uploads import save_upload
 
 router = APIRouter()
 
-UPLOAD_DIR = Path("/tmp/globalship_uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
 
-
-@router.post("/document")
+@router.post("/document", response_model=ShipmentDocumentResponse, status_code=status.HTTP_201_CREATED)
 async def upload_document(
+    shipment_id: UUID = Form(...),
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
 ):
-    """Upload shipping document."""
-    # Validate file size
-    contents = await file.read()
-    if len(contents) > settings.MAX_UPLOAD_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File too large. Max size: {settings.MAX_UPLOAD_SIZE} bytes"
-        )
-    
-    # Validate file extension
-    file_ext = file.filename.split('.')[-1].lower()
+    """
+    Upload a shipping document and attach it to a shipment.
+
+    The file is streamed to disk in chunks and hashed on the way; uploads
+    over MAX_UPLOAD_SIZE are rejected with 413 as soon as the limit is
+    crossed. Content that is already stored is not stored again.
+    """
+    # Validate file extension before reading anything
+    file_ext = (file.filename or "").split('.')[-1].lower()
     if file_ext not in settings.ALLOWED_EXTENSIONS:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"File type not allowed. Allowed: {settings.ALLOWED_EXTENSIONS}"
         )
-    
-    # Save file
-    file_id = str(uuid.uuid4())
-    file_path = UPLOAD_DIR / f"{file_id}.{file_ext}"
-    
-    with open(file_path, "wb") as f:
-        f.write(contents)
-    
-    return {
-        "file_id": file_id,
-        "filename": file.filename,
-        "size": len(contents),
-        "path": str(file_path)
-    }
+
+    # Verify shipment exists and user owns it
+    shipment = await run_in_threadpool(shipment_service.get_snapshot, db, shipment_id)
+    if not shipment:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Shipment not found"
+        )
+
+    if shipment.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions"
+        )
+
+    stored = await save_upload(file, document_service.staging_path(), settings.MAX_UPLOAD_SIZE)
+
+    return await run_in_threadpool(
+        document_service.attach,
+        db,
+        shipment_id,
+        current_user.id,
+        stored,
+        file.filename[:255],
+        file.content_type
+    )
@@ -9,14 +9,14 @@ from app.db.session import get_db
 from app.schemas.user import UserUpdate, UserResponse
 from app.services.user_service import user_service
 from app.api.dependencies import get_current_user, get_current_superuser
-from app.models.user import User
+from app.services.principal_cache import Principal
 
 router = APIRouter()
 
 
 @router.get("/me", response_model=UserResponse)
 def read_user_me(
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Get current user.
@@ -28,7 +28,7 @@ def read_user_me(
 def update_user_me(
     user_in: UserUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """
     Update current user.
@@ -47,7 +47,7 @@ def read_users(
     skip: int = 0,
     limit: int = 100,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_superuser)
+    current_user: Principal = Depends(get_current_superuser)
 ):
     """
     Get all users (superuser only).
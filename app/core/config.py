@@ -25,16 +25,86 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    # Key for the tracking number permutation; required outside testing.
+    # Must be the same on every instance and never change once numbers
+    # have been issued.
+    TRACKING_NUMBER_KEY: Optional[str] = None
     
     # Database
     DATABASE_URL: str
+    ASYNC_DATABASE_URL: Optional[str] = None  # defaults to DATABASE_URL with asyncpg
     DB_POOL_SIZE: int = 10
     DB_MAX_OVERFLOW: int = 20
     
+    # Read replicas: read-only dependencies are routed here, weighted
+    # (equal weights when DATABASE_REPLICA_WEIGHTS is empty)
+    DATABASE_REPLICA_URLS: List[str] = []
+    DATABASE_REPLICA_WEIGHTS: List[float] = []
+    # After a user's write, their reads go to the primary for this long;
+    # keep it above the worst expected replica lag
+    READ_YOUR_WRITES_SECONDS: int = 5
+    
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
     REDIS_PASSWORD: Optional[str] = None
     REDIS_MAX_CONNECTIONS: int = 10
+    REDIS_ASYNC_MAX_CONNECTIONS: int = 50
+    REDIS_SOCKET_TIMEOUT: float = 0.5
+    REDIS_CIRCUIT_FAILURE_THRESHOLD: int = 5
+    REDIS_CIRCUIT_RECOVERY_SECONDS: float = 5.0
+    
+    # Principal cache (authenticated user lookups)
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 30
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = 10000
+    PRINCIPAL_CACHE_REDIS_TTL_SECONDS: int = 300
+    
+    # Read model caches
+    SHIPMENT_CACHE_TTL_SECONDS: int = 300
+    LISTING_COUNT_CACHE_TTL_SECONDS: int = 300
+    DASHBOARD_CACHE_TTL_SECONDS: int = 60
+    TIMELINE_CACHE_TTL_SECONDS: int = 300
+    # Longer timelines are paged from the database only
+    TIMELINE_CACHE_MAX_EVENTS: int = 500
+    
+    # Admin system stats reconciliation (0 disables the periodic job)
+    STATS_RECONCILE_INTERVAL_SECONDS: int = 3600
+    
+    # Bulk shipment creation
+    BULK_SHIPMENT_MAX_ROWS: int = 5000
+    
+    # Batch carrier event ingestion
+    EVENT_BATCH_MAX_EVENTS: int = 5000
+    
+    # shipment_events month partitions: created this many months ahead;
+    # older than EVENT_RETENTION_MONTHS are detached (dropped with
+    # EVENT_RETENTION_DROP; 0 months keeps everything). The maintenance
+    # job runs every PARTITION_MAINTENANCE_INTERVAL_SECONDS (0 disables).
+    EVENT_PARTITION_PREMAKE_MONTHS: int = 3
+    EVENT_RETENTION_MONTHS: int = 24
+    EVENT_RETENTION_DROP: bool = False
+    PARTITION_MAINTENANCE_INTERVAL_SECONDS: int = 86400
+    
+    # CSV shipment import: upload size limit, rows validated and copied per
+    # transaction, rejected rows reported, and how long job progress is kept.
+    # Jobs without a heartbeat for SHIPMENT_IMPORT_STALE_SECONDS count as
+    # interrupted; their staged files are deleted every
+    # SHIPMENT_IMPORT_CLEANUP_INTERVAL_SECONDS (0 disables).
+    SHIPMENT_IMPORT_MAX_BYTES: int = 52428800
+    SHIPMENT_IMPORT_CHUNK_ROWS: int = 1000
+    SHIPMENT_IMPORT_MAX_ERRORS: int = 1000
+    SHIPMENT_IMPORT_JOB_TTL_SECONDS: int = 86400
+    SHIPMENT_IMPORT_STALE_SECONDS: int = 900
+    SHIPMENT_IMPORT_CLEANUP_INTERVAL_SECONDS: int = 3600
+    
+    # Rows fetched per server-side cursor batch by the admin shipment export
+    EXPORT_YIELD_PER_ROWS: int = 2000
+    
+    # Shipments delivered or cancelled more than ARCHIVE_AFTER_DAYS ago move
+    # to the archive tables, ARCHIVE_BATCH_SIZE per transaction. The archive
+    # job runs every ARCHIVE_INTERVAL_SECONDS (0 disables).
+    ARCHIVE_AFTER_DAYS: int = 180
+    ARCHIVE_BATCH_SIZE: int = 1000
+    ARCHIVE_INTERVAL_SECONDS: int = 86400
     
     # CORS
     BACKEND_CORS_ORIGINS: List[str] = [
@@ -43,6 +113,22 @@ class Settings(BaseSettings):
         "http://localhost:8080"
     ]
     
+    @validator("TRACKING_NUMBER_KEY", always=True)
+    def require_tracking_number_key(cls, v, values):
+        """Require a tracking number key, except in tests where any key will do."""
+        if v:
+            return v
+        if values.get("ENVIRONMENT") == "testing":
+            return secrets.token_urlsafe(32)
+        raise ValueError("TRACKING_NUMBER_KEY must be set")
+    
+    @validator("DATABASE_REPLICA_WEIGHTS")
+    def check_replica_weights(cls, v, values):
+        """Require one weight per replica URL when weights are given."""
+        if v and len(v) != len(values.get("DATABASE_REPLICA_URLS", [])):
+            raise ValueError("DATABASE_REPLICA_WEIGHTS needs one weight per replica URL")
+        return v
+    
     @validator("BACKEND_CORS_ORIGINS", pre=True)
     def assemble_cors_origins(cls, v):
         """Parse CORS origins from string or list."""
@@ -65,6 +151,23 @@ class Settings(BaseSettings):
     
     # File Upload
     MAX_UPLOAD_SIZE: int = 10485760
+    # Requests declaring a larger body are rejected before it is read
+    MAX_REQUEST_BODY_SIZE: int = 67108864
+    
+    # Content-addressed document storage: "local" (DOCUMENT_STORAGE_PATH)
+    # or "s3" (any S3-compatible endpoint; needs boto3). Unreferenced
+    # documents are deleted after DOCUMENT_GC_GRACE_SECONDS by a job that
+    # runs every DOCUMENT_GC_INTERVAL_SECONDS (0 disables).
+    DOCUMENT_STORAGE_BACKEND: str = "local"
+    DOCUMENT_STORAGE_PATH: str = "/tmp/globalship_uploads"
+    DOCUMENT_S3_BUCKET: Optional[str] = None
+    DOCUMENT_S3_PREFIX: str = "documents/"
+    DOCUMENT_S3_ENDPOINT_URL: Optional[str] = None
+    DOCUMENT_S3_REGION: Optional[str] = None
+    DOCUMENT_GC_GRACE_SECONDS: int = 86400
+    DOCUMENT_GC_INTERVAL_SECONDS: int = 3600
+    # Lifetime of presigned S3 download URLs
+    DOCUMENT_URL_EXPIRE_SECONDS: int = 300
     ALLOWED_EXTENSIONS: List[str] = ["pdf", "jpg", "jpeg", "png", "doc", "docx"]
     
     # Logging
@@ -1,13 +1,29 @@
 """
 Database session management with SQLAlchemy.
 SQLAlchemy ORM automatically prevents SQL injection through parameterized queries.
+
+Writes always go to the primary (get_db, get_async_db). Read-only
+dependencies (get_read_db, get_async_read_db) use a RoutingSession that
+sends SELECTs to a weighted-random read replica and anything else to the
+primary. Without configured replicas they behave like the primary ones.
 """
-from sqlalchemy import create_engine
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
 from sqlalchemy.pool import QueuePool
-from typing import Generator
+from typing import AsyncGenerator, Generator, List, Optional, TypeVar
+import random
+import re
 from app.core.config import settings
 
+E = TypeVar("E", Engine, AsyncEngine)
+
+
+def to_async_url(url: str) -> str:
+    """Rewrite a PostgreSQL URL to use the asyncpg driver."""
+    return re.sub(r"^postgres(ql)?(\+\w+)?://", "postgresql+asyncpg://", url)
+
+
 # Create database engine with connection pooling
 # SQLAlchemy automatically uses parameterized queries, preventing SQL injection
 engine = create_engine(
@@ -26,6 +42,89 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# Async engine (asyncpg) for endpoints that run natively on the event loop
+async_engine = create_async_engine(
+    settings.ASYNC_DATABASE_URL or to_async_url(settings.DATABASE_URL),
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    echo=settings.DEBUG,
+)
+
+# Create AsyncSessionLocal class for async database sessions
+AsyncSessionLocal = async_sessionmaker(
+    async_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
+# Read replica engines, in DATABASE_REPLICA_URLS order
+replica_engines: List[Engine] = [
+    create_engine(
+        url,
+        poolclass=QueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        echo=settings.DEBUG,
+    )
+    for url in settings.DATABASE_REPLICA_URLS
+]
+async_replica_engines: List[AsyncEngine] = [
+    create_async_engine(
+        to_async_url(url),
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        echo=settings.DEBUG,
+    )
+    for url in settings.DATABASE_REPLICA_URLS
+]
+
+
+def pick_replica(engines: List[E]) -> Optional[E]:
+    """Pick a replica engine by weight, or None if there are no replicas."""
+    if not engines:
+        return None
+    return random.choices(engines, weights=settings.DATABASE_REPLICA_WEIGHTS or None)[0]
+
+
+class RoutingSession(Session):
+    """
+    Session that reads from a replica and writes to the primary.
+    
+    SELECT statements outside a flush go to the replica given at
+    construction; flushes and all other statements go to the primary bind.
+    """
+    
+    def __init__(self, replica: Optional[Engine] = None, **kwargs):
+        super().__init__(**kwargs)
+        self.replica = replica
+    
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            self.replica is not None
+            and not self._flushing
+            and getattr(clause, "is_select", False)
+        ):
+            return self.replica
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+ReadSessionLocal = sessionmaker(
+    class_=RoutingSession,
+    autocommit=False,
+    autoflush=False,
+    bind=engine
+)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    async_engine,
+    sync_session_class=RoutingSession,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 
 def get_db() -> Generator[Session, None, None]:
     """
@@ -47,6 +146,55 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency function to get an async database session.
+    
+    Usage in FastAPI endpoints:
+        @app.get("/items")
+        async def read_items(db: AsyncSession = Depends(get_async_db)):
+            result = await db.execute(select(Item))
+    
+    Yields:
+        AsyncSession: SQLAlchemy async database session
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db() -> Generator[Session, None, None]:
+    """
+    Dependency function to get a read-only database session.
+    
+    Queries run on a read replica when replicas are configured, so results
+    may lag the primary slightly. Use get_db for anything that writes.
+    
+    Yields:
+        Session: SQLAlchemy database session routed to a replica
+    """
+    db = ReadSessionLocal(replica=pick_replica(replica_engines))
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Dependency function to get a read-only async database session.
+    
+    Async counterpart of get_read_db.
+    
+    Yields:
+        AsyncSession: SQLAlchemy async database session routed to a replica
+    """
+    replica = pick_replica(async_replica_engines)
+    async with AsyncReadSessionLocal(
+        replica=replica.sync_engine if replica is not None else None
+    ) as db:
+        yield db
+
+
 def init_db() -> None:
     """
     Initialize database tables.
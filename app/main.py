@@ -8,11 +8,13 @@ from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy import text
+import asyncio
 import logging
 
 from app.core.config import settings
 from app.api.v1.api import api_router
 from app.middleware.rate_limit import RateLimitMiddleware
+from app.middleware.body_limit import BodySizeLimitMiddleware
 from app.utils.logger import setup_logging
 from app.utils.exceptions import GlobalShipException
 from app.utils.error_handlers import (
@@ -47,6 +49,9 @@ app.add_middleware(
 # Add rate limiting middleware
 app.add_middleware(RateLimitMiddleware)
 
+# Reject oversized request bodies before reading them
+app.add_middleware(BodySizeLimitMiddleware)
+
 # Add trusted host middleware for production
 if settings.ENVIRONMENT == "production":
     app.add_middleware(
@@ -72,21 +77,48 @@ async def startup_event():
     
     # Test database connection
     try:
-        from app.db.session import engine
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
+        from app.db.session import async_engine
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
         logger.info("✓ Database connection successful")
     except Exception as e:
         logger.error(f"✗ Database connection failed: {e}")
     
     # Test Redis connection
-    try:
-        from app.services.redis_service import redis_service
-        if redis_service.redis_client:
-            redis_service.redis_client.ping()
-            logger.info("✓ Redis connection successful")
-    except Exception as e:
-        logger.warning(f"⚠ Redis connection failed: {e}")
+    from app.services.async_redis_service import async_redis_service
+    if await async_redis_service.ping():
+        logger.info("✓ Redis connection successful")
+    else:
+        logger.warning("⚠ Redis connection failed")
+    
+    # Listen for principal cache invalidations from other workers
+    from app.services.principal_cache import principal_cache
+    principal_cache.start_listener()
+    
+    # Keep admin stats counters in line with the source tables
+    if settings.STATS_RECONCILE_INTERVAL_SECONDS > 0:
+        from app.utils.background_tasks import reconcile_system_stats_periodically
+        app.state.stats_reconciler = asyncio.create_task(reconcile_system_stats_periodically())
+    
+    # Create shipment_events partitions ahead of time and expire old ones
+    if settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS > 0:
+        from app.utils.background_tasks import maintain_event_partitions_periodically
+        app.state.partition_maintainer = asyncio.create_task(maintain_event_partitions_periodically())
+    
+    # Move long-finished shipments to the archive tables
+    if settings.ARCHIVE_INTERVAL_SECONDS > 0:
+        from app.utils.background_tasks import archive_shipments_periodically
+        app.state.archiver = asyncio.create_task(archive_shipments_periodically())
+    
+    # Delete documents no longer attached to any shipment
+    if settings.DOCUMENT_GC_INTERVAL_SECONDS > 0:
+        from app.utils.background_tasks import collect_documents_periodically
+        app.state.document_collector = asyncio.create_task(collect_documents_periodically())
+    
+    # Staged import files are local, so every worker sweeps its own
+    if settings.SHIPMENT_IMPORT_CLEANUP_INTERVAL_SECONDS > 0:
+        from app.utils.background_tasks import clean_up_shipment_imports_periodically
+        app.state.import_cleaner = asyncio.create_task(clean_up_shipment_imports_periodically())
     
     logger.info("=" * 60)
     logger.info("Application startup complete!")
@@ -97,8 +129,26 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on shutdown."""
     logger.info(f"Shutting down {settings.PROJECT_NAME}")
+    for task_name in (
+        "stats_reconciler", "partition_maintainer", "archiver", "document_collector", "import_cleaner"
+    ):
+        task = getattr(app.state, task_name, None)
+        if task:
+            task.cancel()
+    
+    from app.services.principal_cache import principal_cache
+    principal_cache.stop_listener()
+    
     from app.services.redis_service import redis_service
     redis_service.close()
+    
+    from app.services.async_redis_service import async_redis_service
+    await async_redis_service.close()
+    
+    from app.db.session import async_engine, async_replica_engines
+    await async_engine.dispose()
+    for replica in async_replica_engines:
+        await replica.dispose()
 
 
 @app.get("/", tags=["Health"])
@@ -124,23 +174,21 @@ async def health_check():
     
     # Check database
     try:
-        from app.db.session import engine
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
+        from app.db.session import async_engine
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
         health_status["database"] = "healthy"
     except Exception as e:
         health_status["database"] = f"unhealthy: {str(e)}"
         logger.error(f"Database health check failed: {e}")
     
     # Check Redis
-    try:
-        from app.services.redis_service import redis_service
-        if redis_service.redis_client:
-            redis_service.redis_client.ping()
-            health_status["redis"] = "healthy"
-    except Exception as e:
-        health_status["redis"] = f"unhealthy: {str(e)}"
-        logger.warning(f"Redis health check failed: {e}")
+    from app.services.async_redis_service import async_redis_service
+    if await async_redis_service.ping():
+        health_status["redis"] = "healthy"
+    else:
+        health_status["redis"] = "unhealthy: ping failed"
+        logger.warning("Redis health check failed")
     
     overall_healthy = all(
         status == "healthy" 
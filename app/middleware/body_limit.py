@@ -0,0 +1,79 @@
+"""
+Request body size limit.
+
+Requests declaring a Content-Length over MAX_REQUEST_BODY_SIZE are answered
+with 413 before any of the body is read, so an oversized upload is never
+parsed or spooled. Bodies without a Content-Length (Transfer-Encoding:
+chunked) are counted as they are received; reading stops with 413 as soon
+as the total passes the limit. Per-file limits are enforced while
+streaming the file (see app/utils/uploads.py).
+"""
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+import logging
+
+from app.core.config import settings
+from app.utils.exceptions import UploadTooLargeException
+
+logger = logging.getLogger(__name__)
+
+
+class BodySizeLimitMiddleware:
+    """Reject requests whose body is over the limit."""
+
+    def __init__(self, app: ASGIApp, max_size: int = settings.MAX_REQUEST_BODY_SIZE):
+        self.app = app
+        self.max_size = max_size
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send) -> None:
+        response = JSONResponse(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            content={"detail": f"Request body too large. Max size: {self.max_size} bytes"}
+        )
+        await response(scope, receive, send)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        declared = dict(scope["headers"]).get(b"content-length")
+        if declared and declared.isdigit() and int(declared) > self.max_size:
+            logger.warning(f"Request body too large: {int(declared)} bytes to {scope['path']}")
+            await self._reject(scope, receive, send)
+            return
+
+        received = 0
+        exceeded = False
+        started = False
+
+        async def receive_limited() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_size:
+                    exceeded = True
+                    raise UploadTooLargeException(self.max_size)
+            return message
+
+        async def send_unless_exceeded(message: Message) -> None:
+            nonlocal started
+            if exceeded and not started:
+                # Whatever the app makes of the aborted read is replaced by 413
+                return
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive_limited, send_unless_exceeded)
+        except Exception:
+            # The aborted read, possibly wrapped by a body parser
+            if not exceeded or started:
+                raise
+
+        if exceeded and not started:
+            logger.warning(f"Request body too large: over {self.max_size} bytes to {scope['path']}")
+            await self._reject(scope, receive, send)
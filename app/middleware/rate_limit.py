@@ -1,72 +1,87 @@
 """
 Rate limiting middleware using Redis.
+
+Implemented as a plain ASGI middleware rather than BaseHTTPMiddleware so
+responses are passed straight through (no extra task or memory stream per
+request, and streaming responses are not buffered).
 """
-from fastapi import Request, status
+from fastapi import status
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 import logging
 
 from app.core.config import settings
-from app.services.redis_service import redis_service
+from app.services.rate_limiter import RateLimiter, RateLimitResult
 
 logger = logging.getLogger(__name__)
 
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Rate limiting middleware using Redis."""
-    
-    def __init__(self, app):
-        super().__init__(app)
+class RateLimitMiddleware:
+    """Rate limiting middleware using a Redis token bucket."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
         self.rate_limit = settings.RATE_LIMIT_PER_MINUTE
         self.window = 60  # 60 seconds
-    
-    async def dispatch(self, request: Request, call_next):
-        # Skip rate limiting for health checks
-        if request.url.path in ["/health", "/", "/api/v1/docs", "/api/v1/openapi.json"]:
-            return await call_next(request)
-        
+        self.limiter = RateLimiter(self.rate_limit, self.window)
+        # Skip rate limiting for health checks and docs
+        self.exempt_paths = frozenset({
+            "/health",
+            "/",
+            f"{settings.API_V1_PREFIX}/docs",
+            f"{settings.API_V1_PREFIX}/openapi.json",
+        })
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] in self.exempt_paths:
+            await self.app(scope, receive, send)
+            return
+
         # Get client IP
-        client_ip = request.client.host
-        
-        # Create rate limit key
-        key = f"rate_limit:{client_ip}"
-        
-        try:
-            # Get current count from Redis
-            current_count = redis_service.get(key) or 0
-            
-            if isinstance(current_count, dict):
-                current_count = 0
-            
-            current_count = int(current_count)
-            
-            if current_count >= self.rate_limit:
-                logger.warning(f"Rate limit exceeded for IP: {client_ip}")
-                return JSONResponse(
-                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-                    content={
-                        "detail": "Too many requests. Please try again later.",
-                        "retry_after": 60
-                    }
-                )
-            
-            # Increment counter
-            new_count = redis_service.increment(key)
-            
-            # Set expiry if first request
-            if current_count == 0 and redis_service.redis_client:
-                redis_service.redis_client.expire(key, self.window)
-            
-            response = await call_next(request)
-            
-            # Add rate limit headers
-            response.headers["X-RateLimit-Limit"] = str(self.rate_limit)
-            response.headers["X-RateLimit-Remaining"] = str(max(0, self.rate_limit - new_count))
-            response.headers["X-RateLimit-Reset"] = str(self.window)
-            
-            return response
-            
-        except Exception as e:
-            logger.error(f"Rate limiting error: {e}")
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+
+        # Check, consume and expire in one atomic round trip
+        result = await self.limiter.hit(client_ip)
+
+        if result is None:
             # Don't block requests if Redis is down
-            return await call_next(request)
+            await self.app(scope, receive, send)
+            return
+
+        rate_limit_headers = self._headers(result)
+
+        if not result.allowed:
+            logger.warning(f"Rate limit exceeded for IP: {client_ip}")
+            response = JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={
+                    "detail": "Too many requests. Please try again later.",
+                    "retry_after": result.retry_after
+                },
+                headers={
+                    **rate_limit_headers,
+                    "Retry-After": str(result.retry_after),
+                }
+            )
+            await response(scope, receive, send)
+            return
+
+        async def send_with_rate_limit_headers(message: Message) -> None:
+            # Add rate limit headers
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers.update(rate_limit_headers)
+            await send(message)
+
+        await self.app(scope, receive, send_with_rate_limit_headers)
+
+    @staticmethod
+    def _headers(result: RateLimitResult) -> dict:
+        """Build X-RateLimit-* headers for a limiter result."""
+        return {
+            "X-RateLimit-Limit": str(result.limit),
+            "X-RateLimit-Remaining": str(result.remaining),
+            "X-RateLimit-Reset": str(result.reset_after),
+        }
@@ -6,6 +6,9 @@ from app.models.shipment import Shipment, ServiceType, ShipmentStatus
 from app.models.shipment_event import ShipmentEvent
 from app.models.quote import Quote, QuoteStatus
 from app.models.contact_message import ContactMessage, MessageStatus
+from app.models.system_counter import SystemCounter
+from app.models.archive import ArchivedShipment, ArchivedShipmentEvent
+from app.models.document import Document, ShipmentDocument
 
 __all__ = [
     "User",
@@ -17,4 +20,9 @@ __all__ = [
     "QuoteStatus",
     "ContactMessage",
     "MessageStatus",
+    "SystemCounter",
+    "ArchivedShipment",
+    "ArchivedShipmentEvent",
+    "Document",
+    "ShipmentDocument",
 ]
@@ -0,0 +1,54 @@
+"""
+Archive tables for finished shipments and their events.
+
+Delivered and cancelled shipments are moved here (see
+app/services/archive_service.py) once they are old enough, so the hot
+shipments and shipment_events tables only hold live history. Archive rows
+have the same columns as the hot ones, plus archived_at on shipments, and
+are read-only.
+"""
+from sqlalchemy import Column, DateTime, Index, Table, text
+
+from app.db.base import Base
+from app.models.shipment import Shipment
+from app.models.shipment_event import ShipmentEvent
+
+
+def _archive_columns(table: Table):
+    """Copy a hot table's columns (without defaults, keys or indexes)."""
+    return [
+        Column(column.name, column.type, nullable=column.nullable, primary_key=column.name == "id")
+        for column in table.columns
+    ]
+
+
+class ArchivedShipment(Base):
+    """Archived shipment (read-only)."""
+    
+    __table__ = Table(
+        "shipments_archive",
+        Base.metadata,
+        *_archive_columns(Shipment.__table__),
+        # Server default: rows arrive via INSERT ... SELECT, which cannot
+        # evaluate Python-side defaults (migration 008)
+        Column("archived_at", DateTime, server_default=text("now()"), nullable=False),
+        Index("ix_shipments_archive_tracking_number", "tracking_number", unique=True),
+        Index("ix_shipments_archive_user_id", "user_id"),
+    )
+    
+    def __repr__(self):
+        return f"<ArchivedShipment {self.tracking_number}>"
+
+
+class ArchivedShipmentEvent(Base):
+    """Archived shipment event (read-only)."""
+    
+    __table__ = Table(
+        "shipment_events_archive",
+        Base.metadata,
+        *_archive_columns(ShipmentEvent.__table__),
+        Index("ix_shipment_events_archive_shipment_id_timestamp", "shipment_id", "timestamp", "id"),
+    )
+    
+    def __repr__(self):
+        return f"<ArchivedShipmentEvent {self.event_type} at {self.timestamp}>"
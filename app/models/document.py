@@ -0,0 +1,74 @@
+"""
+Shipping document models.
+
+Documents are content-addressed: one Document row (and one stored blob)
+per distinct content, keyed by its SHA-256, however many shipments it is
+attached to. ShipmentDocument rows attach a document to a shipment under
+the uploaded filename; Document.ref_count counts them.
+"""
+import uuid
+from sqlalchemy import Column, String, DateTime, ForeignKey, Integer, BigInteger, Index
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import relationship
+from datetime import datetime
+
+from app.db.base import Base
+
+
+class Document(Base):
+    """Stored document content (one row per distinct SHA-256)."""
+
+    __tablename__ = "documents"
+
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(BigInteger, nullable=False)
+    content_type = Column(String(255), nullable=True)
+
+    # Number of ShipmentDocument rows; unreferenced documents are swept
+    # (row and blob) once they have been idle for DOCUMENT_GC_GRACE_SECONDS
+    ref_count = Column(Integer, nullable=False, default=0)
+
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    # Garbage collection scans unreferenced documents only (migration 009)
+    __table_args__ = (
+        Index("ix_documents_unreferenced", updated_at, postgresql_where=ref_count <= 0),
+    )
+
+    def __repr__(self):
+        return f"<Document {self.sha256}>"
+
+
+class ShipmentDocument(Base):
+    """A document attached to a shipment."""
+
+    __tablename__ = "shipment_documents"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+
+    # No foreign key to shipments: attachments stay with shipments that
+    # are moved to the archive
+    shipment_id = Column(UUID(as_uuid=True), nullable=False)
+    document_sha256 = Column(String(64), ForeignKey("documents.sha256"), nullable=False)
+    uploaded_by = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=True)
+
+    filename = Column(String(255), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    # Relationships
+    document = relationship("Document", lazy="joined")
+
+    # A document is attached to a shipment at most once (migration 009)
+    __table_args__ = (
+        Index(
+            "uq_shipment_documents_shipment_id_document",
+            shipment_id,
+            document_sha256,
+            unique=True,
+        ),
+    )
+
+    def __repr__(self):
+        return f"<ShipmentDocument {self.filename} on {self.shipment_id}>"
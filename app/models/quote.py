@@ -2,7 +2,7 @@
 Quote model for shipment quote requests.
 """
 import uuid
-from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Numeric, Text
+from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Numeric, Text, Index, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -28,7 +28,7 @@ class Quote(Base):
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     
     # Foreign key to user
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     
     # Quote information
     origin = Column(String(255), nullable=False)
@@ -59,5 +59,17 @@ class Quote(Base):
     # Relationships
     user = relationship("User", back_populates="quotes")
     
+    # Indexes for per-user listings and the pending count (migration 002).
+    # Enum columns store member names, hence the upper-case literal.
+    __table_args__ = (
+        Index("ix_quotes_user_id_created_at", user_id, created_at.desc(), id.desc()),
+        Index("ix_quotes_user_id_status_created_at", user_id, status, created_at.desc(), id.desc()),
+        Index(
+            "ix_quotes_user_id_pending",
+            user_id,
+            postgresql_where=text(f"status = '{QuoteStatus.PENDING.name}'"),
+        ),
+    )
+    
     def __repr__(self):
         return f"<Quote {self.id} - {self.status}>"
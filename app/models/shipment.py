@@ -3,7 +3,7 @@ Shipment model for tracking shipments.
 All queries use SQLAlchemy ORM for SQL injection protection.
 """
 import uuid
-from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Numeric, JSON, Boolean
+from sqlalchemy import Column, String, DateTime, Enum, ForeignKey, Numeric, JSON, Boolean, Index, Sequence, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -34,6 +34,32 @@ class ShipmentStatus(str, enum.Enum):
     ON_HOLD = "on_hold"
 
 
+# Statuses counted as active on the user dashboard
+ACTIVE_SHIPMENT_STATUSES = (
+    ShipmentStatus.PENDING,
+    ShipmentStatus.PROCESSING,
+    ShipmentStatus.PICKED_UP,
+    ShipmentStatus.IN_TRANSIT,
+    ShipmentStatus.CUSTOMS,
+    ShipmentStatus.OUT_FOR_DELIVERY,
+)
+
+# Currency of shipment costs and revenue totals
+DEFAULT_CURRENCY = "USD"
+
+# Tracking number source (see app/services/tracking_numbers.py). Each
+# nextval reserves a block of TRACKING_NUMBER_BLOCK_SIZE values; the
+# increment must match migration 004.
+TRACKING_NUMBER_BLOCK_SIZE = 1000
+tracking_number_seq = Sequence(
+    "tracking_number_seq",
+    start=0,
+    minvalue=0,
+    increment=TRACKING_NUMBER_BLOCK_SIZE,
+    metadata=Base.metadata,
+)
+
+
 class Shipment(Base):
     """Shipment database model."""
     
@@ -45,8 +71,8 @@ class Shipment(Base):
     # Tracking information
     tracking_number = Column(String(50), unique=True, index=True, nullable=False)
     
-    # Foreign key to user
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    # Foreign key to user (indexed by the composite indexes below)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
     
     # Origin information
     origin_city = Column(String(100), nullable=False)
@@ -72,7 +98,7 @@ class Shipment(Base):
     # Pricing
     estimated_cost = Column(Numeric(10, 2), nullable=True)
     actual_cost = Column(Numeric(10, 2), nullable=True)
-    currency = Column(String(3), default="USD", nullable=False)
+    currency = Column(String(3), default=DEFAULT_CURRENCY, nullable=False)
     
     # Dates
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -89,5 +115,25 @@ class Shipment(Base):
     user = relationship("User", back_populates="shipments")
     events = relationship("ShipmentEvent", back_populates="shipment", cascade="all, delete-orphan")
     
+    # Indexes for per-user listings and dashboard stats (migration 002).
+    # Enum columns store member names, hence the upper-case literals.
+    __table_args__ = (
+        Index("ix_shipments_user_id_created_at", user_id, created_at.desc(), id.desc()),
+        Index("ix_shipments_user_id_status_created_at", user_id, status, created_at.desc(), id.desc()),
+        Index(
+            "ix_shipments_user_id_active",
+            user_id,
+            postgresql_where=text(
+                "status IN ({})".format(", ".join(f"'{s.name}'" for s in ACTIVE_SHIPMENT_STATUSES))
+            ),
+        ),
+        Index(
+            "ix_shipments_user_id_actual_cost",
+            user_id,
+            actual_cost,
+            postgresql_where=text("actual_cost IS NOT NULL"),
+        ),
+    )
+    
     def __repr__(self):
         return f"<Shipment {self.tracking_number}>"
@@ -1,8 +1,11 @@
 """
 Shipment event/timeline model for tracking shipment history.
+
+The table is range-partitioned by month on timestamp (migration 007; see
+app/services/partition_service.py), so the primary key includes timestamp.
 """
 import uuid
-from sqlalchemy import Column, String, DateTime, ForeignKey, Text
+from sqlalchemy import Column, String, DateTime, ForeignKey, Text, Index, DDL, event, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -15,11 +18,12 @@ class ShipmentEvent(Base):
     
     __tablename__ = "shipment_events"
     
-    # Primary key
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
+    # Primary key (id, timestamp): unique constraints on a partitioned
+    # table must include the partition key
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     
-    # Foreign key to shipment
-    shipment_id = Column(UUID(as_uuid=True), ForeignKey("shipments.id"), nullable=False, index=True)
+    # Foreign key to shipment (indexed by the timeline index below)
+    shipment_id = Column(UUID(as_uuid=True), ForeignKey("shipments.id"), nullable=False)
     
     # Event information
     event_type = Column(String(100), nullable=False)  # e.g., "picked_up", "in_transit", "delivered"
@@ -27,11 +31,38 @@ class ShipmentEvent(Base):
     description = Column(Text, nullable=True)
     
     # Timestamps
-    timestamp = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+    timestamp = Column(DateTime, default=datetime.utcnow, primary_key=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
     # Relationships
     shipment = relationship("Shipment", back_populates="events")
     
+    # Timeline reads: one shipment's events in (timestamp, id) order
+    # (migration 005). Natural key for carrier ingestion: one scan per
+    # shipment, type, time and location (migration 006).
+    __table_args__ = (
+        Index("ix_shipment_events_shipment_id_timestamp", shipment_id, timestamp, id),
+        Index(
+            "uq_shipment_events_natural_key",
+            shipment_id,
+            event_type,
+            timestamp,
+            func.coalesce(location, ""),
+            unique=True,
+        ),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+    
     def __repr__(self):
         return f"<ShipmentEvent {self.event_type} at {self.timestamp}>"
+
+
+# Tables created with metadata.create_all (tests, init_db) get only the
+# default partition; month partitions come from PartitionService.
+event.listen(
+    ShipmentEvent.__table__,
+    "after_create",
+    DDL("CREATE TABLE shipment_events_default PARTITION OF shipment_events DEFAULT").execute_if(
+        dialect="postgresql"
+    ),
+)
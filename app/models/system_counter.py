@@ -0,0 +1,25 @@
+"""
+System counter model for incrementally maintained admin statistics.
+"""
+from sqlalchemy import Column, String, DateTime, Numeric
+from datetime import datetime
+
+from app.db.base import Base
+
+
+class SystemCounter(Base):
+    """
+    Named counter row (e.g. "shipments.total", "users.created:2025-02-03").
+    
+    Updated in the same transaction as the rows it counts and periodically
+    reconciled against the source tables.
+    """
+    
+    __tablename__ = "system_counters"
+    
+    name = Column(String(100), primary_key=True)
+    value = Column(Numeric(18, 2), default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    
+    def __repr__(self):
+        return f"<SystemCounter {self.name}={self.value}>"
@@ -55,7 +55,8 @@ class QuoteResponse(QuoteBase, ResponseBase, TimestampSchema):
 class QuoteListResponse(BaseSchema):
     """Schema for paginated quote list."""
     items: List[QuoteResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
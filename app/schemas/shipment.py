@@ -88,7 +88,81 @@ class ShipmentResponse(ShipmentBase, ResponseBase, TimestampSchema):
 class ShipmentListResponse(BaseSchema):
     """Schema for paginated shipment list."""
     items: List[ShipmentResponse]
-    total: int
+    total: Optional[int] = None
     page: int
     page_size: int
-    pages: int
+    pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+
+
+class ShipmentBulkCreate(BaseSchema):
+    """
+    Schema for bulk shipment creation.
+    
+    Rows are validated one by one against ShipmentCreate by the service so
+    a bad row is reported instead of rejecting the whole batch.
+    """
+    shipments: List[Dict[str, Any]] = Field(..., min_length=1)
+
+
+class ShipmentBulkRowError(BaseSchema):
+    """Validation errors for one row of a bulk request."""
+    index: int
+    errors: List[Dict[str, Any]]
+
+
+class ShipmentBulkCreated(BaseSchema):
+    """A shipment created by a bulk request."""
+    index: int
+    id: UUID
+    tracking_number: str
+
+
+class ShipmentBulkResponse(BaseSchema):
+    """Schema for bulk shipment creation results."""
+    created: List[ShipmentBulkCreated]
+    errors: List[ShipmentBulkRowError]
+
+
+
+class ShipmentImportRowError(BaseSchema):
+    """Validation errors for one row of an imported CSV file."""
+    row: int  # CSV line number, the header being line 1
+    errors: List[Dict[str, Any]]
+
+
+class ShipmentImportJob(BaseSchema):
+    """
+    Progress of a CSV shipment import.
+    
+    status is queued, running, completed or failed; error explains a
+    failed job. errors lists the first rejected rows. heartbeat_at is the
+    last progress update of a queued or running job.
+    """
+    job_id: UUID
+    filename: Optional[str] = None
+    status: str
+    processed_rows: int
+    created: int
+    rejected: int
+    errors: List[ShipmentImportRowError]
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    heartbeat_at: Optional[datetime] = None
+
+
+class DocumentResponse(BaseSchema):
+    """Stored document content."""
+    sha256: str
+    size: int
+    content_type: Optional[str] = None
+
+
+class ShipmentDocumentResponse(ResponseBase):
+    """Schema for a document attached to a shipment."""
+    shipment_id: UUID
+    filename: str
+    created_at: datetime
+    document: DocumentResponse
@@ -3,7 +3,7 @@ Shipment event Pydantic schemas.
 """
 from pydantic import Field, field_validator
 from typing import Optional, List
-from datetime import datetime
+from datetime import datetime, timezone
 from uuid import UUID
 import re
 
@@ -25,6 +25,14 @@ class ShipmentEventBase(BaseSchema):
             return v
         sanitized = re.sub(r'[<>{}]', '', v)
         return sanitized.strip()
+    
+    @field_validator("timestamp")
+    @classmethod
+    def to_naive_utc(cls, v: datetime) -> datetime:
+        """Store offsets as naive UTC, like every other timestamp column."""
+        if v.tzinfo is not None:
+            v = v.astimezone(timezone.utc).replace(tzinfo=None)
+        return v
 
 
 class ShipmentEventCreate(ShipmentEventBase):
@@ -39,6 +47,32 @@ class ShipmentEventResponse(ShipmentEventBase, ResponseBase):
 
 
 class ShipmentTimelineResponse(BaseSchema):
-    """Schema for complete shipment timeline."""
+    """Schema for a page of a shipment timeline."""
     tracking_number: str
     events: List[ShipmentEventResponse]
+    next_cursor: Optional[str] = None
+
+
+class CarrierEvent(ShipmentEventBase):
+    """
+    Schema for one carrier scan event in a batch.
+    
+    event_type values matching a ShipmentStatus value (e.g. "in_transit")
+    also move the shipment's status forward.
+    """
+    tracking_number: str = Field(..., min_length=1, max_length=50)
+
+
+class CarrierEventBatch(BaseSchema):
+    """Schema for a batch of carrier scan events."""
+    events: List[CarrierEvent] = Field(..., min_length=1)
+
+
+class CarrierEventBatchResponse(BaseSchema):
+    """Schema for batch ingestion results."""
+    received: int
+    inserted: int
+    duplicates: int
+    rejected: int
+    status_updates: int
+    unknown_tracking_numbers: List[str]
@@ -2,19 +2,32 @@
 Services package - exports all service instances.
 """
 from app.services.redis_service import redis_service
-from app.services.user_service import user_service
-from app.services.shipment_service import shipment_service
-from app.services.shipment_event_service import shipment_event_service
-from app.services.quote_service import quote_service
+from app.services.async_redis_service import async_redis_service
+from app.services.principal_cache import principal_cache
+from app.services.read_your_writes import read_your_writes
+from app.services.user_service import user_service, async_user_service
+from app.services.shipment_service import shipment_service, async_shipment_service
+from app.services.shipment_event_service import shipment_event_service, async_shipment_event_service
+from app.services.quote_service import quote_service, async_quote_service
+from app.services.dashboard_service import dashboard_service, async_dashboard_service
 from app.services.contact_message_service import contact_message_service
 from app.services.email_service import email_service
 
 __all__ = [
     "redis_service",
+    "async_redis_service",
+    "principal_cache",
+    "read_your_writes",
     "user_service",
+    "async_user_service",
     "shipment_service",
+    "async_shipment_service",
     "shipment_event_service",
+    "async_shipment_event_service",
     "quote_service",
+    "async_quote_service",
+    "dashboard_service",
+    "async_dashboard_service",
     "contact_message_service",
     "email_service",
 ]
@@ -0,0 +1,170 @@
+"""
+Cold archive for finished shipments.
+
+Shipments that were delivered or cancelled more than ARCHIVE_AFTER_DAYS
+ago are moved, with their events, into shipments_archive and
+shipment_events_archive. Each batch is moved in one transaction, using
+DELETE ... RETURNING inside a CTE that feeds an INSERT, so a row is never
+in both tables or in neither. Rows are claimed with FOR UPDATE SKIP
+LOCKED, so archiving never waits on (or blocks) live writes to other
+shipments.
+
+If a batch cannot be moved as a whole, its shipments are moved one at a
+time in savepoints and the ones that fail are logged and skipped. A pass
+walks the candidates in ID order, so failing shipments never hold back
+the rest; they are retried on the next pass.
+
+Archived shipments still count in the admin stats and on user dashboards.
+ShipmentService lookups by ID and tracking number fall through to the
+archive.
+"""
+from datetime import datetime, timedelta
+from typing import List, NamedTuple, Optional, Tuple
+from uuid import UUID
+import logging
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.models.archive import ArchivedShipment, ArchivedShipmentEvent
+from app.models.shipment import Shipment, ShipmentStatus
+from app.models.shipment_event import ShipmentEvent
+from app.services.listing_counts import shipment_counts
+
+logger = logging.getLogger(__name__)
+
+ARCHIVABLE_STATUSES = (ShipmentStatus.DELIVERED, ShipmentStatus.CANCELLED)
+
+
+def _move(db: Session, source, target, where) -> int:
+    """
+    Move rows matching where from source to target in one statement:
+    WITH moved AS (DELETE ... RETURNING ...) INSERT INTO target SELECT ...
+    """
+    source, target = source.__table__, target.__table__
+    columns = [column.name for column in source.columns]
+    moved = (
+        delete(source)
+        .where(where)
+        .returning(*[source.c[name] for name in columns])
+        .cte("moved")
+    )
+    stmt = (
+        insert(target)
+        .from_select(columns, select(*[moved.c[name] for name in columns]))
+        .add_cte(moved)
+    )
+    return db.execute(stmt).rowcount
+
+
+class ArchiveBatch(NamedTuple):
+    """Outcome of one archive_batch call."""
+    archived: int
+    failed: List[UUID]
+    # Last claimed shipment ID, to continue after; None if nothing was claimed
+    last_id: Optional[UUID]
+
+
+def _move_shipments(db: Session, ids: List[UUID]) -> Tuple[int, int]:
+    """Move shipments and their events; returns (shipments, events) moved."""
+    events = _move(db, ShipmentEvent, ArchivedShipmentEvent, ShipmentEvent.shipment_id.in_(ids))
+    shipments = _move(db, Shipment, ArchivedShipment, Shipment.id.in_(ids))
+    return shipments, events
+
+
+class ArchiveService:
+    """Moves finished shipments to the archive tables."""
+
+    @staticmethod
+    def archive_batch(
+        db: Session,
+        cutoff: datetime,
+        batch_size: int,
+        after: Optional[UUID] = None
+    ) -> ArchiveBatch:
+        """
+        Archive up to batch_size shipments finished before cutoff (with ID
+        greater than after), with their events, and commit. Shipments that
+        cannot be moved are skipped and reported in failed.
+        SQLAlchemy ORM prevents SQL injection.
+        """
+        conditions = [
+            Shipment.status.in_(ARCHIVABLE_STATUSES),
+            func.coalesce(Shipment.actual_delivery, Shipment.updated_at) < cutoff
+        ]
+        if after is not None:
+            conditions.append(Shipment.id > after)
+
+        failed: List[UUID] = []
+        try:
+            claimed = db.execute(
+                select(Shipment.id, Shipment.user_id)
+                .where(*conditions)
+                .order_by(Shipment.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            ).all()
+            if not claimed:
+                db.rollback()
+                return ArchiveBatch(0, [], None)
+
+            ids: List[UUID] = [row.id for row in claimed]
+            try:
+                with db.begin_nested():
+                    shipments, events = _move_shipments(db, ids)
+            except SQLAlchemyError as e:
+                # Claimed rows stay locked; find the ones that cannot move
+                logger.warning(f"⚠ Archive batch failed, moving shipments one by one: {e}")
+                shipments = events = 0
+                for shipment_id in ids:
+                    try:
+                        with db.begin_nested():
+                            moved, moved_events = _move_shipments(db, [shipment_id])
+                    except SQLAlchemyError as e:
+                        failed.append(shipment_id)
+                        logger.error(f"✗ Could not archive shipment {shipment_id}: {e}")
+                        continue
+                    shipments += moved
+                    events += moved_events
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        # Listing totals change; everything else about the shipments is the same
+        skipped = set(failed)
+        for user_id in {row.user_id for row in claimed if row.id not in skipped}:
+            shipment_counts.invalidate(user_id)
+
+        logger.info(f"✓ Archived {shipments} shipments with {events} events")
+        return ArchiveBatch(shipments, failed, ids[-1])
+
+    @staticmethod
+    def archive_finished(db: Session, older_than_days: int, batch_size: int) -> int:
+        """
+        Archive every shipment delivered or cancelled more than
+        older_than_days ago, in batches.
+
+        Returns:
+            Total number of shipments archived
+        """
+        cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+        total = 0
+        failed = 0
+        after = None
+        while True:
+            batch = ArchiveService.archive_batch(db, cutoff, batch_size, after)
+            total += batch.archived
+            failed += len(batch.failed)
+            if batch.last_id is None:
+                break
+            after = batch.last_id
+
+        if failed:
+            logger.warning(f"⚠ {failed} shipments could not be archived; retried on the next pass")
+        return total
+
+
+# Global archive service instance
+archive_service = ArchiveService()
@@ -0,0 +1,223 @@
+"""
+Asyncio Redis service for middleware and async endpoints.
+
+Mirrors RedisService but runs on redis.asyncio with its own connection
+pool, so async code never blocks the event loop on a Redis round trip.
+It shares RedisService's circuit breaker, so an outage seen by either
+client short-circuits both.
+"""
+import redis.asyncio as aioredis
+import json
+from typing import Optional, Any, Awaitable, Callable, Dict, List
+import logging
+
+from app.core.config import settings
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.redis_service import CONNECTION_ERRORS, redis_breaker
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncRedisService:
+    """Non-blocking Redis service for caching operations."""
+
+    def __init__(self, breaker: CircuitBreaker = redis_breaker):
+        """Initialize Redis connection pool (connections are opened lazily)."""
+        self.redis_client: Optional[aioredis.Redis] = None
+        self.breaker = breaker
+        self._scripts: Dict[str, Any] = {}
+        self._connect()
+
+    def _connect(self):
+        """Create the asyncio Redis client. No network I/O happens here."""
+        try:
+            self.redis_client = aioredis.Redis(
+                connection_pool=aioredis.ConnectionPool.from_url(
+                    settings.REDIS_URL,
+                    password=settings.REDIS_PASSWORD,
+                    max_connections=settings.REDIS_ASYNC_MAX_CONNECTIONS,
+                    socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                    socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                    decode_responses=True
+                )
+            )
+        except Exception as e:
+            logger.error(f"✗ Async Redis client setup failed: {e}")
+            self.redis_client = None
+
+    async def _execute(
+        self,
+        operation: str,
+        target: str,
+        command: Callable[[aioredis.Redis], Awaitable[Any]],
+        default: Any
+    ) -> Any:
+        """
+        Run a command through the circuit breaker.
+
+        Short-circuits to default while the circuit is open; connection
+        failures count towards opening it.
+        """
+        if not self.redis_client or not self.breaker.allow_request():
+            return default
+
+        try:
+            result = await command(self.redis_client)
+        except CONNECTION_ERRORS as e:
+            self.breaker.record_failure()
+            logger.error(f"Async Redis {operation} error for {target}: {e}")
+            return default
+        except Exception as e:
+            # Redis answered; the command itself failed
+            self.breaker.record_success()
+            logger.error(f"Async Redis {operation} error for {target}: {e}")
+            return default
+
+        self.breaker.record_success()
+        return result
+
+    async def ping(self) -> bool:
+        """
+        Check that Redis is reachable.
+
+        Returns:
+            True if Redis answered, False otherwise
+        """
+        async def command(client: aioredis.Redis) -> bool:
+            return bool(await client.ping())
+
+        return await self._execute("PING", "server", command, False)
+
+    async def get(self, key: str) -> Optional[Any]:
+        """
+        Get value from Redis cache.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value or None if not found
+        """
+        value = await self._execute("GET", f"key {key}", lambda client: client.get(key), None)
+        if not value:
+            return None
+
+        try:
+            return json.loads(value)
+        except ValueError as e:
+            logger.error(f"Async Redis GET decode error for key {key}: {e}")
+            return None
+
+    async def set(
+        self,
+        key: str,
+        value: Any,
+        expire: Optional[int] = None
+    ) -> bool:
+        """
+        Set value in Redis cache.
+
+        Args:
+            key: Cache key
+            value: Value to cache (will be JSON serialized)
+            expire: Expiration time in seconds
+
+        Returns:
+            True if successful, False otherwise
+        """
+        try:
+            serialized = json.dumps(value)
+        except (TypeError, ValueError) as e:
+            logger.error(f"Async Redis SET encode error for key {key}: {e}")
+            return False
+
+        async def command(client: aioredis.Redis) -> bool:
+            if expire:
+                await client.setex(key, expire, serialized)
+            else:
+                await client.set(key, serialized)
+            return True
+
+        return await self._execute("SET", f"key {key}", command, False)
+
+    async def delete(self, key: str) -> bool:
+        """
+        Delete key from Redis cache.
+
+        Args:
+            key: Cache key to delete
+
+        Returns:
+            True if successful, False otherwise
+        """
+        async def command(client: aioredis.Redis) -> bool:
+            await client.delete(key)
+            return True
+
+        return await self._execute("DELETE", f"key {key}", command, False)
+
+    async def exists(self, key: str) -> bool:
+        """
+        Check if key exists in Redis.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            True if key exists, False otherwise
+        """
+        async def command(client: aioredis.Redis) -> bool:
+            return bool(await client.exists(key))
+
+        return await self._execute("EXISTS", f"key {key}", command, False)
+
+    async def increment(self, key: str, amount: int = 1) -> Optional[int]:
+        """
+        Increment counter in Redis.
+
+        Args:
+            key: Counter key
+            amount: Amount to increment by
+
+        Returns:
+            New counter value or None if error
+        """
+        return await self._execute(
+            "INCREMENT", f"key {key}", lambda client: client.incrby(key, amount), None
+        )
+
+    async def run_script(
+        self,
+        source: str,
+        keys: List[str],
+        args: List[Any]
+    ) -> Optional[Any]:
+        """
+        Run a Lua script server-side via EVALSHA.
+
+        Args:
+            source: Lua source
+            keys: KEYS passed to the script
+            args: ARGV passed to the script
+
+        Returns:
+            Script result or None if error
+        """
+        async def command(client: aioredis.Redis) -> Any:
+            script = self._scripts.get(source)
+            if script is None:
+                script = client.register_script(source)
+                self._scripts[source] = script
+            return await script(keys=keys, args=args)
+
+        return await self._execute("SCRIPT", f"keys {keys}", command, None)
+
+    async def close(self):
+        """Close Redis connections."""
+        if self.redis_client:
+            await self.redis_client.aclose()
+            logger.info("Async Redis connection closed")
+
+
+# Global async Redis service instance
+async_redis_service = AsyncRedisService()
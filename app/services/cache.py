@@ -0,0 +1,492 @@
+"""
+Typed, versioned cache-aside layer on top of Redis.
+
+Read models are frozen dataclasses. Each field is encoded according to its
+annotation (UUID, Decimal, datetime, date, Enum, JSON primitives, Optional,
+nested read models and Tuple[..., ...] of them), so values round-trip exactly instead of going through ``__dict__``. Cache
+keys embed the model's schema version and a fingerprint of its fields, so a
+deploy that changes the layout never reads entries written by the old one.
+
+ReadModelCache holds single read models; ReadModelListCache holds ordered
+lists of them that are appended to in place. Both keep a generation next to
+each entry that invalidations bump, so a value loaded before a concurrent
+write is never cached after it.
+"""
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Awaitable, Callable, Dict, Generic, Iterable, List, NamedTuple, Optional, Tuple, Type, TypeVar, Union
+from uuid import UUID
+import hashlib
+import json
+import logging
+import typing
+
+from app.services.redis_service import redis_service
+from app.services.async_redis_service import async_redis_service
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+Codec = Tuple[Callable[[Any], Any], Callable[[Any], Any]]
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _codec_for(annotation: Any) -> Codec:
+    """Return (encode, decode) functions for a field annotation."""
+    origin = typing.get_origin(annotation)
+    if origin is Union:
+        args = [arg for arg in typing.get_args(annotation) if arg is not type(None)]
+        if len(args) != 1:
+            raise TypeError(f"Unsupported union type in read model: {annotation}")
+        encode, decode = _codec_for(args[0])
+        return (
+            lambda v: None if v is None else encode(v),
+            lambda v: None if v is None else decode(v),
+        )
+
+    if origin is tuple:
+        args = typing.get_args(annotation)
+        if len(args) != 2 or args[1] is not Ellipsis:
+            raise TypeError(f"Unsupported tuple type in read model: {annotation}")
+        encode, decode = _codec_for(args[0])
+        return (
+            lambda v: [encode(item) for item in v],
+            lambda v: tuple(decode(item) for item in v),
+        )
+    if is_dataclass(annotation) and isinstance(annotation, type):
+        codec = ModelCodec(annotation)
+        return codec.encode, codec.decode
+
+    if origin in (dict, list) or annotation is Any:
+        return _identity, _identity
+    if annotation is UUID:
+        return str, UUID
+    if annotation is Decimal:
+        return str, Decimal
+    if annotation is datetime:
+        return datetime.isoformat, datetime.fromisoformat
+    if annotation is date:
+        return date.isoformat, date.fromisoformat
+    if isinstance(annotation, type) and issubclass(annotation, Enum):
+        return (lambda v: annotation(v).value), annotation
+    if annotation in (str, int, float, bool):
+        return _identity, annotation
+
+    raise TypeError(f"Unsupported field type in read model: {annotation}")
+
+
+def _nested_models(annotation: Any):
+    """Yield the read model types nested in a field annotation."""
+    if is_dataclass(annotation) and isinstance(annotation, type):
+        yield annotation
+    for arg in typing.get_args(annotation):
+        yield from _nested_models(arg)
+
+
+class ModelCodec(Generic[T]):
+    """Encodes a dataclass read model to and from a JSON-safe dict."""
+
+    def __init__(self, model: Type[T]):
+        if not is_dataclass(model):
+            raise TypeError(f"{model.__name__} is not a dataclass")
+        self.model = model
+        hints = typing.get_type_hints(model)
+        self._fields: Dict[str, Codec] = {
+            field.name: _codec_for(hints[field.name]) for field in fields(model)
+        }
+        # Nested models contribute their own fingerprint, so changing them
+        # also changes the keys of every model embedding them
+        layout = ",".join(
+            f"{name}:{hints[name]}"
+            + "".join(f"#{ModelCodec(nested).fingerprint}" for nested in _nested_models(hints[name]))
+            for name in self._fields
+        )
+        self.fingerprint = hashlib.sha1(layout.encode()).hexdigest()[:8]
+
+    def encode(self, instance: T) -> Dict[str, Any]:
+        """Serialize a read model instance."""
+        return {
+            name: encode(getattr(instance, name))
+            for name, (encode, _) in self._fields.items()
+        }
+
+    def decode(self, data: Dict[str, Any]) -> T:
+        """Deserialize a dict produced by encode."""
+        return self.model(**{
+            name: decode(data[name])
+            for name, (_, decode) in self._fields.items()
+        })
+
+    def from_object(self, obj: Any) -> T:
+        """Build a read model from any object exposing the same attributes."""
+        return self.model(**{name: getattr(obj, name) for name in self._fields})
+
+
+# Every entry has a generation key next to it. Invalidations bump it; a
+# reader stores a value it loaded only if the generation is still the one it
+# read before loading.
+
+# KEYS[1]  entry, KEYS[2] generation
+# Returns  {generation, entry}
+_READ_SCRIPT = """
+return {redis.call('GET', KEYS[2]) or '0', redis.call('GET', KEYS[1])}
+"""
+
+# ARGV[1]  generation read before loading, ARGV[2] TTL, ARGV[3] entry
+_STORE_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[3], 'EX', ARGV[2])
+return 1
+"""
+
+# ARGV[1]  TTL
+_INVALIDATE_SCRIPT = """
+redis.call('DEL', KEYS[1])
+redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[1])
+return 1
+"""
+
+
+class CachedModel(NamedTuple):
+    """A cached read model (None on a miss) and the generation it was read at."""
+    instance: Optional[Any]
+    # Pass back to store; None if Redis is unavailable
+    generation: Optional[str]
+
+
+class ReadModelCache(Generic[T]):
+    """
+    Cache-aside store for one read model type.
+
+    Keys look like ``{namespace}:v{version}.{fingerprint}:{id}`` where the
+    version is the model's ``__cache_version__`` attribute.
+
+    Invalidations bump a per-entry generation, and store only caches a value
+    if the generation is still the one read returned before it was loaded.
+    """
+
+    def __init__(self, namespace: str, model: Type[T], ttl: int):
+        self.codec: ModelCodec[T] = ModelCodec(model)
+        self.ttl = ttl
+        version = getattr(model, "__cache_version__", 1)
+        self.prefix = f"{namespace}:v{version}.{self.codec.fingerprint}"
+
+    def key(self, id: Any) -> str:
+        """Build the cache key for an entity ID."""
+        return f"{self.prefix}:{id}"
+
+    def generation_key(self, id: Any) -> str:
+        """Build the key of an entry's generation."""
+        return f"{self.prefix}:gen:{id}"
+
+    def _keys(self, id: Any) -> List[str]:
+        return [self.key(id), self.generation_key(id)]
+
+    def _decode(self, id: Any, cached: Optional[Dict[str, Any]]) -> Optional[T]:
+        if not cached:
+            return None
+
+        try:
+            return self.codec.decode(cached)
+        except (KeyError, TypeError, ValueError, ArithmeticError) as e:
+            logger.warning(f"Discarding malformed cache entry {self.key(id)}: {e}")
+            return None
+
+    def _cached_model(self, id: Any, result: Optional[list]) -> CachedModel:
+        if not result:
+            return CachedModel(None, None)
+        generation, cached = result
+        try:
+            cached = json.loads(cached) if cached else None
+        except ValueError as e:
+            logger.warning(f"Discarding malformed cache entry {self.key(id)}: {e}")
+            cached = None
+        return CachedModel(self._decode(id, cached), generation)
+
+    def _store_args(self, instance: T, generation: Optional[str]) -> Optional[List[Any]]:
+        if generation is None:
+            return None
+        return [generation, self.ttl, json.dumps(self.codec.encode(instance))]
+
+    def get(self, id: Any) -> Optional[T]:
+        """Get a cached read model, or None on miss."""
+        return self._decode(id, redis_service.get(self.key(id)))
+
+    async def aget(self, id: Any) -> Optional[T]:
+        """Get a cached read model without blocking the event loop."""
+        return self._decode(id, await async_redis_service.get(self.key(id)))
+
+    def read(self, id: Any) -> CachedModel:
+        """Get a cached read model (None on miss) and the current generation."""
+        return self._cached_model(id, redis_service.run_script(_READ_SCRIPT, self._keys(id), []))
+
+    async def aread(self, id: Any) -> CachedModel:
+        """Get a cached read model and its generation without blocking the event loop."""
+        return self._cached_model(
+            id, await async_redis_service.run_script(_READ_SCRIPT, self._keys(id), [])
+        )
+
+    def set(self, id: Any, instance: T) -> bool:
+        """Store a read model unconditionally."""
+        return redis_service.set(self.key(id), self.codec.encode(instance), expire=self.ttl)
+
+    async def aset(self, id: Any, instance: T) -> bool:
+        """Store a read model unconditionally without blocking the event loop."""
+        return await async_redis_service.set(
+            self.key(id), self.codec.encode(instance), expire=self.ttl
+        )
+
+    def store(self, id: Any, instance: T, generation: Optional[str]) -> bool:
+        """Cache a read model loaded after read returned generation, unless it was invalidated since."""
+        args = self._store_args(instance, generation)
+        if args is None:
+            return False
+        return bool(redis_service.run_script(_STORE_SCRIPT, self._keys(id), args))
+
+    async def astore(self, id: Any, instance: T, generation: Optional[str]) -> bool:
+        """Cache a loaded read model without blocking the event loop."""
+        args = self._store_args(instance, generation)
+        if args is None:
+            return False
+        return bool(await async_redis_service.run_script(_STORE_SCRIPT, self._keys(id), args))
+
+    def invalidate(self, id: Any) -> bool:
+        """Drop a cached read model and bump its generation."""
+        return bool(redis_service.run_script(_INVALIDATE_SCRIPT, self._keys(id), [self.ttl]))
+
+    def get_or_load(self, id: Any, loader: Callable[[], Optional[Any]]) -> Optional[T]:
+        """
+        Return the cached read model, or call loader and populate the cache.
+
+        Args:
+            id: Entity ID
+            loader: Returns the source object (e.g. an ORM row) or None
+
+        Returns:
+            Read model or None if the entity does not exist
+        """
+        cached = self.read(id)
+        if cached.instance is not None:
+            return cached.instance
+
+        obj = loader()
+        if obj is None:
+            return None
+
+        instance = obj if isinstance(obj, self.codec.model) else self.codec.from_object(obj)
+        self.store(id, instance, cached.generation)
+        return instance
+
+    async def aget_or_load(
+        self,
+        id: Any,
+        loader: Callable[[], Awaitable[Optional[Any]]]
+    ) -> Optional[T]:
+        """
+        Async variant of get_or_load: loader is a coroutine function.
+
+        Args:
+            id: Entity ID
+            loader: Returns the source object (e.g. an ORM row) or None
+
+        Returns:
+            Read model or None if the entity does not exist
+        """
+        cached = await self.aread(id)
+        if cached.instance is not None:
+            return cached.instance
+
+        obj = await loader()
+        if obj is None:
+            return None
+
+        instance = obj if isinstance(obj, self.codec.model) else self.codec.from_object(obj)
+        await self.astore(id, instance, cached.generation)
+        return instance
+
+
+# Every list has a generation key next to it. Writers bump it; a reader
+# stores a list it loaded only if the generation is still the one it read
+# before loading, so a list missing a concurrent write is never cached.
+
+# KEYS[1]  list, KEYS[2] generation
+# Returns  {generation, elements}
+_LIST_READ_SCRIPT = """
+return {redis.call('GET', KEYS[2]) or '0', redis.call('LRANGE', KEYS[1], 0, -1)}
+"""
+
+# ARGV[1]  generation read before loading, ARGV[2] TTL, ARGV[3..] elements
+# Store a whole list, unless it changed or another reader got there first
+_LIST_STORE_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return 0
+end
+redis.call('RPUSH', KEYS[1], unpack(ARGV, 3))
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return 1
+"""
+
+# Bump the generation, then append to an existing list if the element sorts
+# after the current tail; otherwise (out-of-order element, or list at
+# capacity) drop the list so the next read rebuilds it
+_LIST_APPEND_SCRIPT = """
+redis.call('INCR', KEYS[2])
+redis.call('EXPIRE', KEYS[2], ARGV[5])
+local tail = redis.call('LINDEX', KEYS[1], -1)
+if not tail then
+    return 0
+end
+if redis.call('LLEN', KEYS[1]) >= tonumber(ARGV[4])
+    or ARGV[2] <= cjson.decode(tail)[ARGV[3]] then
+    redis.call('DEL', KEYS[1])
+    return -1
+end
+redis.call('RPUSHX', KEYS[1], ARGV[1])
+redis.call('EXPIRE', KEYS[1], ARGV[5])
+return 1
+"""
+
+# KEYS     list and generation of each list, in pairs
+# ARGV[1]  TTL
+# Drop the lists and bump their generations
+_LIST_INVALIDATE_SCRIPT = """
+for i = 1, #KEYS, 2 do
+    redis.call('DEL', KEYS[i])
+    redis.call('INCR', KEYS[i + 1])
+    redis.call('EXPIRE', KEYS[i + 1], ARGV[1])
+end
+return 1
+"""
+
+
+class CachedList(NamedTuple):
+    """A cached list (None on a miss) and the generation it was read at."""
+    items: Optional[List[Any]]
+    # Pass back to store; None if Redis is unavailable
+    generation: Optional[str]
+
+
+class ReadModelListCache(Generic[T]):
+    """
+    Cache of ordered, append-mostly lists of one read model type (e.g. a
+    shipment's event timeline), stored as Redis lists.
+
+    Lists are stored whole on a miss and then appended to as new elements
+    arrive rather than rebuilt. Elements are kept in ascending order of
+    order_field, which must be a datetime, str or other field whose encoded
+    form sorts as a string.
+
+    Appends and invalidations bump a per-list generation, and store only
+    caches a list if the generation is still the one get returned before
+    the list was loaded.
+    """
+
+    def __init__(self, namespace: str, model: Type[T], ttl: int, max_length: int, order_field: str):
+        self.codec: ModelCodec[T] = ModelCodec(model)
+        self.ttl = ttl
+        self.max_length = max_length
+        self.order_field = order_field
+        version = getattr(model, "__cache_version__", 1)
+        self.prefix = f"{namespace}:v{version}.{self.codec.fingerprint}"
+
+    def key(self, id: Any) -> str:
+        """Build the cache key for an owning entity ID."""
+        return f"{self.prefix}:{id}"
+
+    def generation_key(self, id: Any) -> str:
+        """Build the key of a list's generation."""
+        return f"{self.prefix}:gen:{id}"
+
+    def _keys(self, id: Any) -> List[str]:
+        return [self.key(id), self.generation_key(id)]
+
+    def _decode(self, id: Any, cached: Optional[list]) -> Optional[List[T]]:
+        if not cached:
+            return None
+
+        try:
+            return [self.codec.decode(json.loads(item)) for item in cached]
+        except (KeyError, TypeError, ValueError, ArithmeticError) as e:
+            logger.warning(f"Discarding malformed cache entry {self.key(id)}: {e}")
+            return None
+
+    def _cached_list(self, id: Any, result: Optional[list]) -> CachedList:
+        if not result:
+            return CachedList(None, None)
+        generation, cached = result
+        return CachedList(self._decode(id, cached), generation)
+
+    def _store_args(self, items: List[T], generation: Optional[str]) -> Optional[List[Any]]:
+        if generation is None or not items or len(items) > self.max_length:
+            return None
+        return [generation, self.ttl] + [json.dumps(self.codec.encode(item)) for item in items]
+
+    def get(self, id: Any) -> CachedList:
+        """Get a cached list (None on miss) and the current generation."""
+        return self._cached_list(id, redis_service.run_script(_LIST_READ_SCRIPT, self._keys(id), []))
+
+    async def aget(self, id: Any) -> CachedList:
+        """Get a cached list without blocking the event loop."""
+        return self._cached_list(
+            id, await async_redis_service.run_script(_LIST_READ_SCRIPT, self._keys(id), [])
+        )
+
+    def store(self, id: Any, items: List[T], generation: Optional[str]) -> bool:
+        """
+        Cache a complete list loaded after get returned generation, unless
+        it was written since or a list is already cached.
+
+        Empty lists and lists longer than max_length are not cached.
+        """
+        args = self._store_args(items, generation)
+        if args is None:
+            return False
+        return bool(redis_service.run_script(_LIST_STORE_SCRIPT, self._keys(id), args))
+
+    async def astore(self, id: Any, items: List[T], generation: Optional[str]) -> bool:
+        """Cache a complete list without blocking the event loop."""
+        args = self._store_args(items, generation)
+        if args is None:
+            return False
+        return bool(await async_redis_service.run_script(_LIST_STORE_SCRIPT, self._keys(id), args))
+
+    def append(self, id: Any, item: T) -> bool:
+        """
+        Append an element to a cached list.
+
+        Does nothing if the list is not cached. Drops the list if the
+        element would not be last in order or the list is full.
+
+        Returns:
+            True if the element was appended
+        """
+        encoded = self.codec.encode(item)
+        result = redis_service.run_script(
+            _LIST_APPEND_SCRIPT,
+            self._keys(id),
+            [json.dumps(encoded), encoded[self.order_field], self.order_field, self.max_length, self.ttl]
+        )
+        return result == 1
+
+    def invalidate(self, id: Any) -> bool:
+        """Drop a cached list."""
+        return self.invalidate_many([id])
+
+    def invalidate_many(self, ids: Iterable[Any]) -> bool:
+        """Drop several cached lists in one round trip."""
+        keys = [key for id in ids for key in self._keys(id)]
+        if not keys:
+            return True
+        return bool(redis_service.run_script(_LIST_INVALIDATE_SCRIPT, keys, [self.ttl]))
@@ -0,0 +1,97 @@
+"""
+Circuit breaker for calls to external dependencies (Redis).
+
+CLOSED: calls go through; consecutive failures are counted.
+OPEN: calls are rejected immediately until the recovery timeout elapses.
+HALF_OPEN: a single trial call is let through; success closes the circuit,
+failure opens it again.
+"""
+from typing import Callable, List
+import enum
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, enum.Enum):
+    """Circuit breaker state enumeration."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Thread-safe circuit breaker with a cheap open-state fast path."""
+
+    def __init__(self, name: str, failure_threshold: int, recovery_timeout: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+        self._open_listeners: List[Callable[[], None]] = []
+
+    @property
+    def state(self) -> CircuitState:
+        """Current circuit state."""
+        return self._state
+
+    def on_open(self, callback: Callable[[], None]) -> None:
+        """Register a callback invoked each time the circuit opens."""
+        self._open_listeners.append(callback)
+
+    def allow_request(self) -> bool:
+        """
+        Check whether a call may proceed.
+
+        Returns:
+            True if the circuit is closed, or if this caller is the
+            half-open trial; False otherwise
+        """
+        state = self._state
+        if state is CircuitState.CLOSED:
+            return True
+        if state is CircuitState.OPEN and time.monotonic() < self._retry_at:
+            return False
+
+        with self._lock:
+            if self._state is CircuitState.OPEN and time.monotonic() >= self._retry_at:
+                self._state = CircuitState.HALF_OPEN
+                return True
+            return self._state is CircuitState.CLOSED
+
+    def record_success(self) -> None:
+        """Record a successful call, closing the circuit."""
+        if self._state is CircuitState.CLOSED and self._failures == 0:
+            return
+
+        with self._lock:
+            if self._state is not CircuitState.CLOSED:
+                logger.info(f"✓ Circuit '{self.name}' closed")
+            self._state = CircuitState.CLOSED
+            self._failures = 0
+
+    def record_failure(self) -> None:
+        """Record a failed call, opening the circuit past the threshold."""
+        opened = False
+        with self._lock:
+            self._failures += 1
+            if (
+                self._state is CircuitState.HALF_OPEN
+                or (self._state is CircuitState.CLOSED and self._failures >= self.failure_threshold)
+            ):
+                self._state = CircuitState.OPEN
+                self._retry_at = time.monotonic() + self.recovery_timeout
+                opened = True
+
+        if opened:
+            logger.warning(
+                f"⚠ Circuit '{self.name}' opened after {self._failures} failures; "
+                f"retrying in {self.recovery_timeout}s"
+            )
+            for callback in self._open_listeners:
+                callback()
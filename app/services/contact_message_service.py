@@ -1,15 +1,18 @@
 """
 Contact message CRUD service with SQL injection protection.
 """
-from typing import List, Optional, Tuple
+from typing import Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import desc
+from sqlalchemy import select
 from uuid import UUID
 from datetime import datetime
 import logging
 
 from app.models.contact_message import ContactMessage, MessageStatus
 from app.schemas.contact_message import ContactMessageCreate, ContactMessageUpdate
+from app.services.listing_counts import fetch_page
+from app.services.stats_service import stats_service, message_contribution
+from app.utils.pagination import CountMode, Page
 
 logger = logging.getLogger(__name__)
 
@@ -32,21 +35,20 @@ class ContactMessageService:
         db: Session,
         skip: int = 0,
         limit: int = 100,
-        status: Optional[MessageStatus] = None
-    ) -> Tuple[List[ContactMessage], int]:
+        status: Optional[MessageStatus] = None,
+        count: CountMode = CountMode.EXACT
+    ) -> Page:
         """
         Get all contact messages with pagination.
+        count selects how the total is computed.
         SQLAlchemy ORM prevents SQL injection.
         """
-        query = db.query(ContactMessage)
+        stmt = select(ContactMessage)
         
         if status:
-            query = query.filter(ContactMessage.status == status)
+            stmt = stmt.where(ContactMessage.status == status)
         
-        total = query.count()
-        messages = query.order_by(desc(ContactMessage.created_at)).offset(skip).limit(limit).all()
-        
-        return messages, total
+        return fetch_page(db, stmt, ContactMessage, skip, limit, count=count)
     
     @staticmethod
     def create(
@@ -60,6 +62,8 @@ class ContactMessageService:
         db_message = ContactMessage(**message_in.model_dump())
         
         db.add(db_message)
+        db.flush()
+        stats_service.record(db, None, message_contribution(db_message))
         db.commit()
         db.refresh(db_message)
         
@@ -80,6 +84,8 @@ class ContactMessageService:
         if not message:
             return None
         
+        before = message_contribution(message)
+        
         # Update fields
         update_data = message_in.model_dump(exclude_unset=True)
         for field, value in update_data.items():
@@ -89,6 +95,7 @@ class ContactMessageService:
         if message_in.status and message.status == MessageStatus.NEW:
             message.read_at = datetime.utcnow()
         
+        stats_service.record(db, before, message_contribution(message))
         db.commit()
         db.refresh(message)
         
@@ -0,0 +1,142 @@
+"""
+Dashboard service: per-user stats in one aggregate query, cached in Redis.
+
+All shipment stats come from a single pass over the user's shipments using
+FILTER clauses, with the pending quote count and the archived shipment
+totals as scalar subqueries. The
+result and the recent shipments are cached per user as a DashboardSnapshot
+and invalidated by shipment and quote writes.
+"""
+from uuid import UUID
+import logging
+
+from sqlalchemy import Select, desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.shipment import Shipment, ShipmentStatus, ACTIVE_SHIPMENT_STATUSES
+from app.models.quote import Quote, QuoteStatus
+from app.models.archive import ArchivedShipment
+from app.services.cache import ModelCodec, ReadModelCache
+from app.services.read_models import DashboardSnapshot, ShipmentSnapshot
+
+logger = logging.getLogger(__name__)
+
+RECENT_SHIPMENTS = 10
+
+dashboard_cache: ReadModelCache[DashboardSnapshot] = ReadModelCache(
+    "dashboard", DashboardSnapshot, settings.DASHBOARD_CACHE_TTL_SECONDS
+)
+_shipment_codec = ModelCodec(ShipmentSnapshot)
+
+
+class DashboardService:
+    """Dashboard read operations."""
+
+    @staticmethod
+    def stats_statement(user_id: UUID) -> Select:
+        """
+        Build the single-row dashboard stats query.
+        SQLAlchemy ORM prevents SQL injection.
+        """
+        pending_quotes = select(func.count()).where(
+            Quote.user_id == user_id,
+            Quote.status == QuoteStatus.PENDING
+        ).scalar_subquery()
+
+        # Archived shipments are finished: they only add to delivered and spent
+        archived_delivered = select(func.count()).where(
+            ArchivedShipment.user_id == user_id,
+            ArchivedShipment.status == ShipmentStatus.DELIVERED
+        ).scalar_subquery()
+        archived_spent = select(
+            func.coalesce(func.sum(ArchivedShipment.actual_cost), 0)
+        ).where(ArchivedShipment.user_id == user_id).scalar_subquery()
+
+        return select(
+            func.count().filter(
+                Shipment.status.in_(ACTIVE_SHIPMENT_STATUSES)
+            ).label("active_shipments"),
+            (
+                func.count().filter(Shipment.status == ShipmentStatus.DELIVERED)
+                + archived_delivered
+            ).label("delivered_shipments"),
+            (
+                func.coalesce(func.sum(Shipment.actual_cost), 0) + archived_spent
+            ).label("total_spent"),
+            pending_quotes.label("pending_quotes"),
+        ).where(Shipment.user_id == user_id)
+
+    @staticmethod
+    def recent_shipments_statement(user_id: UUID) -> Select:
+        """Build the recent shipments query."""
+        return (
+            select(Shipment)
+            .where(Shipment.user_id == user_id)
+            .order_by(desc(Shipment.created_at), desc(Shipment.id))
+            .limit(RECENT_SHIPMENTS)
+        )
+
+    @staticmethod
+    def build_snapshot(stats, recent_shipments) -> DashboardSnapshot:
+        """Assemble a snapshot from a stats row and shipment rows."""
+        return DashboardSnapshot(
+            active_shipments=stats.active_shipments,
+            delivered_shipments=stats.delivered_shipments,
+            total_spent=stats.total_spent,
+            pending_quotes=stats.pending_quotes,
+            recent_shipments=tuple(
+                _shipment_codec.from_object(shipment) for shipment in recent_shipments
+            ),
+        )
+
+    @staticmethod
+    def load(db: Session, user_id: UUID) -> DashboardSnapshot:
+        """
+        Load a user's dashboard from the database.
+        SQLAlchemy ORM prevents SQL injection.
+        """
+        stats = db.execute(DashboardService.stats_statement(user_id)).one()
+        recent = db.scalars(DashboardService.recent_shipments_statement(user_id)).all()
+        return DashboardService.build_snapshot(stats, recent)
+
+    @staticmethod
+    def get_snapshot(db: Session, user_id: UUID) -> DashboardSnapshot:
+        """Get a user's dashboard, served from cache when possible."""
+        return dashboard_cache.get_or_load(
+            user_id,
+            lambda: DashboardService.load(db, user_id)
+        )
+
+    @staticmethod
+    def invalidate(user_id: UUID) -> None:
+        """Drop a user's cached dashboard. Call after shipment or quote writes."""
+        dashboard_cache.invalidate(user_id)
+
+
+class AsyncDashboardService:
+    """Dashboard read operations on an AsyncSession."""
+
+    @staticmethod
+    async def load(db: AsyncSession, user_id: UUID) -> DashboardSnapshot:
+        """
+        Load a user's dashboard from the database.
+        SQLAlchemy ORM prevents SQL injection.
+        """
+        stats = (await db.execute(DashboardService.stats_statement(user_id))).one()
+        recent = (await db.scalars(DashboardService.recent_shipments_statement(user_id))).all()
+        return DashboardService.build_snapshot(stats, recent)
+
+    @staticmethod
+    async def get_snapshot(db: AsyncSession, user_id: UUID) -> DashboardSnapshot:
+        """Get a user's dashboard, served from cache when possible."""
+        return await dashboard_cache.aget_or_load(
+            user_id,
+            lambda: AsyncDashboardService.load(db, user_id)
+        )
+
+
+# Global dashboard service instances
+dashboard_service = DashboardService()
+async_dashboard_service = AsyncDashboardService()
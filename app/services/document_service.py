@@ -0,0 +1,228 @@
+"""
+Shipping document service with SQL injection protection via SQLAlchemy ORM.
+
+Documents are deduplicated by content: attaching a document whose SHA-256
+is already stored only adds a reference, so after hashing a repeated
+upload costs a storage existence check and two small writes, not a copy.
+
+Reference counting and garbage collection:
+- attach upserts the Document row first, which locks it until commit,
+  then links it to the shipment and increments ref_count, and last
+  stores the blob if it is missing. If the commit fails, a blob stored
+  for a row this call created is deleted again, so it is not orphaned.
+- detach removes the link and decrements ref_count; blobs are never
+  deleted inline.
+- collect_garbage deletes documents that have been unreferenced for
+  DOCUMENT_GC_GRACE_SECONDS, with their blobs, before committing. A
+  concurrent attach of the same content waits on the row lock and then
+  finds the blob missing, so it stores it again.
+"""
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+from uuid import UUID
+import logging
+import uuid
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.document import Document, ShipmentDocument
+from app.services.document_storage import DocumentStorage, document_storage
+from app.utils.uploads import StoredUpload
+
+logger = logging.getLogger(__name__)
+
+
+class DocumentService:
+    """Shipment document operations on a content-addressed storage."""
+
+    def __init__(self, storage: DocumentStorage):
+        self.storage = storage
+
+    def staging_path(self) -> Path:
+        """Path to stream a new upload to before attach."""
+        return self.storage.staging_path()
+
+    def attach(
+        self,
+        db: Session,
+        shipment_id: UUID,
+        user_id: Optional[UUID],
+        upload: StoredUpload,
+        filename: str,
+        content_type: Optional[str] = None
+    ) -> ShipmentDocument:
+        """
+        Attach a staged upload to a shipment, storing its content only if
+        it is new. Attaching the same content to a shipment twice returns
+        the existing attachment. The staged file is always consumed.
+        SQLAlchemy ORM prevents SQL injection.
+        """
+        digest = upload.sha256
+        now = datetime.utcnow()
+        stored = False
+        try:
+            # Insert or lock the document row before touching the blob
+            created = db.scalar(
+                insert(Document)
+                .values(
+                    sha256=digest,
+                    size=upload.size,
+                    content_type=content_type,
+                    ref_count=0,
+                    created_at=now,
+                    updated_at=now
+                )
+                .on_conflict_do_update(
+                    index_elements=[Document.sha256],
+                    set_={"updated_at": now}
+                )
+                .returning(Document.created_at)
+            ) == now
+
+            attachment_id = db.scalar(
+                insert(ShipmentDocument)
+                .values(
+                    id=uuid.uuid4(),
+                    shipment_id=shipment_id,
+                    document_sha256=digest,
+                    uploaded_by=user_id,
+                    filename=filename,
+                    created_at=now
+                )
+                .on_conflict_do_nothing(
+                    index_elements=[ShipmentDocument.shipment_id, ShipmentDocument.document_sha256]
+                )
+                .returning(ShipmentDocument.id)
+            )
+            if attachment_id is not None:
+                db.execute(
+                    update(Document)
+                    .where(Document.sha256 == digest)
+                    .values(ref_count=Document.ref_count + 1)
+                )
+
+            # Store the blob last, still under the row lock
+            if self.storage.exists(digest):
+                logger.debug(f"Document content already stored: {digest}")
+            else:
+                self.storage.put(digest, upload.path)
+                stored = True
+
+            db.commit()
+        except Exception:
+            # Only the new row would have referenced the blob
+            if stored and created:
+                try:
+                    self.storage.delete(digest)
+                except Exception as e:
+                    logger.warning(f"⚠ Could not delete orphaned document {digest}: {e}")
+            db.rollback()
+            raise
+        finally:
+            upload.path.unlink(missing_ok=True)
+
+        attachment = db.scalar(
+            select(ShipmentDocument).where(
+                ShipmentDocument.shipment_id == shipment_id,
+                ShipmentDocument.document_sha256 == digest
+            )
+        )
+        logger.info(f"Document attached: {digest} to {shipment_id}")
+        return attachment
+
+    @staticmethod
+    def get_attachment(
+        db: Session,
+        shipment_id: UUID,
+        attachment_id: UUID
+    ) -> Optional[ShipmentDocument]:
+        """
+        Get a shipment's attachment by ID.
+        SQLAlchemy ORM prevents SQL injection.
+        """
+        return db.scalar(
+            select(ShipmentDocument).where(
+                ShipmentDocument.id == attachment_id,
+                ShipmentDocument.shipment_id == shipment_id
+            )
+        )
+
+    @staticmethod
+    def get_shipment_documents(db: Session, shipment_id: UUID) -> List[ShipmentDocument]:
+        """
+        Get a shipment's attachments, oldest first.
+        SQLAlchemy ORM prevents SQL injection.
+        """
+        return list(db.scalars(
+            select(ShipmentDocument)
+            .where(ShipmentDocument.shipment_id == shipment_id)
+            .order_by(ShipmentDocument.created_at, ShipmentDocument.id)
+        ))
+
+    @staticmethod
+    def detach(db: Session, shipment_id: UUID, attachment_id: UUID) -> bool:
+        """
+        Remove an attachment and release its document reference.
+        SQLAlchemy ORM prevents SQL injection.
+
+        Returns:
+            False if the attachment does not exist
+        """
+        try:
+            digest = db.scalar(
+                delete(ShipmentDocument)
+                .where(
+                    ShipmentDocument.id == attachment_id,
+                    ShipmentDocument.shipment_id == shipment_id
+                )
+                .returning(ShipmentDocument.document_sha256)
+            )
+            if digest is None:
+                db.rollback()
+                return False
+
+            db.execute(
+                update(Document)
+                .where(Document.sha256 == digest)
+                .values(ref_count=Document.ref_count - 1, updated_at=datetime.utcnow())
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        logger.info(f"Document detached: {digest} from {shipment_id}")
+        return True
+
+    def collect_garbage(self, db: Session, grace_seconds: int) -> int:
+        """
+        Delete documents unreferenced for grace_seconds, rows and blobs.
+
+        Returns:
+            Number of documents deleted
+        """
+        cutoff = datetime.utcnow() - timedelta(seconds=grace_seconds)
+        try:
+            digests = list(db.scalars(
+                delete(Document)
+                .where(Document.ref_count <= 0, Document.updated_at < cutoff)
+                .returning(Document.sha256)
+            ))
+            # Blobs go while the rows are still locked (see module docstring)
+            for digest in digests:
+                self.storage.delete(digest)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        if digests:
+            logger.info(f"✓ Deleted {len(digests)} unreferenced documents")
+        return len(digests)
+
+
+# Global document service instance
+document_service = DocumentService(document_storage)
@@ -0,0 +1,179 @@
+"""
+Content-addressed storage for shipping documents.
+
+Blobs are stored once per content, keyed by their SHA-256 hex digest and
+sharded as ab/cd/abcd... so no directory (or S3 prefix) grows unbounded.
+Which documents exist and how often they are referenced is tracked in the
+database (see app/services/document_service.py); storages only hold bytes.
+
+Backends:
+- LocalDocumentStorage: a directory tree; staged uploads are moved into
+  place with an atomic rename.
+- S3DocumentStorage: any S3-compatible service (AWS, MinIO, moto), picked
+  with DOCUMENT_STORAGE_BACKEND=s3. Needs boto3, which is optional.
+  Downloads are redirected to presigned URLs instead of being proxied.
+"""
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Optional
+import logging
+import os
+import tempfile
+import uuid
+
+try:
+    import boto3
+    from botocore.exceptions import ClientError
+except ImportError:  # Only needed for the S3 backend
+    boto3 = None
+    ClientError = None
+
+from app.core.config import settings
+from app.utils.downloads import content_disposition
+
+logger = logging.getLogger(__name__)
+
+
+def shard_key(digest: str) -> str:
+    """Relative storage key of a blob: ab/cd/abcd..."""
+    return f"{digest[:2]}/{digest[2:4]}/{digest}"
+
+
+class DocumentStorage(ABC):
+    """Blob store keyed by SHA-256 digest."""
+
+    @abstractmethod
+    def staging_path(self) -> Path:
+        """New path to write an upload to before it is stored with put."""
+
+    @abstractmethod
+    def exists(self, digest: str) -> bool:
+        """Whether a blob is stored."""
+
+    @abstractmethod
+    def put(self, digest: str, path: Path) -> None:
+        """Store the staged file at path as a blob; the staged file is consumed."""
+
+    @abstractmethod
+    def delete(self, digest: str) -> None:
+        """Delete a blob (no error if it is missing)."""
+
+    def local_path(self, digest: str) -> Optional[Path]:
+        """Filesystem path to serve a blob from, for backends that have one."""
+        return None
+
+    def download_url(self, digest: str, filename: str, content_type: Optional[str] = None) -> Optional[str]:
+        """Short-lived URL to redirect downloads to, for backends that have one."""
+        return None
+
+
+class LocalDocumentStorage(DocumentStorage):
+    """Blobs in a local directory tree."""
+
+    def __init__(self, root: Path):
+        self.root = root
+        # Staged files live under the root, so put is a same-filesystem rename
+        self.staging_dir = root / ".staging"
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+
+    def path(self, digest: str) -> Path:
+        """Filesystem path of a blob."""
+        return self.root / shard_key(digest)
+
+    def staging_path(self) -> Path:
+        return self.staging_dir / uuid.uuid4().hex
+
+    def exists(self, digest: str) -> bool:
+        return self.path(digest).is_file()
+
+    def put(self, digest: str, path: Path) -> None:
+        target = self.path(digest)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(path, target)
+
+    def delete(self, digest: str) -> None:
+        self.path(digest).unlink(missing_ok=True)
+
+    def local_path(self, digest: str) -> Optional[Path]:
+        return self.path(digest)
+
+
+class S3DocumentStorage(DocumentStorage):
+    """Blobs in an S3-compatible bucket."""
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        region: Optional[str] = None,
+        client=None
+    ):
+        if client is None:
+            if boto3 is None:
+                raise RuntimeError("boto3 is required for the S3 document storage backend")
+            client = boto3.client("s3", endpoint_url=endpoint_url, region_name=region)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.staging_dir = Path(tempfile.gettempdir()) / "globalship-staging"
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+
+    def object_key(self, digest: str) -> str:
+        """Object key of a blob."""
+        return f"{self.prefix}{shard_key(digest)}"
+
+    def staging_path(self) -> Path:
+        return self.staging_dir / uuid.uuid4().hex
+
+    def exists(self, digest: str) -> bool:
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self.object_key(digest))
+        except ClientError as e:
+            if e.response["Error"]["Code"] in ("404", "NoSuchKey", "NotFound"):
+                return False
+            raise
+        return True
+
+    def put(self, digest: str, path: Path) -> None:
+        try:
+            self.client.upload_file(str(path), self.bucket, self.object_key(digest))
+        finally:
+            path.unlink(missing_ok=True)
+
+    def delete(self, digest: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self.object_key(digest))
+
+    def download_url(self, digest: str, filename: str, content_type: Optional[str] = None) -> Optional[str]:
+        # S3 answers Range and conditional requests on the presigned URL itself
+        params = {
+            "Bucket": self.bucket,
+            "Key": self.object_key(digest),
+            "ResponseContentDisposition": content_disposition(filename),
+        }
+        if content_type:
+            params["ResponseContentType"] = content_type
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params=params,
+            ExpiresIn=settings.DOCUMENT_URL_EXPIRE_SECONDS
+        )
+
+
+def create_document_storage() -> DocumentStorage:
+    """Build the storage selected by DOCUMENT_STORAGE_BACKEND."""
+    backend = settings.DOCUMENT_STORAGE_BACKEND
+    if backend == "local":
+        return LocalDocumentStorage(Path(settings.DOCUMENT_STORAGE_PATH))
+    if backend == "s3":
+        return S3DocumentStorage(
+            settings.DOCUMENT_S3_BUCKET,
+            prefix=settings.DOCUMENT_S3_PREFIX,
+            endpoint_url=settings.DOCUMENT_S3_ENDPOINT_URL,
+            region=settings.DOCUMENT_S3_REGION,
+        )
+    raise ValueError(f"Unknown document storage backend: {backend}")
+
+
+# Global document storage instance
+document_storage = create_document_storage()
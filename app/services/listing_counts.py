@@ -0,0 +1,238 @@
+"""
+Page fetching with selectable total-count strategies.
+
+fetch_page/afetch_page run a listing query and compute its total according
+to a CountMode:
+
+- EXACT: count(*) OVER () in the page query (one round trip)
+- ESTIMATED: the planner's row estimate from EXPLAIN (no scan)
+- CACHED: an exact count kept in Redis per owner, invalidated on writes
+  (see ListingCounter)
+- NONE: no total
+"""
+from typing import Any, NamedTuple, Optional, Sequence
+from uuid import UUID
+import logging
+
+from sqlalchemy import Select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.services.redis_service import redis_service
+from app.services.async_redis_service import async_redis_service
+from app.utils.pagination import (
+    CountMode,
+    Explain,
+    Page,
+    count_statement,
+    paginate,
+    paginate_with_total,
+    planned_rows,
+    split_page,
+)
+
+logger = logging.getLogger(__name__)
+
+
+# KEYS[1]  owner's totals hash (fields: one per variant, plus generation)
+# ARGV[1]  variant
+# Returns  {generation, total or nil}
+READ_TOTAL_LUA = """
+local values = redis.call('HMGET', KEYS[1], 'generation', ARGV[1])
+return {values[1] or '0', values[2]}
+"""
+
+# ARGV[1]  variant
+# ARGV[2]  total
+# ARGV[3]  generation read before the total was counted
+# ARGV[4]  TTL in seconds
+# Returns  1 if stored, 0 if the totals were invalidated meanwhile
+STORE_TOTAL_LUA = """
+if (redis.call('HGET', KEYS[1], 'generation') or '0') ~= ARGV[3] then
+    return 0
+end
+redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[4]))
+return 1
+"""
+
+# ARGV[1]  TTL in seconds
+# Drops every variant's total and bumps the generation
+INVALIDATE_LUA = """
+local generation = (tonumber(redis.call('HGET', KEYS[1], 'generation')) or 0) + 1
+redis.call('DEL', KEYS[1])
+redis.call('HSET', KEYS[1], 'generation', generation)
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[1]))
+return generation
+"""
+
+
+class CachedTotal(NamedTuple):
+    """A cached total (None on a miss) and the generation it was read at."""
+    total: Optional[int]
+    # Pass back to set; None if Redis is unavailable
+    generation: Optional[str]
+
+
+class ListingCounter:
+    """
+    Exact listing totals cached in Redis, one hash per owner.
+
+    Each hash holds the totals of every filter variant of that owner's
+    listing (e.g. per status) as fields, so invalidating clears them all.
+    It also holds a generation that invalidate bumps: set only stores a
+    total if the generation is still the one read before counting, so a
+    count that raced with a write is never cached.
+    """
+
+    def __init__(self, namespace: str, ttl: int):
+        self.namespace = namespace
+        self.ttl = ttl
+
+    def key(self, owner_id: UUID) -> str:
+        """Build the Redis key for an owner's totals."""
+        return f"counts:{self.namespace}:{owner_id}"
+
+    @staticmethod
+    def _cached_total(result: Optional[list]) -> CachedTotal:
+        if not result:
+            return CachedTotal(None, None)
+        generation, total = result
+        return CachedTotal(int(total) if total is not None else None, generation)
+
+    def get(self, owner_id: UUID, variant: str) -> CachedTotal:
+        """Get a cached total and the current generation."""
+        return self._cached_total(
+            redis_service.run_script(READ_TOTAL_LUA, [self.key(owner_id)], [variant])
+        )
+
+    async def aget(self, owner_id: UUID, variant: str) -> CachedTotal:
+        """Get a cached total without blocking the event loop."""
+        return self._cached_total(
+            await async_redis_service.run_script(READ_TOTAL_LUA, [self.key(owner_id)], [variant])
+        )
+
+    def set(self, owner_id: UUID, variant: str, total: int, generation: Optional[str]) -> None:
+        """Cache a total counted after get returned generation."""
+        if generation is None:
+            return
+        redis_service.run_script(
+            STORE_TOTAL_LUA, [self.key(owner_id)], [variant, total, generation, self.ttl]
+        )
+
+    async def aset(self, owner_id: UUID, variant: str, total: int, generation: Optional[str]) -> None:
+        """Cache a total without blocking the event loop."""
+        if generation is None:
+            return
+        await async_redis_service.run_script(
+            STORE_TOTAL_LUA, [self.key(owner_id)], [variant, total, generation, self.ttl]
+        )
+
+    def invalidate(self, owner_id: UUID) -> None:
+        """Drop all cached totals for an owner. Call after writes."""
+        redis_service.run_script(INVALIDATE_LUA, [self.key(owner_id)], [self.ttl])
+
+
+class CountScope(NamedTuple):
+    """Where a CACHED total lives: counter, owner and filter variant."""
+    counter: ListingCounter
+    owner_id: UUID
+    variant: str
+
+
+def fetch_page(
+    db: Session,
+    stmt: Select,
+    model: Any,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    count: CountMode = CountMode.EXACT,
+    scope: Optional[CountScope] = None,
+    fields: Optional[Sequence[str]] = None
+) -> Page:
+    """
+    Fetch one page of a listing with its total.
+
+    Args:
+        db: Database session
+        stmt: Filtered select over model (unordered, unpaginated)
+        model: Mapped class with created_at and id columns
+        skip: Number of rows to skip (ignored when cursor is given)
+        limit: Page size
+        cursor: Cursor returned with the previous page
+        count: How to compute the total
+        scope: Cache location for CountMode.CACHED; without one, CACHED
+            behaves like EXACT
+        fields: Only load these attributes of model (sparse fieldset)
+    """
+    if count is CountMode.EXACT or (count is CountMode.CACHED and scope is None):
+        rows = db.execute(paginate_with_total(stmt, model, skip, limit, cursor, fields)).all()
+        items, next_cursor = split_page([row[0] for row in rows], limit)
+        if rows:
+            total = rows[0].total
+        elif skip or cursor:
+            # Past the last row: the window has nothing to report
+            total = db.scalar(count_statement(stmt))
+        else:
+            total = 0
+        return Page(items, total, next_cursor)
+
+    rows = db.scalars(paginate(stmt, model, skip, limit, cursor, fields)).all()
+    items, next_cursor = split_page(rows, limit)
+
+    total = None
+    if count is CountMode.ESTIMATED:
+        total = planned_rows(db.scalar(Explain(stmt)))
+    elif count is CountMode.CACHED:
+        total, generation = scope.counter.get(scope.owner_id, scope.variant)
+        if total is None:
+            total = db.scalar(count_statement(stmt))
+            scope.counter.set(scope.owner_id, scope.variant, total, generation)
+
+    return Page(items, total, next_cursor)
+
+
+async def afetch_page(
+    db: AsyncSession,
+    stmt: Select,
+    model: Any,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    count: CountMode = CountMode.EXACT,
+    scope: Optional[CountScope] = None,
+    fields: Optional[Sequence[str]] = None
+) -> Page:
+    """Async variant of fetch_page."""
+    if count is CountMode.EXACT or (count is CountMode.CACHED and scope is None):
+        rows = (await db.execute(paginate_with_total(stmt, model, skip, limit, cursor, fields))).all()
+        items, next_cursor = split_page([row[0] for row in rows], limit)
+        if rows:
+            total = rows[0].total
+        elif skip or cursor:
+            # Past the last row: the window has nothing to report
+            total = await db.scalar(count_statement(stmt))
+        else:
+            total = 0
+        return Page(items, total, next_cursor)
+
+    rows = (await db.scalars(paginate(stmt, model, skip, limit, cursor, fields))).all()
+    items, next_cursor = split_page(rows, limit)
+
+    total = None
+    if count is CountMode.ESTIMATED:
+        total = planned_rows(await db.scalar(Explain(stmt)))
+    elif count is CountMode.CACHED:
+        total, generation = await scope.counter.aget(scope.owner_id, scope.variant)
+        if total is None:
+            total = await db.scalar(count_statement(stmt))
+            await scope.counter.aset(scope.owner_id, scope.variant, total, generation)
+
+    return Page(items, total, next_cursor)
+
+
+# Global listing counters
+shipment_counts = ListingCounter("shipments", settings.LISTING_COUNT_CACHE_TTL_SECONDS)
+quote_counts = ListingCounter("quotes", settings.LISTING_COUNT_CACHE_TTL_SECONDS)
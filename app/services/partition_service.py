@@ -0,0 +1,187 @@
+"""
+Monthly partitions of the shipment_events table.
+
+shipment_events is partitioned by RANGE (timestamp), with one partition per
+calendar month named shipment_events_pYYYYMM and a default partition
+(shipment_events_default) for timestamps outside every month partition.
+
+- ensure_partitions creates month partitions ahead of time. If the default
+  partition already holds rows for a new month, they are moved into it.
+- apply_retention detaches partitions older than the retention window and
+  optionally drops them. Detached partitions stay behind as plain tables,
+  which can be archived with pg_dump. Their copy of the foreign key to
+  shipments is dropped, so they never block deleting or archiving a
+  shipment.
+
+Expiring data this way is a catalog change, not a mass DELETE, so it
+leaves no dead tuples for vacuum. Old partitions stop changing, so after
+one freeze autovacuum only has to work on the recent partitions.
+
+Table names and bounds are built from dates only, never from input.
+"""
+from datetime import date, datetime
+from typing import Dict, List, Optional
+import logging
+import re
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+EVENTS_TABLE = "shipment_events"
+DEFAULT_PARTITION = f"{EVENTS_TABLE}_default"
+_PARTITION_NAME = re.compile(rf"^{EVENTS_TABLE}_p(\d{{4}})(\d{{2}})$")
+
+
+def add_months(month: date, months: int) -> date:
+    """First day of the month `months` after (or before) month."""
+    years, index = divmod(month.month - 1 + months, 12)
+    return date(month.year + years, index + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Name of the partition holding a month's events."""
+    return f"{EVENTS_TABLE}_p{month:%Y%m}"
+
+
+class PartitionService:
+    """Creation and retention of shipment_events month partitions."""
+
+    @staticmethod
+    def list_partitions(db: Session) -> Dict[date, str]:
+        """Get the attached month partitions by the first day of their month."""
+        names = db.scalars(text("""
+            SELECT child.relname
+            FROM pg_inherits
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE pg_inherits.inhparent = CAST(:parent AS regclass)
+        """), {"parent": EVENTS_TABLE})
+
+        partitions = {}
+        for name in names:
+            match = _PARTITION_NAME.match(name)
+            if match:
+                partitions[date(int(match.group(1)), int(match.group(2)), 1)] = name
+        return dict(sorted(partitions.items()))
+
+    @staticmethod
+    def _drop_foreign_keys(db: Session, table: str) -> None:
+        """Drop a (detached) table's foreign key constraints."""
+        constraints = db.scalars(text("""
+            SELECT conname
+            FROM pg_constraint
+            WHERE conrelid = CAST(:table AS regclass) AND contype = 'f'
+        """), {"table": table}).all()
+        for constraint in constraints:
+            quoted = constraint.replace('"', '""')
+            db.execute(text(f'ALTER TABLE {table} DROP CONSTRAINT "{quoted}"'))
+
+    @staticmethod
+    def create_partition(db: Session, month: date) -> str:
+        """
+        Create the partition for a month and commit.
+
+        A month partition can't be created while the default partition holds
+        rows in its range. If it does, the default is detached, the new
+        partition is created and filled from it, and the default is
+        reattached, all in one transaction.
+        """
+        name = partition_name(month)
+        start, end = month.isoformat(), add_months(month, 1).isoformat()
+        in_range = "timestamp >= CAST(:start AS timestamp) AND timestamp < CAST(:end AS timestamp)"
+        bounds = {"start": start, "end": end}
+
+        try:
+            stranded = db.scalar(
+                text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE {in_range})"),
+                bounds
+            )
+            if stranded:
+                db.execute(text(f"ALTER TABLE {EVENTS_TABLE} DETACH PARTITION {DEFAULT_PARTITION}"))
+
+            db.execute(text(
+                f"CREATE TABLE {name} PARTITION OF {EVENTS_TABLE} "
+                f"FOR VALUES FROM ('{start}') TO ('{end}')"
+            ))
+
+            if stranded:
+                moved = db.execute(
+                    text(f"INSERT INTO {name} SELECT * FROM {DEFAULT_PARTITION} WHERE {in_range}"),
+                    bounds
+                ).rowcount
+                db.execute(text(f"DELETE FROM {DEFAULT_PARTITION} WHERE {in_range}"), bounds)
+                db.execute(text(
+                    f"ALTER TABLE {EVENTS_TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT"
+                ))
+                logger.warning(f"⚠ Moved {moved} events from {DEFAULT_PARTITION} to {name}")
+
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        logger.info(f"✓ Partition created: {name}")
+        return name
+
+    @staticmethod
+    def ensure_partitions(
+        db: Session,
+        months_ahead: int,
+        today: Optional[date] = None
+    ) -> List[str]:
+        """
+        Make sure partitions exist from the current month to months_ahead
+        months ahead.
+
+        Returns:
+            Names of the partitions created
+        """
+        current = (today or datetime.utcnow().date()).replace(day=1)
+        existing = PartitionService.list_partitions(db)
+
+        created = []
+        for offset in range(months_ahead + 1):
+            month = add_months(current, offset)
+            if month not in existing:
+                created.append(PartitionService.create_partition(db, month))
+        return created
+
+    @staticmethod
+    def apply_retention(
+        db: Session,
+        retention_months: int,
+        drop: bool = False,
+        today: Optional[date] = None
+    ) -> List[str]:
+        """
+        Detach (and with drop, delete) partitions whose whole month is older
+        than retention_months before the current month.
+
+        Returns:
+            Names of the partitions detached
+        """
+        cutoff = add_months((today or datetime.utcnow().date()).replace(day=1), -retention_months)
+
+        expired = []
+        for month, name in PartitionService.list_partitions(db).items():
+            if add_months(month, 1) > cutoff:
+                break
+            try:
+                db.execute(text(f"ALTER TABLE {EVENTS_TABLE} DETACH PARTITION {name}"))
+                if drop:
+                    db.execute(text(f"DROP TABLE {name}"))
+                else:
+                    PartitionService._drop_foreign_keys(db, name)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+            expired.append(name)
+            logger.info(f"✓ Partition {'dropped' if drop else 'detached'}: {name}")
+        return expired
+
+
+# Global partition service instance
+partition_service = PartitionService()
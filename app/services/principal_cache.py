@@ -0,0 +1,313 @@
+"""
+Two-tier cache for authenticated principals.
+
+Tier 1 is a bounded in-process LRU with a short TTL, tier 2 is Redis.
+Invalidations are broadcast over Redis pub/sub so every worker drops its
+local copy when a user is updated or deactivated. Both tiers keep a
+generation that invalidations bump, so a principal loaded before a
+concurrent invalidation is never cached after it.
+"""
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Optional, Any, Awaitable, Callable, Tuple
+from uuid import UUID
+import threading
+import time
+import logging
+
+from app.core.config import settings
+from app.services.redis_service import redis_service
+from app.services.cache import ReadModelCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Read-only snapshot of the authenticated user (no credentials)."""
+    id: UUID
+    email: str
+    company_name: Optional[str]
+    phone: Optional[str]
+    full_name: Optional[str]
+    is_active: bool
+    is_verified: bool
+    is_superuser: bool
+    created_at: datetime
+    updated_at: datetime
+    last_login: Optional[datetime]
+
+    __cache_version__ = 1
+
+
+class LocalLRUCache:
+    """
+    Thread-safe, size-bounded LRU with a per-entry TTL.
+
+    generation counts evictions by pop and clear; put can be made
+    conditional on it not having moved since a value was loaded.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.generation = 0
+        self._data: "OrderedDict[Any, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any) -> Optional[Any]:
+        """Return a live entry and mark it as recently used."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key: Any, value: Any, generation: Optional[int] = None) -> bool:
+        """
+        Insert an entry, evicting the least recently used one if full.
+
+        If generation is given, nothing is stored unless it is still the
+        current one.
+        """
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return False
+            self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+            return True
+
+    def pop(self, key: Any) -> None:
+        """Drop an entry if present."""
+        with self._lock:
+            self.generation += 1
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self.generation += 1
+            self._data.clear()
+
+
+class PrincipalCache:
+    """Principal lookups backed by a local LRU and Redis."""
+
+    INVALIDATION_CHANNEL = "principal:invalidate"
+
+    def __init__(self):
+        self._local = LocalLRUCache(
+            max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.PRINCIPAL_CACHE_TTL_SECONDS,
+        )
+        self._remote: ReadModelCache[Principal] = ReadModelCache(
+            "principal", Principal, ttl=settings.PRINCIPAL_CACHE_REDIS_TTL_SECONDS
+        )
+        self._pubsub = None
+        self._listener = None
+        self._retry_timer = None
+
+    def get(self, user_id: UUID) -> Optional[Principal]:
+        """
+        Get a cached principal.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Principal or None on a miss in both tiers
+        """
+        return self._read(user_id)[0]
+
+    def _read(self, user_id: UUID) -> Tuple[Optional[Principal], Optional[str], int]:
+        """Return (principal or None, remote generation, local generation)."""
+        local_generation = self._local.generation
+        principal = self._local.get(user_id)
+        if principal is not None:
+            return principal, None, local_generation
+
+        principal, generation = self._remote.read(user_id)
+        if principal is not None:
+            self._local.put(user_id, principal, local_generation)
+        return principal, generation, local_generation
+
+    async def aget(self, user_id: UUID) -> Optional[Principal]:
+        """
+        Get a cached principal without blocking the event loop.
+
+        Args:
+            user_id: User ID
+
+        Returns:
+            Principal or None on a miss in both tiers
+        """
+        return (await self._aread(user_id))[0]
+
+    async def _aread(self, user_id: UUID) -> Tuple[Optional[Principal], Optional[str], int]:
+        """Async variant of _read."""
+        local_generation = self._local.generation
+        principal = self._local.get(user_id)
+        if principal is not None:
+            return principal, None, local_generation
+
+        principal, generation = await self._remote.aread(user_id)
+        if principal is not None:
+            self._local.put(user_id, principal, local_generation)
+        return principal, generation, local_generation
+
+    def get_or_load(
+        self,
+        user_id: UUID,
+        loader: Callable[[], Optional[Any]]
+    ) -> Optional[Principal]:
+        """
+        Get a cached principal, falling back to loader on a miss.
+
+        The loaded principal is only cached if the user was not invalidated
+        while it was being loaded.
+
+        Args:
+            user_id: User ID
+            loader: Returns the User model instance or None
+
+        Returns:
+            Principal or None if the user does not exist
+        """
+        principal, generation, local_generation = self._read(user_id)
+        if principal is not None:
+            return principal
+
+        user = loader()
+        if user is None:
+            return None
+
+        principal = self._remote.codec.from_object(user)
+        # Without Redis there is no remote generation; the local one still guards
+        if generation is None or self._remote.store(principal.id, principal, generation):
+            self._local.put(principal.id, principal, local_generation)
+        return principal
+
+    async def aget_or_load(
+        self,
+        user_id: UUID,
+        loader: Callable[[], Awaitable[Optional[Any]]]
+    ) -> Optional[Principal]:
+        """
+        Async variant of get_or_load: loader is a coroutine function.
+
+        Args:
+            user_id: User ID
+            loader: Returns the User model instance or None
+
+        Returns:
+            Principal or None if the user does not exist
+        """
+        principal, generation, local_generation = await self._aread(user_id)
+        if principal is not None:
+            return principal
+
+        user = await loader()
+        if user is None:
+            return None
+
+        principal = self._remote.codec.from_object(user)
+        if generation is None or await self._remote.astore(principal.id, principal, generation):
+            self._local.put(principal.id, principal, local_generation)
+        return principal
+
+    def invalidate(self, user_id: UUID) -> None:
+        """
+        Drop a principal from both tiers and tell other workers to do the same.
+
+        If the broadcast is lost, other workers serve the stale entry for at
+        most PRINCIPAL_CACHE_TTL_SECONDS.
+        """
+        self._local.pop(user_id)
+        self._remote.invalidate(user_id)
+        redis_service.publish(self.INVALIDATION_CHANNEL, str(user_id))
+
+    def _on_invalidation(self, message: dict) -> None:
+        """Pub/sub handler: evict the local copy named in the message."""
+        try:
+            self._local.pop(UUID(message["data"]))
+        except (KeyError, TypeError, ValueError):
+            logger.warning(f"Ignoring malformed principal invalidation: {message}")
+
+    def start_listener(self) -> None:
+        """
+        Subscribe to invalidation broadcasts in a background thread.
+
+        If Redis is unreachable the subscription is retried every Redis
+        circuit breaker recovery timeout until it succeeds or the listener
+        is stopped.
+        """
+        if self._listener is not None:
+            return
+
+        pubsub = None
+        try:
+            if not redis_service.redis_client:
+                raise ConnectionError("Redis client is not configured")
+            pubsub = redis_service.redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(**{self.INVALIDATION_CHANNEL: self._on_invalidation})
+            self._pubsub = pubsub
+            self._listener = pubsub.run_in_thread(
+                sleep_time=1.0,
+                daemon=True,
+                exception_handler=self._on_listener_error
+            )
+            logger.info("✓ Principal cache invalidation listener started")
+        except Exception as e:
+            logger.warning(f"⚠ Principal cache invalidation listener failed, retrying: {e}")
+            if pubsub is not None:
+                pubsub.close()
+            self._pubsub = None
+            self._listener = None
+            # Invalidations from other workers are missed until subscribed
+            self._local.clear()
+            self._retry_timer = threading.Timer(
+                redis_service.breaker.recovery_timeout, self._retry_listener
+            )
+            self._retry_timer.daemon = True
+            self._retry_timer.start()
+
+    def _retry_listener(self) -> None:
+        """Retry timer target: subscribe again unless stopped meanwhile."""
+        if self._retry_timer is not None:
+            self.start_listener()
+
+    def _on_listener_error(self, error: Exception, pubsub: Any, thread: Any) -> None:
+        """
+        Keep the listener alive across Redis outages.
+
+        The pub/sub connection reconnects and resubscribes on the next poll.
+        Invalidations published meanwhile are lost, so drop the local tier.
+        """
+        logger.warning(f"⚠ Principal cache invalidation listener error: {error}")
+        self._local.clear()
+        time.sleep(redis_service.breaker.recovery_timeout)
+
+    def stop_listener(self) -> None:
+        """Stop the invalidation listener."""
+        if self._retry_timer is not None:
+            self._retry_timer.cancel()
+            self._retry_timer = None
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
+        self._local.clear()
+
+
+# Global principal cache instance
+principal_cache = PrincipalCache()
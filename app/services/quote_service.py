@@ -1,15 +1,21 @@
 """
 Quote CRUD service with SQL injection protection.
 """
-from typing import List, Optional, Tuple
+from typing import Optional
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select, Select
 from uuid import UUID
 from datetime import datetime, timedelta
 import logging
 
 from app.models.quote import Quote, QuoteStatus
 from app.schemas.quote import QuoteCreate, QuoteUpdate
+from app.services.dashboard_service import dashboard_service
+from app.services.read_your_writes import read_your_writes
+from app.services.listing_counts import CountScope, afetch_page, fetch_page, quote_counts
+from app.services.stats_service import stats_service, quote_contribution
+from app.utils.pagination import CountMode, Page
 
 logger = logging.getLogger(__name__)
 
@@ -25,27 +31,59 @@ class QuoteService:
         """
         return db.query(Quote).filter(Quote.id == quote_id).first()
     
+    @staticmethod
+    def user_quotes_statement(
+        user_id: UUID,
+        status: Optional[QuoteStatus] = None
+    ) -> Select:
+        """
+        Build the filtered (unordered, unpaginated) user quotes query.
+        Shared by the sync and async services.
+        """
+        stmt = select(Quote).where(Quote.user_id == user_id)
+        
+        if status:
+            stmt = stmt.where(Quote.status == status)
+        
+        return stmt
+    
+    @staticmethod
+    def pending_count_statement(user_id: UUID) -> Select:
+        """Build the pending quotes count query."""
+        return select(func.count(Quote.id)).where(
+            Quote.user_id == user_id,
+            Quote.status == QuoteStatus.PENDING
+        )
+    
     @staticmethod
     def get_user_quotes(
         db: Session,
         user_id: UUID,
         skip: int = 0,
         limit: int = 100,
-        status: Optional[QuoteStatus] = None
-    ) -> Tuple[List[Quote], int]:
+        status: Optional[QuoteStatus] = None,
+        cursor: Optional[str] = None,
+        count: CountMode = CountMode.EXACT
+    ) -> Page:
         """
         Get user's quotes with pagination.
+        
+        Pass the next_cursor of the previous page as cursor for keyset
+        pagination; skip is kept for backward compatibility. count selects
+        how the total is computed.
         SQLAlchemy ORM prevents SQL injection.
         """
-        query = db.query(Quote).filter(Quote.user_id == user_id)
+        stmt = QuoteService.user_quotes_statement(user_id, status)
+        scope = CountScope(quote_counts, user_id, status.value if status else "all")
         
-        if status:
-            query = query.filter(Quote.status == status)
-        
-        total = query.count()
-        quotes = query.order_by(desc(Quote.created_at)).offset(skip).limit(limit).all()
-        
-        return quotes, total
+        return fetch_page(db, stmt, Quote, skip, limit, cursor, count, scope)
+    
+    @staticmethod
+    def invalidate_caches(quote: Quote) -> None:
+        """Drop cached reads that include a quote after it is written."""
+        quote_counts.invalidate(quote.user_id)
+        dashboard_service.invalidate(quote.user_id)
+        read_your_writes.mark(quote.user_id)
     
     @staticmethod
     def create(
@@ -67,9 +105,13 @@ class QuoteService:
         )
         
         db.add(db_quote)
+        db.flush()
+        stats_service.record(db, None, quote_contribution(db_quote))
         db.commit()
         db.refresh(db_quote)
         
+        QuoteService.invalidate_caches(db_quote)
+        
         logger.info(f"Quote created for user: {user_id}")
         return db_quote
     
@@ -87,14 +129,19 @@ class QuoteService:
         if not quote:
             return None
         
+        before = quote_contribution(quote)
+        
         # Update fields
         update_data = quote_in.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(quote, field, value)
         
+        stats_service.record(db, before, quote_contribution(quote))
         db.commit()
         db.refresh(quote)
         
+        QuoteService.invalidate_caches(quote)
+        
         logger.info(f"Quote updated: {quote_id}")
         return quote
     
@@ -104,11 +151,52 @@ class QuoteService:
         Get count of pending quotes for user.
         SQLAlchemy ORM prevents SQL injection.
         """
-        return db.query(func.count(Quote.id)).filter(
-            Quote.user_id == user_id,
-            Quote.status == QuoteStatus.PENDING
-        ).scalar() or 0
+        return db.scalar(QuoteService.pending_count_statement(user_id)) or 0
+
+
+class AsyncQuoteService:
+    """Quote read operations on an AsyncSession (hot read paths)."""
+    
+    @staticmethod
+    async def get_by_id(db: AsyncSession, quote_id: UUID) -> Optional[Quote]:
+        """
+        Get quote by ID.
+        SQLAlchemy ORM prevents SQL injection.
+        """
+        return await db.get(Quote, quote_id)
+    
+    @staticmethod
+    async def get_user_quotes(
+        db: AsyncSession,
+        user_id: UUID,
+        skip: int = 0,
+        limit: int = 100,
+        status: Optional[QuoteStatus] = None,
+        cursor: Optional[str] = None,
+        count: CountMode = CountMode.EXACT
+    ) -> Page:
+        """
+        Get user's quotes with pagination.
+        
+        Pass the next_cursor of the previous page as cursor for keyset
+        pagination; skip is kept for backward compatibility. count selects
+        how the total is computed.
+        SQLAlchemy ORM prevents SQL injection.
+        """
+        stmt = QuoteService.user_quotes_statement(user_id, status)
+        scope = CountScope(quote_counts, user_id, status.value if status else "all")
+        
+        return await afetch_page(db, stmt, Quote, skip, limit, cursor, count, scope)
+    
+    @staticmethod
+    async def get_pending_count(db: AsyncSession, user_id: UUID) -> int:
+        """
+        Get count of pending quotes for user.
+        SQLAlchemy ORM prevents SQL injection.
+        """
+        return await db.scalar(QuoteService.pending_count_statement(user_id)) or 0
 
 
-# Global quote service instance
+# Global quote service instances
 quote_service = QuoteService()
+async_quote_service = AsyncQuoteService()
@@ -0,0 +1,106 @@
+"""
+Token-bucket rate limiter implemented as a single Redis Lua script.
+
+Refill, check, decrement and expiry happen atomically server-side in one
+EVALSHA round trip, so concurrent first requests can never leave a bucket
+without a TTL.
+"""
+from typing import NamedTuple, Optional
+import logging
+
+from app.services.async_redis_service import async_redis_service
+
+logger = logging.getLogger(__name__)
+
+# KEYS[1]  bucket hash (fields: tokens, ts)
+# ARGV[1]  bucket capacity (requests)
+# ARGV[2]  time to refill an empty bucket, in milliseconds
+# Returns  {allowed, remaining, reset_ms, retry_ms}
+TOKEN_BUCKET_LUA = """
+local capacity = tonumber(ARGV[1])
+local window_ms = tonumber(ARGV[2])
+local rate = capacity / window_ms
+
+local now = redis.call('TIME')
+local now_ms = tonumber(now[1]) * 1000 + math.floor(tonumber(now[2]) / 1000)
+
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(bucket[1])
+local ts = tonumber(bucket[2])
+if tokens == nil or ts == nil then
+    tokens = capacity
+    ts = now_ms
+end
+
+tokens = math.min(capacity, tokens + math.max(0, now_ms - ts) * rate)
+
+local allowed = 0
+local retry_ms = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+else
+    retry_ms = math.ceil((1 - tokens) / rate)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now_ms)
+redis.call('PEXPIRE', KEYS[1], window_ms)
+
+local reset_ms = math.ceil((capacity - tokens) / rate)
+return {allowed, math.floor(tokens), reset_ms, retry_ms}
+"""
+
+
+class RateLimitResult(NamedTuple):
+    """Outcome of a single rate limit check."""
+    allowed: bool
+    limit: int
+    remaining: int
+    reset_after: int  # seconds until the bucket is full again
+    retry_after: int  # seconds until the next request is allowed (0 if allowed)
+
+
+def _ceil_seconds(milliseconds: int) -> int:
+    return -(-int(milliseconds) // 1000)
+
+
+class RateLimiter:
+    """Token-bucket limiter: `limit` requests per `window_seconds`, refilled continuously."""
+
+    def __init__(self, limit: int, window_seconds: int, key_prefix: str = "rate_limit"):
+        self.limit = limit
+        self.window_ms = window_seconds * 1000
+        self.key_prefix = key_prefix
+
+    def key(self, identifier: str) -> str:
+        """Build the bucket key for a client identifier."""
+        return f"{self.key_prefix}:{identifier}"
+
+    def _to_result(self, raw) -> RateLimitResult:
+        allowed, remaining, reset_ms, retry_ms = (int(v) for v in raw)
+        return RateLimitResult(
+            allowed=bool(allowed),
+            limit=self.limit,
+            remaining=max(0, remaining),
+            reset_after=_ceil_seconds(reset_ms),
+            retry_after=_ceil_seconds(retry_ms),
+        )
+
+    async def hit(self, identifier: str) -> Optional[RateLimitResult]:
+        """
+        Consume one token for a client.
+
+        Args:
+            identifier: Client identifier (e.g. IP address)
+
+        Returns:
+            RateLimitResult, or None if Redis is unavailable
+        """
+        raw = await async_redis_service.run_script(
+            TOKEN_BUCKET_LUA,
+            keys=[self.key(identifier)],
+            args=[self.limit, self.window_ms]
+        )
+        if raw is None:
+            return None
+        return self._to_result(raw)
@@ -0,0 +1,76 @@
+"""
+Lightweight read models returned by cached service read paths.
+
+These are plain frozen dataclasses: they can be serialized by the cache
+layer, compared, and passed to response schemas (from_attributes), but they
+are not attached to a database session and cannot be modified or committed.
+"""
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Optional, Dict, Any, Tuple
+from uuid import UUID
+
+from app.models.shipment import ServiceType, ShipmentStatus
+
+
+@dataclass(frozen=True)
+class ShipmentSnapshot:
+    """Read-only view of a shipment row."""
+    id: UUID
+    tracking_number: str
+    user_id: UUID
+    origin_city: str
+    origin_country: str
+    origin_address: Optional[str]
+    origin_postal_code: Optional[str]
+    destination_city: str
+    destination_country: str
+    destination_address: Optional[str]
+    destination_postal_code: Optional[str]
+    service_type: ServiceType
+    status: ShipmentStatus
+    weight: Optional[Decimal]
+    dimensions: Optional[Dict[str, Any]]
+    package_count: Decimal
+    estimated_cost: Optional[Decimal]
+    actual_cost: Optional[Decimal]
+    currency: str
+    created_at: datetime
+    updated_at: datetime
+    estimated_delivery: Optional[datetime]
+    actual_delivery: Optional[datetime]
+    special_instructions: Optional[str]
+    insurance: bool
+    signature_required: bool
+
+    # Bump when the meaning of a field changes without its type changing
+    __cache_version__ = 1
+
+
+@dataclass(frozen=True)
+class DashboardSnapshot:
+    """Read-only view of a user's dashboard: stats plus recent shipments."""
+    active_shipments: int
+    delivered_shipments: int
+    total_spent: Decimal
+    pending_quotes: int
+    recent_shipments: Tuple[ShipmentSnapshot, ...]
+
+    # Bump when the meaning of a field changes without its type changing
+    __cache_version__ = 1
+
+
+@dataclass(frozen=True)
+class ShipmentEventSnapshot:
+    """Read-only view of a shipment event row."""
+    id: UUID
+    shipment_id: UUID
+    event_type: str
+    location: Optional[str]
+    description: Optional[str]
+    timestamp: datetime
+    created_at: datetime
+
+    # Bump when the meaning of a field changes without its type changing
+    __cache_version__ = 1
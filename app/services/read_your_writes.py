@@ -0,0 +1,53 @@
+"""
+Read-your-writes window for replica routing.
+
+Writes to a user's data mark the user in Redis for READ_YOUR_WRITES_SECONDS.
+While the mark is present, that user's read dependencies use the primary,
+so they never see a replica that has not caught up with their own write
+(and never re-populate a cache from one).
+
+Shipment IDs are marked the same way when events are added, so a
+replica-read timeline is not cached while it may be missing the event.
+"""
+from typing import Iterable
+from uuid import UUID
+import logging
+
+from app.core.config import settings
+from app.db.session import replica_engines
+from app.services.redis_service import redis_service
+from app.services.async_redis_service import async_redis_service
+
+logger = logging.getLogger(__name__)
+
+
+class ReadYourWrites:
+    """Per-user read-your-writes marks stored in Redis."""
+    
+    def __init__(self, window: int):
+        self.window = window
+    
+    @staticmethod
+    def key(user_id: UUID) -> str:
+        """Build the Redis key for a user's mark."""
+        return f"ryw:{user_id}"
+    
+    def mark(self, user_id: UUID) -> None:
+        """Record a write to a user's data. No-op without replicas."""
+        if replica_engines:
+            redis_service.set(self.key(user_id), 1, expire=self.window)
+    
+    def mark_many(self, user_ids: Iterable[UUID]) -> None:
+        """Record writes to several users' data in one round trip."""
+        if replica_engines:
+            redis_service.set_many({self.key(user_id): 1 for user_id in user_ids}, expire=self.window)
+    
+    async def is_recent(self, user_id: UUID) -> bool:
+        """Check whether the user wrote within the window. False without replicas."""
+        if not replica_engines:
+            return False
+        return await async_redis_service.exists(self.key(user_id))
+
+
+# Global read-your-writes instance
+read_your_writes = ReadYourWrites(settings.READ_YOUR_WRITES_SECONDS)
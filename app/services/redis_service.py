@@ -3,41 +3,122 @@ Redis service for caching and session management.
 """
 import redis
 import json
-from typing import Optional, Any
-from datetime import timedelta
+from typing import Optional, Any, Callable, Dict, List
+import threading
 import logging
 
 from app.core.config import settings
+from app.services.circuit_breaker import CircuitBreaker, CircuitState
 
 logger = logging.getLogger(__name__)
 
+# Errors that mean Redis is unreachable (as opposed to a bad command)
+CONNECTION_ERRORS = (redis.ConnectionError, redis.TimeoutError)
+
+# Shared by the sync and async Redis services: both talk to the same server
+redis_breaker = CircuitBreaker(
+    "redis",
+    failure_threshold=settings.REDIS_CIRCUIT_FAILURE_THRESHOLD,
+    recovery_timeout=settings.REDIS_CIRCUIT_RECOVERY_SECONDS,
+)
+
 
 class RedisService:
     """Redis service for caching operations."""
     
-    def __init__(self):
-        """Initialize Redis connection pool."""
+    def __init__(self, breaker: CircuitBreaker = redis_breaker):
+        """Initialize Redis connection pool (connections are opened lazily)."""
         self.redis_client: Optional[redis.Redis] = None
+        self.breaker = breaker
+        self._scripts: Dict[str, Any] = {}
+        self._probe_lock = threading.Lock()
+        self._probe_scheduled = False
+        self.breaker.on_open(self._schedule_probe)
         self._connect()
     
     def _connect(self):
-        """Connect to Redis server."""
+        """Create the Redis client. No network I/O happens here."""
         try:
             self.redis_client = redis.Redis(
                 connection_pool=redis.ConnectionPool.from_url(
                     settings.REDIS_URL,
                     password=settings.REDIS_PASSWORD,
                     max_connections=settings.REDIS_MAX_CONNECTIONS,
+                    socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+                    socket_connect_timeout=settings.REDIS_SOCKET_TIMEOUT,
                     decode_responses=True
                 )
             )
-            # Test connection
-            self.redis_client.ping()
-            logger.info("✓ Redis connection successful")
         except Exception as e:
-            logger.error(f"✗ Redis connection failed: {e}")
+            logger.error(f"✗ Redis client setup failed: {e}")
             self.redis_client = None
     
+    def _schedule_probe(self):
+        """Start a background reconnect attempt after the recovery timeout."""
+        with self._probe_lock:
+            if self._probe_scheduled:
+                return
+            self._probe_scheduled = True
+        
+        timer = threading.Timer(self.breaker.recovery_timeout, self._probe)
+        timer.daemon = True
+        timer.start()
+    
+    def _probe(self):
+        """Try to reach Redis in the background and close the circuit on success."""
+        with self._probe_lock:
+            self._probe_scheduled = False
+        
+        if self.breaker.state is CircuitState.CLOSED:
+            return
+        if not self.breaker.allow_request():
+            # Another caller holds the half-open trial; check again later
+            self._schedule_probe()
+            return
+        
+        try:
+            if not self.redis_client:
+                self._connect()
+            self.redis_client.ping()
+        except Exception as e:
+            logger.warning(f"⚠ Redis still unavailable: {e}")
+            self.breaker.record_failure()
+            return
+        
+        self.breaker.record_success()
+        logger.info("✓ Redis connection restored")
+    
+    def _execute(
+        self,
+        operation: str,
+        target: str,
+        command: Callable[[redis.Redis], Any],
+        default: Any
+    ) -> Any:
+        """
+        Run a command through the circuit breaker.
+        
+        Short-circuits to default while the circuit is open; connection
+        failures count towards opening it.
+        """
+        if not self.redis_client or not self.breaker.allow_request():
+            return default
+        
+        try:
+            result = command(self.redis_client)
+        except CONNECTION_ERRORS as e:
+            self.breaker.record_failure()
+            logger.error(f"Redis {operation} error for {target}: {e}")
+            return default
+        except Exception as e:
+            # Redis answered; the command itself failed
+            self.breaker.record_success()
+            logger.error(f"Redis {operation} error for {target}: {e}")
+            return default
+        
+        self.breaker.record_success()
+        return result
+    
     def get(self, key: str) -> Optional[Any]:
         """
         Get value from Redis cache.
@@ -48,16 +129,14 @@ class RedisService:
         Returns:
             Cached value or None if not found
         """
-        if not self.redis_client:
+        value = self._execute("GET", f"key {key}", lambda client: client.get(key), None)
+        if not value:
             return None
         
         try:
-            value = self.redis_client.get(key)
-            if value:
-                return json.loads(value)
-            return None
-        except Exception as e:
-            logger.error(f"Redis GET error for key {key}: {e}")
+            return json.loads(value)
+        except ValueError as e:
+            logger.error(f"Redis GET decode error for key {key}: {e}")
             return None
     
     def set(
@@ -77,19 +156,20 @@ class RedisService:
         Returns:
             True if successful, False otherwise
         """
-        if not self.redis_client:
-            return False
-        
         try:
             serialized = json.dumps(value)
+        except (TypeError, ValueError) as e:
+            logger.error(f"Redis SET encode error for key {key}: {e}")
+            return False
+        
+        def command(client: redis.Redis) -> bool:
             if expire:
-                self.redis_client.setex(key, expire, serialized)
+                client.setex(key, expire, serialized)
             else:
-                self.redis_client.set(key, serialized)
+                client.set(key, serialized)
             return True
-        except Exception as e:
-            logger.error(f"Redis SET error for key {key}: {e}")
-            return False
+        
+        return self._execute("SET", f"key {key}", command, False)
     
     def delete(self, key: str) -> bool:
         """
@@ -101,15 +181,44 @@ class RedisService:
         Returns:
             True if successful, False otherwise
         """
-        if not self.redis_client:
-            return False
+        def command(client: redis.Redis) -> bool:
+            client.delete(key)
+            return True
         
-        try:
-            self.redis_client.delete(key)
+        return self._execute("DELETE", f"key {key}", command, False)
+    
+    def set_many(
+        self,
+        values: Dict[str, Any],
+        expire: Optional[int] = None
+    ) -> bool:
+        """
+        Set several values in one round trip (pipelined, not atomic).
+        
+        Args:
+            values: Values to cache by key (will be JSON serialized)
+            expire: Expiration time in seconds
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        if not values:
             return True
-        except Exception as e:
-            logger.error(f"Redis DELETE error for key {key}: {e}")
+        
+        try:
+            serialized = {key: json.dumps(value) for key, value in values.items()}
+        except (TypeError, ValueError) as e:
+            logger.error(f"Redis SET encode error for {len(values)} keys: {e}")
             return False
+        
+        def command(client: redis.Redis) -> bool:
+            pipe = client.pipeline(transaction=False)
+            for key, value in serialized.items():
+                pipe.set(key, value, ex=expire)
+            pipe.execute()
+            return True
+        
+        return self._execute("SET", f"{len(values)} keys", command, False)
     
     def exists(self, key: str) -> bool:
         """
@@ -121,14 +230,9 @@ class RedisService:
         Returns:
             True if key exists, False otherwise
         """
-        if not self.redis_client:
-            return False
-        
-        try:
-            return bool(self.redis_client.exists(key))
-        except Exception as e:
-            logger.error(f"Redis EXISTS error for key {key}: {e}")
-            return False
+        return self._execute(
+            "EXISTS", f"key {key}", lambda client: bool(client.exists(key)), False
+        )
     
     def increment(self, key: str, amount: int = 1) -> Optional[int]:
         """
@@ -141,14 +245,71 @@ class RedisService:
         Returns:
             New counter value or None if error
         """
-        if not self.redis_client:
-            return None
+        return self._execute(
+            "INCREMENT", f"key {key}", lambda client: client.incrby(key, amount), None
+        )
+    
+    def run_script(
+        self,
+        source: str,
+        keys: List[str],
+        args: List[Any]
+    ) -> Optional[Any]:
+        """
+        Run a Lua script server-side.
         
-        try:
-            return self.redis_client.incrby(key, amount)
-        except Exception as e:
-            logger.error(f"Redis INCREMENT error for key {key}: {e}")
-            return None
+        The script is registered once per client and then invoked with
+        EVALSHA (redis-py falls back to EVAL if the server lost it).
+        
+        Args:
+            source: Lua source
+            keys: KEYS passed to the script
+            args: ARGV passed to the script
+            
+        Returns:
+            Script result or None if error
+        """
+        def command(client: redis.Redis) -> Any:
+            script = self._scripts.get(source)
+            if script is None:
+                script = client.register_script(source)
+                self._scripts[source] = script
+            return script(keys=keys, args=args)
+        
+        return self._execute("SCRIPT", f"keys {keys}", command, None)
+    
+    def acquire_lock(self, key: str, ttl: int) -> bool:
+        """
+        Take a lock that expires after ttl seconds (SET NX EX).
+        
+        Args:
+            key: Lock key
+            ttl: Lock lifetime in seconds
+            
+        Returns:
+            True if this caller took the lock, False if it is held or Redis
+            is unavailable
+        """
+        return self._execute(
+            "SET NX", f"key {key}", lambda client: bool(client.set(key, "1", nx=True, ex=ttl)), False
+        )
+    
+    def publish(self, channel: str, message: str) -> bool:
+        """
+        Publish a message on a Redis pub/sub channel.
+        
+        Args:
+            channel: Channel name
+            message: Message payload
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        def command(client: redis.Redis) -> bool:
+            client.publish(channel, message)
+            return True
+        
+        return self._execute("PUBLISH", f"channel {channel}", command, False)
     
     def close(self):
         """Close Redis connection."""
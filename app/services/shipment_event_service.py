@@ -0,0 +1,366 @@
+"""
+Shipment event (timeline) service with SQL injection protection via SQLAlchemy ORM.
+
+Timelines are read in (timestamp, id) order through the
+ix_shipment_events_shipment_id_timestamp index and paged with a keyset
+cursor. Timelines of up to TIMELINE_CACHE_MAX_EVENTS events are cached
+whole in Redis as a list. New events are appended to the cached list
+instead of rebuilding it, and an event that arrives out of order drops
+the list so the next read rebuilds it. Each write also bumps the list's
+generation, so a read that loaded the timeline before the write committed
+never caches what it loaded.
+
+Carrier batches (ingest_batch) are deduplicated on the natural key
+(shipment, event type, timestamp, location) with ON CONFLICT DO NOTHING,
+and they only ever move shipment statuses forward.
+
+Timeline queries are bounded below by the shipment's creation time (less
+TIMELINE_LOOKBACK), so on the month-partitioned table they only touch the
+partitions since the shipment was created. Events dated before that bound
+are refused when they are written, so the bound never hides an event.
+
+Archived shipments have their events in shipment_events_archive. A
+shipment's events are archived together, so when the live table has no
+events for a timeline page it is read from the archive instead.
+"""
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+import logging
+
+from sqlalchemy import Select, func, select, text, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.archive import ArchivedShipment, ArchivedShipmentEvent
+from app.models.shipment import Shipment, ShipmentStatus
+from app.models.shipment_event import ShipmentEvent
+from app.schemas.shipment_event import CarrierEvent, ShipmentEventCreate
+from app.services.cache import ReadModelListCache
+from app.services.read_models import ShipmentEventSnapshot
+from app.services.read_your_writes import read_your_writes
+from app.services.shipment_service import shipment_service
+from app.services.stats_service import Counters, stats_service, shipment_contribution
+from app.utils.exceptions import ValidationException
+from app.utils.pagination import Page, decode_cursor, encode_cursor
+
+logger = logging.getLogger(__name__)
+
+# Cached whole timelines, in timeline order
+timeline_cache: ReadModelListCache[ShipmentEventSnapshot] = ReadModelListCache(
+    "timeline",
+    ShipmentEventSnapshot,
+    ttl=settings.TIMELINE_CACHE_TTL_SECONDS,
+    max_length=settings.TIMELINE_CACHE_MAX_EVENTS,
+    order_field="timestamp",
+)
+
+# Carrier scans may be back-dated a little before the shipment was booked,
+# but no further: timelines are only read from this far back
+TIMELINE_LOOKBACK = timedelta(days=7)
+
+# Forward order of the statuses a carrier event can set. DELIVERED and
+# CANCELLED shipments are never changed by events; ON_HOLD ones resume at
+# whatever status the carrier reports.
+STATUS_PROGRESSION = (
+    ShipmentStatus.PENDING,
+    ShipmentStatus.PROCESSING,
+    ShipmentStatus.PICKED_UP,
+    ShipmentStatus.IN_TRANSIT,
+    ShipmentStatus.CUSTOMS,
+    ShipmentStatus.OUT_FOR_DELIVERY,
+    ShipmentStatus.DELIVERED,
+)
+_STATUS_RANK = {status: rank for rank, status in enumerate(STATUS_PROGRESSION)}
+_TERMINAL_STATUSES = (ShipmentStatus.DELIVERED, ShipmentStatus.CANCELLED)
+
+
+def advanced_status(current: ShipmentStatus, event_type: str) -> Optional[ShipmentStatus]:
+    """
+    Status a shipment moves to because of an event, or None if it stays.
+
+    Only event types naming a status in STATUS_PROGRESSION count, and only
+    if that status is ahead of the current one.
+    """
+    if current in _TERMINAL_STATUSES:
+        return None
+    try:
+        status = ShipmentStatus(event_type)
+    except ValueError:
+        return None
+    if status not in _STATUS_RANK:
+        return None
+    if current in _STATUS_RANK and _STATUS_RANK[status] <= _STATUS_RANK[current]:
+        return None
+    return status
+
+
+def earliest_event_time(shipment_created_at: datetime) -> datetime:
+    """Earliest timestamp an event of a shipment created at this time may have."""
+    return shipment_created_at - TIMELINE_LOOKBACK
+
+
+def _split_timeline(rows: Sequence, limit: int) -> Tuple[List, Optional[str]]:
+    """Split limit + 1 timeline rows into the page and the next cursor."""
+    items = list(rows[:limit])
+    if len(rows) <= limit:
+        return items, None
+
+    last = items[-1]
+    return items, encode_cursor(last.timestamp, last.id)
+
+
+class ShipmentEventService:
+    """Shipment event operations."""
+
+    @staticmethod
+    def timeline_statement(
+        shipment_id: UUID,
+        limit: int,
+        cursor: Optional[str] = None,
+        shipment_created_at: Optional[datetime] = None,
+        model=ShipmentEvent
+    ) -> Select:
+        """
+        Build the timeline query: the shipment's events after the cursor,
+        oldest first, with one extra row to detect a next page.
+        Pass the shipment's created_at to prune older partitions, and
+        model=ArchivedShipmentEvent to read the archive.
+        """
+        stmt = select(model).where(model.shipment_id == shipment_id)
+
+        if shipment_created_at:
+            stmt = stmt.where(model.timestamp >= earliest_event_time(shipment_created_at))
+
+        if cursor:
+            timestamp, id = decode_cursor(cursor)
+            stmt = stmt.where(tuple_(model.timestamp, model.id) > tuple_(timestamp, id))
+
+        return stmt.order_by(model.timestamp, model.id).limit(limit + 1)
+
+    @staticmethod
+    def page_from_cache(
+        events: List[ShipmentEventSnapshot],
+        limit: int,
+        cursor: Optional[str] = None
+    ) -> Page:
+        """Cut a page out of a cached whole timeline."""
+        start = 0
+        if cursor:
+            position = decode_cursor(cursor)
+            start = bisect_right([(event.timestamp, event.id) for event in events], position)
+
+        items, next_cursor = _split_timeline(events[start:start + limit + 1], limit)
+        return Page(items, None, next_cursor)
+
+    @staticmethod
+    def load_limit(limit: int) -> int:
+        """
+        Rows to read for a first page on a cache miss: enough to cache the
+        whole timeline if it fits.
+        """
+        return max(limit, settings.TIMELINE_CACHE_MAX_EVENTS)
+
+    @staticmethod
+    def create(
+        db: Session,
+        event_in: ShipmentEventCreate
+    ) -> ShipmentEvent:
+        """
+        Create a shipment event and append it to the cached timeline.
+        Events dated more than TIMELINE_LOOKBACK before the shipment was
+        created are refused.
+        SQLAlchemy ORM prevents SQL injection.
+        """
+        if db.get(ArchivedShipment, event_in.shipment_id) is not None:
+            raise ValidationException("Archived shipments cannot be modified")
+
+        created_at = db.scalar(select(Shipment.created_at).where(Shipment.id == event_in.shipment_id))
+        if created_at is not None and event_in.timestamp < earliest_event_time(created_at):
+            raise ValidationException(
+                f"Event timestamp is more than {TIMELINE_LOOKBACK.days} days "
+                f"before the shipment was created"
+            )
+
+        db_event = ShipmentEvent(**event_in.model_dump())
+
+        db.add(db_event)
+        db.commit()
+        db.refresh(db_event)
+
+        timeline_cache.append(db_event.shipment_id, timeline_cache.codec.from_object(db_event))
+        read_your_writes.mark(db_event.shipment_id)
+
+        logger.info(f"Shipment event created: {db_event.event_type} for {db_event.shipment_id}")
+        return db_event
+
+    @staticmethod
+    def ingest_batch(db: Session, events: List[CarrierEvent]) -> dict:
+        """
+        Ingest a batch of carrier events keyed by tracking number.
+
+        Shipments are resolved (and locked, for the status update) in one
+        query. New events go in with one INSERT ... ON CONFLICT DO NOTHING
+        on the natural key, so events already stored or repeated in the
+        batch are skipped, as are events dated more than TIMELINE_LOOKBACK
+        before their shipment was created. Each shipment's status then
+        moves forward to the furthest status among its new events, and
+        everything commits together.
+        SQLAlchemy ORM prevents SQL injection.
+
+        Returns:
+            dict: Counts of received, inserted, duplicate and rejected events
+            and status updates, plus tracking numbers that matched no shipment
+        """
+        if len(events) > settings.EVENT_BATCH_MAX_EVENTS:
+            raise ValidationException(
+                f"At most {settings.EVENT_BATCH_MAX_EVENTS} events per batch"
+            )
+
+        tracking_numbers = sorted({event.tracking_number for event in events})
+        try:
+            shipments: Dict[str, Shipment] = {
+                shipment.tracking_number: shipment
+                for shipment in db.scalars(
+                    select(Shipment)
+                    .where(Shipment.tracking_number.in_(tracking_numbers))
+                    .order_by(Shipment.id)
+                    .with_for_update()
+                )
+            }
+
+            rows = []
+            rejected = 0
+            for event in events:
+                shipment = shipments.get(event.tracking_number)
+                if shipment is None:
+                    continue
+                if event.timestamp < earliest_event_time(shipment.created_at):
+                    rejected += 1
+                    continue
+                rows.append({
+                    "shipment_id": shipment.id,
+                    **event.model_dump(exclude={"tracking_number"}),
+                })
+
+            inserted = []
+            if rows:
+                stmt = insert(ShipmentEvent).values(rows)
+                inserted = db.execute(
+                    stmt.on_conflict_do_nothing(index_elements=[
+                        ShipmentEvent.shipment_id,
+                        ShipmentEvent.event_type,
+                        ShipmentEvent.timestamp,
+                        func.coalesce(ShipmentEvent.location, text("''")),
+                    ]).returning(
+                        ShipmentEvent.shipment_id,
+                        ShipmentEvent.event_type,
+                        ShipmentEvent.timestamp,
+                    )
+                ).all()
+
+            by_id = {shipment.id: shipment for shipment in shipments.values()}
+            updated: Dict[UUID, Shipment] = {}
+            before: Counters = {}
+            after: Counters = {}
+            for shipment_id, event_type, timestamp in inserted:
+                shipment = by_id[shipment_id]
+                status = advanced_status(shipment.status, event_type)
+                if status is None:
+                    continue
+                if shipment_id not in updated:
+                    updated[shipment_id] = shipment
+                    for name, value in shipment_contribution(shipment).items():
+                        before[name] = before.get(name, 0) + value
+                shipment.status = status
+                if status == ShipmentStatus.DELIVERED and shipment.actual_delivery is None:
+                    shipment.actual_delivery = timestamp
+
+            for shipment in updated.values():
+                for name, value in shipment_contribution(shipment).items():
+                    after[name] = after.get(name, 0) + value
+
+            # The status changes flush at commit as one batched UPDATE
+            stats_service.record(db, before, after)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+        touched = {shipment_id for shipment_id, _, _ in inserted}
+        timeline_cache.invalidate_many(touched)
+        read_your_writes.mark_many(touched)
+        for shipment in updated.values():
+            shipment_service.invalidate_caches(shipment)
+
+        unknown = [number for number in tracking_numbers if number not in shipments]
+        logger.info(
+            f"Carrier batch ingested: {len(inserted)} new events, "
+            f"{len(rows) - len(inserted)} duplicates, {rejected} rejected, "
+            f"{len(updated)} status updates, "
+            f"{len(unknown)} unknown tracking numbers"
+        )
+        return {
+            "received": len(events),
+            "inserted": len(inserted),
+            "duplicates": len(rows) - len(inserted),
+            "rejected": rejected,
+            "status_updates": len(updated),
+            "unknown_tracking_numbers": unknown,
+        }
+
+
+class AsyncShipmentEventService:
+    """Shipment event read operations on an AsyncSession (hot read paths)."""
+
+    @staticmethod
+    async def get_shipment_timeline(
+        db: AsyncSession,
+        shipment_id: UUID,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        shipment_created_at: Optional[datetime] = None
+    ) -> Page:
+        """
+        Get a page of a shipment's timeline, oldest event first.
+
+        Pass the next_cursor of the previous page as cursor, and the
+        shipment's created_at so only its partitions are read.
+        SQLAlchemy ORM prevents SQL injection.
+        """
+        events, generation = await timeline_cache.aget(shipment_id)
+        if events is not None:
+            return ShipmentEventService.page_from_cache(events, limit, cursor)
+
+        load = limit if cursor else ShipmentEventService.load_limit(limit)
+        rows = (await db.scalars(
+            ShipmentEventService.timeline_statement(shipment_id, load, cursor, shipment_created_at)
+        )).all()
+        if not rows:
+            rows = (await db.scalars(
+                ShipmentEventService.timeline_statement(
+                    shipment_id, load, cursor, model=ArchivedShipmentEvent
+                )
+            )).all()
+        snapshots = [timeline_cache.codec.from_object(row) for row in rows]
+
+        # A first page that read the whole timeline populates the cache,
+        # unless an event was added since the generation was read (astore
+        # checks) or a replica may not have the latest event yet
+        if (
+            cursor is None
+            and len(rows) <= load
+            and not await read_your_writes.is_recent(shipment_id)
+        ):
+            await timeline_cache.astore(shipment_id, snapshots, generation)
+
+        items, next_cursor = _split_timeline(snapshots, limit)
+        return Page(items, None, next_cursor)
+
+
+# Global shipment event service instances
+shipment_event_service = ShipmentEventService()
+async_shipment_event_service = AsyncShipmentEventService()
@@ -0,0 +1,340 @@
+"""
+Bulk shipment import from CSV files.
+
+An upload is streamed to a temporary file (app/utils/uploads.py) and
+imported by a background job, so the request returns at once with a job
+ID to poll. The job:
+
+- reads the CSV incrementally (csv.DictReader over the open file), so
+  memory use depends on the chunk size, not the file size;
+- validates rows against ShipmentCreate in chunks of
+  SHIPMENT_IMPORT_CHUNK_ROWS, recording invalid rows by CSV line number;
+- writes each chunk's valid rows with COPY and commits it, with the admin
+  stats contribution, in one transaction per chunk.
+
+Job progress lives in Redis for SHIPMENT_IMPORT_JOB_TTL_SECONDS.
+Chunks already committed stay imported if a later part of the file is
+unreadable.
+
+Jobs run in the API worker that accepted the upload, so a restart can cut
+one short. A running job heartbeats after every chunk, in Redis and on its
+staged file's mtime. A queued or running job without a heartbeat for
+SHIPMENT_IMPORT_STALE_SECONDS is reported as failed, and
+clean_up_stale_jobs deletes staged files whose job stopped heartbeating.
+"""
+from datetime import datetime, timedelta
+from itertools import islice
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+import csv
+import io
+import json
+import logging
+import os
+import tempfile
+import time
+import uuid
+
+from fastapi import UploadFile
+from psycopg2.errors import UniqueViolation
+from pydantic import ValidationError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.shipment import DEFAULT_CURRENCY, Shipment, ShipmentStatus
+from app.schemas.shipment import ShipmentCreate
+from app.services.async_redis_service import async_redis_service
+from app.services.dashboard_service import dashboard_service
+from app.services.listing_counts import shipment_counts
+from app.services.read_your_writes import read_your_writes
+from app.services.redis_service import redis_service
+from app.services.shipment_service import TRACKING_NUMBER_ATTEMPTS, row_errors
+from app.services.stats_service import stats_service, shipment_contribution
+from app.services.tracking_numbers import tracking_numbers
+from app.utils.exceptions import ValidationException
+from app.utils.uploads import save_upload
+
+logger = logging.getLogger(__name__)
+
+# Columns written by COPY: generated ones, then the ShipmentCreate fields
+IMPORT_COLUMNS = (
+    "id", "tracking_number", "user_id", "status", "currency", "created_at", "updated_at",
+    *ShipmentCreate.model_fields,
+)
+
+
+# Staged uploads, named <job_id>.csv
+STAGING_DIR = Path(tempfile.gettempdir()) / "shipment-imports"
+
+ACTIVE_JOB_STATUSES = ("queued", "running")
+
+
+def _job_key(job_id: UUID) -> str:
+    return f"import:shipments:{job_id}"
+
+
+def _is_stale(job: Dict[str, Any], now: datetime) -> bool:
+    """Whether an unfinished job has stopped heartbeating."""
+    if job["status"] not in ACTIVE_JOB_STATUSES:
+        return False
+    heartbeat = datetime.fromisoformat(job.get("heartbeat_at") or job["created_at"])
+    return now - heartbeat > timedelta(seconds=settings.SHIPMENT_IMPORT_STALE_SECONDS)
+
+
+def _checked(job: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Report a job whose worker went away as failed."""
+    if job and _is_stale(job, datetime.utcnow()):
+        return {**job, "status": "failed", "error": "Import interrupted"}
+    return job
+
+
+def _numbered_rows(reader: csv.DictReader) -> Iterator[Tuple[int, Dict[str, str]]]:
+    """Yield (CSV line number, row) pairs."""
+    for row in reader:
+        yield reader.line_num, row
+
+
+class ShipmentImportService:
+    """CSV shipment imports run as background jobs."""
+
+    @staticmethod
+    async def stage_upload(file: UploadFile, job_id: UUID) -> str:
+        """
+        Stream an uploaded CSV file to the job's staging file.
+
+        Returns:
+            Path of the copy; the import job deletes it when done
+
+        Raises:
+            UploadTooLargeException: If the file exceeds SHIPMENT_IMPORT_MAX_BYTES
+        """
+        STAGING_DIR.mkdir(parents=True, exist_ok=True)
+        path = STAGING_DIR / f"{job_id}.csv"
+        stored = await save_upload(file, path, settings.SHIPMENT_IMPORT_MAX_BYTES)
+        return str(stored.path)
+
+    @staticmethod
+    async def acreate_job(job_id: UUID, user_id: UUID, filename: str) -> Dict[str, Any]:
+        """Register a queued import job without blocking the event loop."""
+        now = datetime.utcnow().isoformat()
+        job = {
+            "job_id": str(job_id),
+            "user_id": str(user_id),
+            "filename": filename,
+            "status": "queued",
+            "processed_rows": 0,
+            "created": 0,
+            "rejected": 0,
+            "errors": [],
+            "error": None,
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "heartbeat_at": now,
+        }
+        await async_redis_service.set(
+            _job_key(job_id), job, expire=settings.SHIPMENT_IMPORT_JOB_TTL_SECONDS
+        )
+        return job
+
+    @staticmethod
+    def get_job(job_id: UUID) -> Optional[Dict[str, Any]]:
+        """Get an import job's progress, or None if unknown or expired."""
+        return _checked(redis_service.get(_job_key(job_id)))
+
+    @staticmethod
+    async def aget_job(job_id: UUID) -> Optional[Dict[str, Any]]:
+        """Get an import job's progress without blocking the event loop."""
+        return _checked(await async_redis_service.get(_job_key(job_id)))
+
+    @staticmethod
+    def _save_job(job: Dict[str, Any]) -> None:
+        """Store a job's progress; this is also its heartbeat."""
+        job["heartbeat_at"] = datetime.utcnow().isoformat()
+        redis_service.set(
+            _job_key(job["job_id"]), job, expire=settings.SHIPMENT_IMPORT_JOB_TTL_SECONDS
+        )
+
+    @staticmethod
+    def _heartbeat(job: Dict[str, Any], path: str) -> None:
+        """Save progress and touch the staged file, so it is not cleaned up."""
+        ShipmentImportService._save_job(job)
+        os.utime(path)
+
+    @staticmethod
+    def clean_up_stale_jobs() -> int:
+        """
+        Delete staged files whose job stopped heartbeating (e.g. the worker
+        running it restarted), marking the job failed.
+
+        Returns:
+            Number of staged files deleted
+        """
+        cutoff = time.time() - settings.SHIPMENT_IMPORT_STALE_SECONDS
+        removed = 0
+        for path in STAGING_DIR.glob("*.csv"):
+            try:
+                if path.stat().st_mtime > cutoff:
+                    continue
+            except FileNotFoundError:
+                continue
+
+            job = redis_service.get(_job_key(path.stem))
+            if job and job["status"] in ACTIVE_JOB_STATUSES:
+                job.update(
+                    status="failed", error="Import interrupted", finished_at=datetime.utcnow().isoformat()
+                )
+                ShipmentImportService._save_job(job)
+                logger.warning(f"⚠ Shipment import {path.stem} interrupted, marked failed")
+            path.unlink(missing_ok=True)
+            removed += 1
+
+        if removed:
+            logger.info(f"✓ Deleted {removed} stale shipment import files")
+        return removed
+
+    @staticmethod
+    def _parse_row(row: Dict[str, Optional[str]]) -> ShipmentCreate:
+        """
+        Validate one CSV row. Empty cells count as missing, and dimensions
+        is a JSON object.
+
+        Raises:
+            ValidationError: If the row is invalid
+        """
+        values: Dict[str, Any] = {
+            name: value for name, value in row.items() if name and value not in (None, "")
+        }
+        if "dimensions" in values:
+            try:
+                values["dimensions"] = json.loads(values["dimensions"])
+            except ValueError:
+                pass  # Left as text, so validation reports it
+        return ShipmentCreate.model_validate(values)
+
+    @staticmethod
+    def _copy_chunk(db: Session, user_id: UUID, shipments: List[ShipmentCreate]) -> None:
+        """COPY new shipments into the shipments table (uncommitted)."""
+        now = datetime.utcnow()
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for shipment_in in shipments:
+            values = {
+                "id": uuid.uuid4(),
+                "tracking_number": tracking_numbers.next(db),
+                "user_id": user_id,
+                # Enum columns store member names
+                "status": ShipmentStatus.PENDING.name,
+                "currency": DEFAULT_CURRENCY,
+                "created_at": now,
+                "updated_at": now,
+                **shipment_in.model_dump(),
+            }
+            values["service_type"] = shipment_in.service_type.name
+            if values["dimensions"] is not None:
+                values["dimensions"] = json.dumps(values["dimensions"])
+            # None is written as an unquoted empty field, i.e. NULL
+            writer.writerow(values[column] for column in IMPORT_COLUMNS)
+
+        buffer.seek(0)
+        cursor = db.connection().connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {Shipment.__tablename__} ({', '.join(IMPORT_COLUMNS)}) "
+                f"FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _import_chunk(db: Session, user_id: UUID, shipments: List[ShipmentCreate]) -> None:
+        """
+        Write a chunk and its stats contribution, and commit. A tracking
+        number collision (only possible with legacy numbers) retries the
+        chunk with fresh numbers.
+        """
+        # Every new shipment contributes the same (pending, no cost)
+        contribution = shipment_contribution(Shipment(status=ShipmentStatus.PENDING))
+        for attempt in range(1, TRACKING_NUMBER_ATTEMPTS + 1):
+            try:
+                ShipmentImportService._copy_chunk(db, user_id, shipments)
+                stats_service.record(db, None, {
+                    name: value * len(shipments) for name, value in contribution.items()
+                })
+                db.commit()
+                return
+            except UniqueViolation:
+                db.rollback()
+                if attempt == TRACKING_NUMBER_ATTEMPTS:
+                    raise
+                logger.warning("⚠ Tracking number collision in import chunk, retrying")
+            except Exception:
+                db.rollback()
+                raise
+
+    @staticmethod
+    def run(db: Session, job_id: UUID, user_id: UUID, path: str) -> Dict[str, Any]:
+        """
+        Import a saved CSV file, updating the job's progress after every
+        chunk, and delete the file.
+
+        Returns:
+            The finished job
+        """
+        job = ShipmentImportService.get_job(job_id) or {
+            "job_id": str(job_id), "processed_rows": 0, "created": 0, "rejected": 0, "errors": []
+        }
+        job.update(status="running", error=None, started_at=datetime.utcnow().isoformat())
+        ShipmentImportService._heartbeat(job, path)
+
+        required = {name for name, field in ShipmentCreate.model_fields.items() if field.is_required()}
+        try:
+            with open(path, newline="", encoding="utf-8-sig") as source:
+                reader = csv.DictReader(source)
+                missing = required - set(reader.fieldnames or ())
+                if missing:
+                    raise ValidationException(f"Missing columns: {', '.join(sorted(missing))}")
+
+                rows = _numbered_rows(reader)
+                while chunk := list(islice(rows, settings.SHIPMENT_IMPORT_CHUNK_ROWS)):
+                    valid = []
+                    for line, row in chunk:
+                        try:
+                            valid.append(ShipmentImportService._parse_row(row))
+                        except ValidationError as e:
+                            job["rejected"] += 1
+                            if len(job["errors"]) < settings.SHIPMENT_IMPORT_MAX_ERRORS:
+                                job["errors"].append({"row": line, "errors": row_errors(e)})
+
+                    if valid:
+                        ShipmentImportService._import_chunk(db, user_id, valid)
+                        job["created"] += len(valid)
+                        shipment_counts.invalidate(user_id)
+                        dashboard_service.invalidate(user_id)
+                        read_your_writes.mark(user_id)
+
+                    job["processed_rows"] += len(chunk)
+                    ShipmentImportService._heartbeat(job, path)
+
+            job["status"] = "completed"
+        except (ValidationException, UnicodeDecodeError, csv.Error) as e:
+            job.update(status="failed", error=getattr(e, "message", None) or f"Unreadable CSV: {e}")
+        except Exception as e:
+            logger.error(f"✗ Shipment import {job_id} failed: {e}")
+            job.update(status="failed", error="Import failed")
+        finally:
+            Path(path).unlink(missing_ok=True)
+
+        job["finished_at"] = datetime.utcnow().isoformat()
+        ShipmentImportService._save_job(job)
+        logger.info(
+            f"Shipment import {job_id} {job['status']}: {job['created']} created, "
+            f"{job['rejected']} rejected"
+        )
+        return job
+
+
+# Global shipment import service instance
+shipment_import_service = ShipmentImportService()
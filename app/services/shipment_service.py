@@ -1,61 +1,121 @@
 """
 Shipment CRUD service with SQL injection protection via SQLAlchemy ORM.
 """
-from typing import Optional, List, Tuple
+from typing import Any, Dict, List, Optional, Sequence, Union
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
-from sqlalchemy import or_, desc, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, select, Select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import IntegrityError
 from uuid import UUID
 from datetime import datetime
-import secrets
 import logging
+import uuid
 
 from app.models.shipment import Shipment, ShipmentStatus
+from app.models.archive import ArchivedShipment
 from app.schemas.shipment import ShipmentCreate, ShipmentUpdate
-from app.services.redis_service import redis_service
+from app.core.config import settings
+from app.services.cache import ReadModelCache
+from app.services.read_models import ShipmentSnapshot
+from app.services.dashboard_service import dashboard_service
+from app.services.read_your_writes import read_your_writes
+from app.services.listing_counts import CountScope, afetch_page, fetch_page, shipment_counts
+from app.services.stats_service import stats_service, shipment_contribution
+from app.services.tracking_numbers import tracking_numbers
+from app.utils.exceptions import ValidationException
+from app.utils.pagination import CountMode, Page
 
 logger = logging.getLogger(__name__)
 
+# Rows per multi-row INSERT in create_bulk (keeps bind params well under
+# the PostgreSQL protocol limit of 32767)
+BULK_INSERT_CHUNK_ROWS = 1000
+# Fresh tracking numbers tried when one collides with an existing shipment
+# (only possible for numbers issued before the sequence-based generator)
+TRACKING_NUMBER_ATTEMPTS = 3
+
+# Cache-aside store for shipment read models
+shipment_cache: ReadModelCache[ShipmentSnapshot] = ReadModelCache(
+    "shipment", ShipmentSnapshot, ttl=settings.SHIPMENT_CACHE_TTL_SECONDS
+)
+
+
+def row_errors(error: ValidationError) -> List[Dict[str, Any]]:
+    """Format a row's validation errors like the API's 422 responses."""
+    return [
+        {
+            "field": " -> ".join(str(loc) for loc in item["loc"]),
+            "message": item["msg"],
+            "type": item["type"]
+        }
+        for item in error.errors()
+    ]
+
 
 class ShipmentService:
     """Shipment CRUD operations."""
     
     @staticmethod
-    def generate_tracking_number() -> str:
-        """Generate unique tracking number."""
-        prefix = "GS"
-        random_part = secrets.token_hex(6).upper()
-        return f"{prefix}{random_part}"
-    
-    @staticmethod
-    def get_by_id(db: Session, shipment_id: UUID) -> Optional[Shipment]:
+    def get_by_id(
+        db: Session,
+        shipment_id: UUID
+    ) -> Optional[Union[Shipment, ArchivedShipment]]:
         """
-        Get shipment by ID.
+        Get shipment by ID, falling through to the archive on a miss.
+        Always hits the database; use get_snapshot for cached reads.
         SQLAlchemy ORM prevents SQL injection.
         """
-        cache_key = f"shipment:{shipment_id}"
-        cached = redis_service.get(cache_key)
-        if cached:
-            return Shipment(**cached)
-        
         shipment = db.query(Shipment).filter(Shipment.id == shipment_id).first()
-        
-        if shipment:
-            redis_service.set(cache_key, shipment.__dict__, expire=300)
-        
+        if shipment is None:
+            return db.get(ArchivedShipment, shipment_id)
         return shipment
     
+    @staticmethod
+    def get_snapshot(db: Session, shipment_id: UUID) -> Optional[ShipmentSnapshot]:
+        """
+        Get a read-only shipment snapshot by ID, served from cache when possible.
+        SQLAlchemy ORM prevents SQL injection.
+        """
+        return shipment_cache.get_or_load(
+            shipment_id,
+            lambda: ShipmentService.get_by_id(db, shipment_id)
+        )
+    
     @staticmethod
     def get_by_tracking_number(
         db: Session,
         tracking_number: str
-    ) -> Optional[Shipment]:
+    ) -> Optional[Union[Shipment, ArchivedShipment]]:
         """
-        Get shipment by tracking number.
+        Get shipment by tracking number, falling through to the archive on a miss.
         SQLAlchemy ORM prevents SQL injection.
         """
-        return db.query(Shipment).filter(
+        shipment = db.query(Shipment).filter(
             Shipment.tracking_number == tracking_number
         ).first()
+        if shipment is None:
+            return db.query(ArchivedShipment).filter(
+                ArchivedShipment.tracking_number == tracking_number
+            ).first()
+        return shipment
+    
+    @staticmethod
+    def user_shipments_statement(
+        user_id: UUID,
+        status: Optional[ShipmentStatus] = None
+    ) -> Select:
+        """
+        Build the filtered (unordered, unpaginated) user shipments query.
+        Shared by the sync and async services.
+        """
+        stmt = select(Shipment).where(Shipment.user_id == user_id)
+        
+        if status:
+            stmt = stmt.where(Shipment.status == status)
+        
+        return stmt
     
     @staticmethod
     def get_user_shipments(
@@ -63,21 +123,31 @@ class ShipmentService:
         user_id: UUID,
         skip: int = 0,
         limit: int = 100,
-        status: Optional[ShipmentStatus] = None
-    ) -> Tuple[List[Shipment], int]:
+        status: Optional[ShipmentStatus] = None,
+        cursor: Optional[str] = None,
+        count: CountMode = CountMode.EXACT,
+        fields: Optional[Sequence[str]] = None
+    ) -> Page:
         """
         Get user's shipments with pagination.
+        
+        Pass the next_cursor of the previous page as cursor for keyset
+        pagination; skip is kept for backward compatibility. count selects
+        how the total is computed, and fields restricts the columns loaded.
         SQLAlchemy ORM prevents SQL injection.
         """
-        query = db.query(Shipment).filter(Shipment.user_id == user_id)
-        
-        if status:
-            query = query.filter(Shipment.status == status)
-        
-        total = query.count()
-        shipments = query.order_by(desc(Shipment.created_at)).offset(skip).limit(limit).all()
+        stmt = ShipmentService.user_shipments_statement(user_id, status)
+        scope = CountScope(shipment_counts, user_id, status.value if status else "all")
         
-        return shipments, total
+        return fetch_page(db, stmt, Shipment, skip, limit, cursor, count, scope, fields)
+    
+    @staticmethod
+    def invalidate_caches(shipment: Shipment) -> None:
+        """Drop cached reads that include a shipment after it is written."""
+        shipment_cache.invalidate(shipment.id)
+        shipment_counts.invalidate(shipment.user_id)
+        dashboard_service.invalidate(shipment.user_id)
+        read_your_writes.mark(shipment.user_id)
     
     @staticmethod
     def create(
@@ -89,25 +159,131 @@ class ShipmentService:
         Create new shipment.
         SQLAlchemy ORM prevents SQL injection.
         """
-        # Generate unique tracking number
-        tracking_number = ShipmentService.generate_tracking_number()
-        while ShipmentService.get_by_tracking_number(db, tracking_number):
-            tracking_number = ShipmentService.generate_tracking_number()
-        
-        # Create shipment object
-        db_shipment = Shipment(
-            tracking_number=tracking_number,
-            user_id=user_id,
-            **shipment_in.model_dump()
-        )
+        # Tracking numbers are unique by construction; the savepoint retry
+        # only covers collisions with legacy numbers
+        for attempt in range(1, TRACKING_NUMBER_ATTEMPTS + 1):
+            db_shipment = Shipment(
+                tracking_number=tracking_numbers.next(db),
+                user_id=user_id,
+                **shipment_in.model_dump()
+            )
+            try:
+                with db.begin_nested():
+                    db.add(db_shipment)
+                break
+            except IntegrityError as e:
+                if "tracking_number" not in str(e.orig) or attempt == TRACKING_NUMBER_ATTEMPTS:
+                    db.rollback()
+                    raise
+                logger.warning(f"⚠ Tracking number collision, retrying: {db_shipment.tracking_number}")
         
-        db.add(db_shipment)
+        tracking_number = db_shipment.tracking_number
+        stats_service.record(db, None, shipment_contribution(db_shipment))
         db.commit()
         db.refresh(db_shipment)
         
+        ShipmentService.invalidate_caches(db_shipment)
+        
         logger.info(f"Shipment created: {tracking_number}")
         return db_shipment
     
+    @staticmethod
+    def create_bulk(
+        db: Session,
+        user_id: UUID,
+        rows: List[Dict[str, Any]]
+    ) -> dict:
+        """
+        Create many shipments in one transaction.
+        
+        Each row is validated against ShipmentCreate; invalid rows are
+        reported by index and skipped. Valid rows get locally generated
+        tracking numbers and are written with multi-row
+        INSERT ... ON CONFLICT (tracking_number) DO NOTHING RETURNING, in
+        chunks, so there are no per-row uniqueness lookups. Rows whose
+        tracking number collided with a legacy one get a fresh number and
+        are retried.
+        SQLAlchemy ORM prevents SQL injection.
+        
+        Returns:
+            dict: "created" (index, id, tracking_number) and "errors"
+            (index, errors), both in request order
+        """
+        if len(rows) > settings.BULK_SHIPMENT_MAX_ROWS:
+            raise ValidationException(
+                f"At most {settings.BULK_SHIPMENT_MAX_ROWS} shipments per request"
+            )
+        
+        now = datetime.utcnow()
+        pending: Dict[UUID, tuple] = {}
+        errors = []
+        for index, row in enumerate(rows):
+            try:
+                shipment_in = ShipmentCreate.model_validate(row)
+            except ValidationError as e:
+                errors.append({"index": index, "errors": row_errors(e)})
+                continue
+            
+            shipment_id = uuid.uuid4()
+            pending[shipment_id] = (index, {
+                "id": shipment_id,
+                "user_id": user_id,
+                "status": ShipmentStatus.PENDING,
+                "created_at": now,
+                "updated_at": now,
+                **shipment_in.model_dump()
+            })
+        
+        created = []
+        if pending:
+            try:
+                for _ in range(TRACKING_NUMBER_ATTEMPTS):
+                    ids = list(pending)
+                    for start in range(0, len(ids), BULK_INSERT_CHUNK_ROWS):
+                        values = [pending[i][1] for i in ids[start:start + BULK_INSERT_CHUNK_ROWS]]
+                        for row_values in values:
+                            row_values["tracking_number"] = tracking_numbers.next(db)
+                        
+                        stmt = (
+                            insert(Shipment)
+                            .values(values)
+                            .on_conflict_do_nothing(index_elements=[Shipment.tracking_number])
+                            .returning(Shipment.id, Shipment.tracking_number)
+                        )
+                        for shipment_id, tracking_number in db.execute(stmt):
+                            index, _ = pending.pop(shipment_id)
+                            created.append({
+                                "index": index,
+                                "id": shipment_id,
+                                "tracking_number": tracking_number
+                            })
+                    if not pending:
+                        break
+                else:
+                    raise RuntimeError(
+                        f"No free tracking numbers for {len(pending)} shipments"
+                    )
+                
+                # Every new shipment contributes the same (pending, no cost)
+                contribution = shipment_contribution(Shipment(status=ShipmentStatus.PENDING))
+                stats_service.record(db, None, {
+                    name: value * len(created) for name, value in contribution.items()
+                })
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            
+            shipment_counts.invalidate(user_id)
+            dashboard_service.invalidate(user_id)
+            read_your_writes.mark(user_id)
+        
+        created.sort(key=lambda item: item["index"])
+        logger.info(
+            f"Bulk shipments created: {len(created)} created, {len(errors)} rejected"
+        )
+        return {"created": created, "errors": errors}
+    
     @staticmethod
     def update(
         db: Session,
@@ -121,58 +297,97 @@ class ShipmentService:
         shipment = ShipmentService.get_by_id(db, shipment_id)
         if not shipment:
             return None
+        if isinstance(shipment, ArchivedShipment):
+            raise ValidationException("Archived shipments cannot be modified")
+        
+        before = shipment_contribution(shipment)
         
         # Update fields
         update_data = shipment_in.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(shipment, field, value)
         
+        stats_service.record(db, before, shipment_contribution(shipment))
         db.commit()
         db.refresh(shipment)
         
-        # Invalidate cache
-        redis_service.delete(f"shipment:{shipment_id}")
+        ShipmentService.invalidate_caches(shipment)
         
         logger.info(f"Shipment updated: {shipment.tracking_number}")
         return shipment
+
+
+class AsyncShipmentService:
+    """Shipment read operations on an AsyncSession (hot read paths)."""
     
     @staticmethod
-    def get_dashboard_stats(db: Session, user_id: UUID) -> dict:
+    async def get_by_id(
+        db: AsyncSession,
+        shipment_id: UUID
+    ) -> Optional[Union[Shipment, ArchivedShipment]]:
         """
-        Get dashboard statistics for user.
+        Get shipment by ID, falling through to the archive on a miss.
         SQLAlchemy ORM prevents SQL injection.
         """
-        # Active shipments
-        active_count = db.query(func.count(Shipment.id)).filter(
-            Shipment.user_id == user_id,
-            Shipment.status.in_([
-                ShipmentStatus.PENDING,
-                ShipmentStatus.PROCESSING,
-                ShipmentStatus.PICKED_UP,
-                ShipmentStatus.IN_TRANSIT,
-                ShipmentStatus.CUSTOMS,
-                ShipmentStatus.OUT_FOR_DELIVERY
-            ])
-        ).scalar()
-        
-        # Delivered shipments
-        delivered_count = db.query(func.count(Shipment.id)).filter(
-            Shipment.user_id == user_id,
-            Shipment.status == ShipmentStatus.DELIVERED
-        ).scalar()
-        
-        # Total spent
-        total_spent = db.query(func.sum(Shipment.actual_cost)).filter(
-            Shipment.user_id == user_id,
-            Shipment.actual_cost.isnot(None)
-        ).scalar() or 0
-        
-        return {
-            "active_shipments": active_count or 0,
-            "delivered_shipments": delivered_count or 0,
-            "total_spent": float(total_spent)
-        }
+        shipment = await db.get(Shipment, shipment_id)
+        if shipment is None:
+            return await db.get(ArchivedShipment, shipment_id)
+        return shipment
+    
+    @staticmethod
+    async def get_snapshot(db: AsyncSession, shipment_id: UUID) -> Optional[ShipmentSnapshot]:
+        """
+        Get a read-only shipment snapshot by ID, served from cache when possible.
+        SQLAlchemy ORM prevents SQL injection.
+        """
+        return await shipment_cache.aget_or_load(
+            shipment_id,
+            lambda: AsyncShipmentService.get_by_id(db, shipment_id)
+        )
+    
+    @staticmethod
+    async def get_by_tracking_number(
+        db: AsyncSession,
+        tracking_number: str
+    ) -> Optional[Union[Shipment, ArchivedShipment]]:
+        """
+        Get shipment by tracking number, falling through to the archive on a miss.
+        SQLAlchemy ORM prevents SQL injection.
+        """
+        shipment = await db.scalar(
+            select(Shipment).where(Shipment.tracking_number == tracking_number)
+        )
+        if shipment is None:
+            return await db.scalar(
+                select(ArchivedShipment).where(ArchivedShipment.tracking_number == tracking_number)
+            )
+        return shipment
+    
+    @staticmethod
+    async def get_user_shipments(
+        db: AsyncSession,
+        user_id: UUID,
+        skip: int = 0,
+        limit: int = 100,
+        status: Optional[ShipmentStatus] = None,
+        cursor: Optional[str] = None,
+        count: CountMode = CountMode.EXACT,
+        fields: Optional[Sequence[str]] = None
+    ) -> Page:
+        """
+        Get user's shipments with pagination.
+        
+        Pass the next_cursor of the previous page as cursor for keyset
+        pagination; skip is kept for backward compatibility. count selects
+        how the total is computed, and fields restricts the columns loaded.
+        SQLAlchemy ORM prevents SQL injection.
+        """
+        stmt = ShipmentService.user_shipments_statement(user_id, status)
+        scope = CountScope(shipment_counts, user_id, status.value if status else "all")
+        
+        return await afetch_page(db, stmt, Shipment, skip, limit, cursor, count, scope, fields)
 
 
-# Global shipment service instance
+# Global shipment service instances
 shipment_service = ShipmentService()
+async_shipment_service = AsyncShipmentService()
@@ -0,0 +1,294 @@
+"""
+Incrementally maintained admin system statistics.
+
+Each counted row contributes to a set of named counters (see the
+*_contribution functions). Services call StatsService.record with a row's
+contribution before and after a write, in the same transaction as the
+write, so the counters commit or roll back together with the data.
+Reading the stats is a lookup of a few dozen counter rows instead of full
+table scans.
+
+New-user counts are kept in per-day buckets ("users.created:YYYY-MM-DD").
+StatsService.reconcile recomputes every counter from the source tables to
+correct drift (e.g. rows written outside the services) and prunes old
+buckets; the API runs it periodically.
+"""
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, Optional
+import logging
+
+from sqlalchemy import Date, cast, delete, func, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.models.shipment import DEFAULT_CURRENCY, Shipment, ShipmentStatus
+from app.models.quote import Quote, QuoteStatus
+from app.models.contact_message import ContactMessage, MessageStatus
+from app.models.system_counter import SystemCounter
+from app.models.archive import ArchivedShipment
+
+logger = logging.getLogger(__name__)
+
+Counters = Dict[str, Decimal]
+
+NEW_USER_WINDOW_DAYS = 30
+USER_CREATED_PREFIX = "users.created:"
+
+# Shipments counted as active on the admin wallboard
+ADMIN_ACTIVE_SHIPMENT_STATUSES = (
+    ShipmentStatus.PENDING,
+    ShipmentStatus.PROCESSING,
+    ShipmentStatus.IN_TRANSIT,
+    ShipmentStatus.CUSTOMS,
+    ShipmentStatus.OUT_FOR_DELIVERY,
+)
+
+
+def user_contribution(user: User) -> Counters:
+    """Counters a user row contributes to."""
+    return {
+        "users.total": Decimal(1),
+        "users.active": Decimal(int(bool(user.is_active))),
+        f"{USER_CREATED_PREFIX}{user.created_at.date().isoformat()}": Decimal(1),
+    }
+
+
+def shipment_contribution(shipment: Shipment) -> Counters:
+    """Counters a shipment row contributes to."""
+    return {
+        "shipments.total": Decimal(1),
+        "shipments.active": Decimal(int(shipment.status in ADMIN_ACTIVE_SHIPMENT_STATUSES)),
+        "shipments.delivered": Decimal(int(shipment.status == ShipmentStatus.DELIVERED)),
+        "shipments.revenue": Decimal(shipment.actual_cost or 0),
+    }
+
+
+def quote_contribution(quote: Quote) -> Counters:
+    """Counters a quote row contributes to."""
+    return {
+        "quotes.total": Decimal(1),
+        "quotes.pending": Decimal(int(quote.status == QuoteStatus.PENDING)),
+    }
+
+
+def message_contribution(message: ContactMessage) -> Counters:
+    """Counters a contact message row contributes to."""
+    return {
+        "messages.unread": Decimal(int(message.status == MessageStatus.NEW)),
+    }
+
+
+class StatsService:
+    """Admin system statistics backed by the system_counters table."""
+
+    @staticmethod
+    def record(
+        db: Session,
+        before: Optional[Counters],
+        after: Optional[Counters]
+    ) -> None:
+        """
+        Apply the change in a row's contribution to the counters.
+
+        Runs in the caller's transaction; the caller commits. Call it right
+        before the commit so counter row locks are held briefly.
+
+        Args:
+            db: Database session
+            before: Contribution before the write (None for inserts)
+            after: Contribution after the write (None for deletes)
+        """
+        deltas: Counters = {}
+        for name, value in (after or {}).items():
+            deltas[name] = deltas.get(name, 0) + value
+        for name, value in (before or {}).items():
+            deltas[name] = deltas.get(name, 0) - value
+
+        # Sorted so concurrent writers lock counter rows in the same order
+        rows = [{"name": name, "value": deltas[name]} for name in sorted(deltas) if deltas[name]]
+        if not rows:
+            return
+
+        stmt = insert(SystemCounter).values(rows)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[SystemCounter.name],
+            set_={
+                "value": SystemCounter.value + stmt.excluded.value,
+                "updated_at": datetime.utcnow(),
+            }
+        ))
+
+    @staticmethod
+    def get_system_stats(db: Session) -> dict:
+        """
+        Read the admin system statistics from the counters.
+
+        new_last_30_days has day granularity.
+        """
+        counters = dict(db.execute(select(SystemCounter.name, SystemCounter.value)).all())
+
+        first_day = (datetime.utcnow() - timedelta(days=NEW_USER_WINDOW_DAYS)).date()
+        new_users = sum(
+            value for name, value in counters.items()
+            if name.startswith(USER_CREATED_PREFIX)
+            and date.fromisoformat(name[len(USER_CREATED_PREFIX):]) >= first_day
+        )
+
+        def count(name: str) -> int:
+            return int(counters.get(name, 0))
+
+        return {
+            "users": {
+                "total": count("users.total"),
+                "active": count("users.active"),
+                "new_last_30_days": int(new_users)
+            },
+            "shipments": {
+                "total": count("shipments.total"),
+                "active": count("shipments.active"),
+                "delivered": count("shipments.delivered")
+            },
+            "quotes": {
+                "total": count("quotes.total"),
+                "pending": count("quotes.pending")
+            },
+            "messages": {
+                "unread": count("messages.unread")
+            },
+            "revenue": {
+                "total": float(counters.get("shipments.revenue", 0)),
+                "currency": DEFAULT_CURRENCY
+            }
+        }
+
+    @staticmethod
+    def _count_users(db: Session) -> Counters:
+        row = db.execute(select(
+            func.count(),
+            func.count().filter(User.is_active == True),  # noqa: E712
+        ).select_from(User)).one()
+        counters: Counters = {
+            "users.total": Decimal(row[0]),
+            "users.active": Decimal(row[1]),
+        }
+
+        # One bucket per day in the window, plus a day of slack
+        since = datetime.combine(
+            datetime.utcnow().date() - timedelta(days=NEW_USER_WINDOW_DAYS + 1),
+            datetime.min.time()
+        )
+        day = cast(User.created_at, Date)
+        for created_on, created in db.execute(
+            select(day, func.count()).where(User.created_at >= since).group_by(day)
+        ):
+            counters[f"{USER_CREATED_PREFIX}{created_on.isoformat()}"] = Decimal(created)
+
+        return counters
+
+    @staticmethod
+    def _count_shipments(db: Session) -> Counters:
+        row = db.execute(select(
+            func.count(),
+            func.count().filter(Shipment.status.in_(ADMIN_ACTIVE_SHIPMENT_STATUSES)),
+            func.count().filter(Shipment.status == ShipmentStatus.DELIVERED),
+            func.coalesce(func.sum(Shipment.actual_cost), 0),
+        ).select_from(Shipment)).one()
+        # Archived shipments are finished, so never active
+        archived = db.execute(select(
+            func.count(),
+            func.count().filter(ArchivedShipment.status == ShipmentStatus.DELIVERED),
+            func.coalesce(func.sum(ArchivedShipment.actual_cost), 0),
+        ).select_from(ArchivedShipment)).one()
+        return {
+            "shipments.total": Decimal(row[0] + archived[0]),
+            "shipments.active": Decimal(row[1]),
+            "shipments.delivered": Decimal(row[2] + archived[1]),
+            "shipments.revenue": Decimal(row[3] + archived[2]),
+        }
+
+    @staticmethod
+    def _count_quotes(db: Session) -> Counters:
+        row = db.execute(select(
+            func.count(),
+            func.count().filter(Quote.status == QuoteStatus.PENDING),
+        ).select_from(Quote)).one()
+        return {
+            "quotes.total": Decimal(row[0]),
+            "quotes.pending": Decimal(row[1]),
+        }
+
+    @staticmethod
+    def _count_messages(db: Session) -> Counters:
+        unread = db.scalar(
+            select(func.count())
+            .select_from(ContactMessage)
+            .where(ContactMessage.status == MessageStatus.NEW)
+        )
+        return {"messages.unread": Decimal(unread)}
+
+    @staticmethod
+    def reconcile(db: Session) -> Counters:
+        """
+        Recompute every counter from the source tables.
+
+        Each group of counters is reconciled in its own transaction with its
+        counter rows locked, so writes that commit concurrently are either
+        seen by the recount or applied on top of it, never lost.
+
+        Returns:
+            Corrections applied (recounted minus stored), zero entries omitted
+        """
+        groups: Dict[str, Callable[[Session], Counters]] = {
+            "users.": StatsService._count_users,
+            "shipments.": StatsService._count_shipments,
+            "quotes.": StatsService._count_quotes,
+            "messages.": StatsService._count_messages,
+        }
+        corrections: Counters = {}
+
+        for prefix, recount in groups.items():
+            try:
+                stored = dict(db.execute(
+                    select(SystemCounter.name, SystemCounter.value)
+                    .where(SystemCounter.name.startswith(prefix))
+                    .order_by(SystemCounter.name)
+                    .with_for_update()
+                ).all())
+                actual = recount(db)
+
+                stale = [name for name in stored if name not in actual]
+                for name in sorted(set(stored) | set(actual)):
+                    if name in stale and name.startswith(USER_CREATED_PREFIX):
+                        # Day bucket aged out of the window, not drift
+                        continue
+                    drift = actual.get(name, 0) - stored.get(name, 0)
+                    if drift:
+                        corrections[name] = drift
+
+                if stale:
+                    db.execute(delete(SystemCounter).where(SystemCounter.name.in_(stale)))
+
+                if actual:
+                    stmt = insert(SystemCounter).values([
+                        {"name": name, "value": actual[name]} for name in sorted(actual)
+                    ])
+                    db.execute(stmt.on_conflict_do_update(
+                        index_elements=[SystemCounter.name],
+                        set_={"value": stmt.excluded.value, "updated_at": datetime.utcnow()}
+                    ))
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+        if corrections:
+            logger.warning(f"⚠ System stats drift corrected: {corrections}")
+        else:
+            logger.info("✓ System stats reconciled, no drift")
+        return corrections
+
+
+# Global stats service instance
+stats_service = StatsService()
@@ -0,0 +1,114 @@
+"""
+Tracking number generator.
+
+Tracking numbers are "GS" followed by 12 upper-case hex digits, i.e. a
+48-bit value. Each number is a keyed Feistel permutation of a value drawn
+from the tracking_number_seq Postgres sequence, so distinct sequence
+values always give distinct numbers, and without the key consecutive
+shipments get unrelated, non-guessable numbers.
+
+The sequence advances in blocks of TRACKING_NUMBER_BLOCK_SIZE, and each
+process hands out a block from memory. Only one nextval round trip is
+needed per block, instead of a uniqueness SELECT per shipment. The unique
+constraint on shipments.tracking_number remains the authority. Callers
+retry on conflict as a safety net, e.g. against numbers issued before this
+generator existed.
+"""
+from typing import Optional
+import hashlib
+import hmac
+import logging
+import threading
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.shipment import TRACKING_NUMBER_BLOCK_SIZE, tracking_number_seq
+
+logger = logging.getLogger(__name__)
+
+TRACKING_NUMBER_PREFIX = "GS"
+TRACKING_NUMBER_BITS = 48
+FEISTEL_ROUNDS = 8
+
+_HALF_BITS = TRACKING_NUMBER_BITS // 2
+_HALF_MASK = (1 << _HALF_BITS) - 1
+_HALF_BYTES = _HALF_BITS // 8
+
+
+class FeistelPermutation:
+    """Keyed bijection on TRACKING_NUMBER_BITS-bit integers (balanced Feistel network)."""
+
+    def __init__(self, key: str, rounds: int = FEISTEL_ROUNDS):
+        self.key = key.encode()
+        self.rounds = rounds
+
+    def _round(self, round_index: int, half: int) -> int:
+        digest = hmac.new(
+            self.key,
+            bytes([round_index]) + half.to_bytes(_HALF_BYTES, "big"),
+            hashlib.sha256
+        ).digest()
+        return int.from_bytes(digest[:_HALF_BYTES], "big")
+
+    def encrypt(self, value: int) -> int:
+        """Map a value in [0, 2**TRACKING_NUMBER_BITS) to its permuted value."""
+        if not 0 <= value < (1 << TRACKING_NUMBER_BITS):
+            raise ValueError(f"Value out of range for {TRACKING_NUMBER_BITS}-bit permutation")
+
+        left, right = value >> _HALF_BITS, value & _HALF_MASK
+        for round_index in range(self.rounds):
+            left, right = right, left ^ self._round(round_index, right)
+        return (left << _HALF_BITS) | right
+
+    def decrypt(self, value: int) -> int:
+        """Inverse of encrypt."""
+        if not 0 <= value < (1 << TRACKING_NUMBER_BITS):
+            raise ValueError(f"Value out of range for {TRACKING_NUMBER_BITS}-bit permutation")
+
+        left, right = value >> _HALF_BITS, value & _HALF_MASK
+        for round_index in reversed(range(self.rounds)):
+            left, right = right ^ self._round(round_index, left), left
+        return (left << _HALF_BITS) | right
+
+
+def format_tracking_number(value: int) -> str:
+    """Format a permuted value as a tracking number."""
+    return f"{TRACKING_NUMBER_PREFIX}{value:0{TRACKING_NUMBER_BITS // 4}X}"
+
+
+class TrackingNumberGenerator:
+    """Hands out tracking numbers from per-process blocks of the sequence."""
+
+    def __init__(self, permutation: FeistelPermutation, block_size: int = TRACKING_NUMBER_BLOCK_SIZE):
+        self.permutation = permutation
+        self.block_size = block_size
+        self._next: Optional[int] = None
+        self._end = 0
+        self._lock = threading.Lock()
+
+    def next(self, db: Session) -> str:
+        """
+        Get a new tracking number.
+
+        Reserves a new block through db when the current one is used up.
+        Sequence values are not transactional, so the reservation survives
+        a rollback of the caller's transaction.
+        """
+        with self._lock:
+            if self._next is None or self._next >= self._end:
+                start = db.scalar(select(tracking_number_seq.next_value()))
+                self._next, self._end = start, start + self.block_size
+                logger.debug(f"Tracking number block reserved: {start}")
+
+            value = self._next
+            self._next += 1
+
+        return format_tracking_number(self.permutation.encrypt(value))
+
+
+# Global tracking number generator instance
+tracking_numbers = TrackingNumberGenerator(
+    FeistelPermutation(settings.TRACKING_NUMBER_KEY)
+)
@@ -1,16 +1,18 @@
 """
 User CRUD service with SQL injection protection via SQLAlchemy ORM.
 """
-from typing import Optional, List
+from typing import Optional, List, Union
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, select
 from uuid import UUID
 import logging
 
 from app.models.user import User
 from app.schemas.user import UserCreate, UserUpdate
 from app.core.security import get_password_hash, verify_password
-from app.services.redis_service import redis_service
+from app.services.principal_cache import principal_cache, Principal
+from app.services.stats_service import stats_service, user_contribution
 
 logger = logging.getLogger(__name__)
 
@@ -24,20 +26,18 @@ class UserService:
         Get user by ID.
         SQLAlchemy ORM prevents SQL injection.
         """
-        # Try cache first
-        cache_key = f"user:{user_id}"
-        cached = redis_service.get(cache_key)
-        if cached:
-            return User(**cached)
-        
-        # Query database
-        user = db.query(User).filter(User.id == user_id).first()
-        
-        # Cache result
-        if user:
-            redis_service.set(cache_key, user.__dict__, expire=300)
-        
-        return user
+        return db.query(User).filter(User.id == user_id).first()
+    
+    @staticmethod
+    def get_principal(db: Session, user_id: UUID) -> Optional[Principal]:
+        """
+        Get the read-only principal for a user, served from the principal
+        cache when possible and loaded from the database on a miss.
+        """
+        return principal_cache.get_or_load(
+            user_id,
+            lambda: UserService.get_by_id(db, user_id)
+        )
     
     @staticmethod
     def get_by_email(db: Session, email: str) -> Optional[User]:
@@ -78,6 +78,8 @@ class UserService:
         )
         
         db.add(db_user)
+        db.flush()
+        stats_service.record(db, None, user_contribution(db_user))
         db.commit()
         db.refresh(db_user)
         
@@ -98,20 +100,45 @@ class UserService:
         if not user:
             return None
         
+        before = user_contribution(user)
+        
         # Update fields
         update_data = user_in.model_dump(exclude_unset=True)
         for field, value in update_data.items():
             setattr(user, field, value)
         
+        stats_service.record(db, before, user_contribution(user))
         db.commit()
         db.refresh(user)
         
         # Invalidate cache
-        redis_service.delete(f"user:{user_id}")
+        principal_cache.invalidate(user_id)
         
         logger.info(f"User updated: {user.email}")
         return user
     
+    @staticmethod
+    def deactivate(db: Session, user_id: UUID) -> Optional[User]:
+        """
+        Deactivate user.
+        SQLAlchemy ORM prevents SQL injection.
+        """
+        user = UserService.get_by_id(db, user_id)
+        if not user:
+            return None
+        
+        before = user_contribution(user)
+        user.is_active = False
+        stats_service.record(db, before, user_contribution(user))
+        db.commit()
+        db.refresh(user)
+        
+        # Invalidate cache so no worker keeps authenticating this user
+        principal_cache.invalidate(user_id)
+        
+        logger.info(f"User deactivated: {user.email}")
+        return user
+    
     @staticmethod
     def authenticate(
         db: Session,
@@ -129,15 +156,48 @@ class UserService:
         return user
     
     @staticmethod
-    def is_active(user: User) -> bool:
+    def is_active(user: Union[User, Principal]) -> bool:
         """Check if user is active."""
         return user.is_active
     
     @staticmethod
-    def is_superuser(user: User) -> bool:
+    def is_superuser(user: Union[User, Principal]) -> bool:
         """Check if user is superuser."""
         return user.is_superuser
 
 
-# Global user service instance
+
+class AsyncUserService:
+    """User read operations on an AsyncSession (hot read paths)."""
+    
+    @staticmethod
+    async def get_by_id(db: AsyncSession, user_id: UUID) -> Optional[User]:
+        """
+        Get user by ID.
+        SQLAlchemy ORM prevents SQL injection.
+        """
+        return await db.get(User, user_id)
+    
+    @staticmethod
+    async def get_by_email(db: AsyncSession, email: str) -> Optional[User]:
+        """
+        Get user by email.
+        SQLAlchemy ORM prevents SQL injection.
+        """
+        return await db.scalar(select(User).where(User.email == email))
+    
+    @staticmethod
+    async def get_principal(db: AsyncSession, user_id: UUID) -> Optional[Principal]:
+        """
+        Get the read-only principal for a user, served from the principal
+        cache when possible and loaded from the database on a miss.
+        """
+        return await principal_cache.aget_or_load(
+            user_id,
+            lambda: AsyncUserService.get_by_id(db, user_id)
+        )
+
+
+# Global user service instances
 user_service = UserService()
+async_user_service = AsyncUserService()
@@ -2,9 +2,19 @@
 Background tasks for async operations.
 """
 from fastapi import BackgroundTasks
+from starlette.concurrency import run_in_threadpool
+import asyncio
 import logging
 
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.archive_service import archive_service
+from app.services.document_service import document_service
 from app.services.email_service import email_service
+from app.services.partition_service import partition_service
+from app.services.redis_service import redis_service
+from app.services.shipment_import_service import shipment_import_service
+from app.services.stats_service import stats_service
 
 logger = logging.getLogger(__name__)
 
@@ -22,3 +32,121 @@ def process_shipment_update(shipment_id: str, status: str):
     """Background task to process shipment update."""
     logger.info(f"Processing shipment update: {shipment_id} -> {status}")
     # Add your business logic here
+
+
+def import_shipments_task(job_id: str, user_id: str, path: str):
+    """Background task to import a saved shipment CSV file."""
+    db = SessionLocal()
+    try:
+        shipment_import_service.run(db, job_id, user_id, path)
+    finally:
+        db.close()
+
+
+def clean_up_shipment_imports():
+    """Delete staged import files of jobs that were interrupted."""
+    try:
+        shipment_import_service.clean_up_stale_jobs()
+    except Exception as e:
+        logger.error(f"Shipment import cleanup failed: {e}")
+
+
+async def clean_up_shipment_imports_periodically():
+    """Run clean_up_shipment_imports every SHIPMENT_IMPORT_CLEANUP_INTERVAL_SECONDS."""
+    while True:
+        await run_in_threadpool(clean_up_shipment_imports)
+        await asyncio.sleep(settings.SHIPMENT_IMPORT_CLEANUP_INTERVAL_SECONDS)
+
+
+def reconcile_system_stats():
+    """Reconcile admin stats counters; at most one worker per interval."""
+    interval = settings.STATS_RECONCILE_INTERVAL_SECONDS
+    if not redis_service.acquire_lock("lock:stats_reconcile", interval):
+        return
+    
+    db = SessionLocal()
+    try:
+        stats_service.reconcile(db)
+    except Exception as e:
+        logger.error(f"System stats reconciliation failed: {e}")
+    finally:
+        db.close()
+
+
+async def reconcile_system_stats_periodically():
+    """Run reconcile_system_stats every STATS_RECONCILE_INTERVAL_SECONDS."""
+    while True:
+        await run_in_threadpool(reconcile_system_stats)
+        await asyncio.sleep(settings.STATS_RECONCILE_INTERVAL_SECONDS)
+
+
+def maintain_event_partitions():
+    """Create upcoming shipment_events partitions and apply retention."""
+    interval = settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS
+    if not redis_service.acquire_lock("lock:event_partitions", interval):
+        return
+    
+    db = SessionLocal()
+    try:
+        partition_service.ensure_partitions(db, settings.EVENT_PARTITION_PREMAKE_MONTHS)
+        if settings.EVENT_RETENTION_MONTHS > 0:
+            partition_service.apply_retention(
+                db, settings.EVENT_RETENTION_MONTHS, drop=settings.EVENT_RETENTION_DROP
+            )
+    except Exception as e:
+        logger.error(f"Event partition maintenance failed: {e}")
+    finally:
+        db.close()
+
+
+async def maintain_event_partitions_periodically():
+    """Run maintain_event_partitions every PARTITION_MAINTENANCE_INTERVAL_SECONDS."""
+    while True:
+        await run_in_threadpool(maintain_event_partitions)
+        await asyncio.sleep(settings.PARTITION_MAINTENANCE_INTERVAL_SECONDS)
+
+
+def archive_shipments():
+    """Archive shipments finished more than ARCHIVE_AFTER_DAYS ago."""
+    interval = settings.ARCHIVE_INTERVAL_SECONDS
+    if not redis_service.acquire_lock("lock:archive_shipments", interval):
+        return
+    
+    db = SessionLocal()
+    try:
+        archive_service.archive_finished(
+            db, settings.ARCHIVE_AFTER_DAYS, settings.ARCHIVE_BATCH_SIZE
+        )
+    except Exception as e:
+        logger.error(f"Shipment archiving failed: {e}")
+    finally:
+        db.close()
+
+
+async def archive_shipments_periodically():
+    """Run archive_shipments every ARCHIVE_INTERVAL_SECONDS."""
+    while True:
+        await run_in_threadpool(archive_shipments)
+        await asyncio.sleep(settings.ARCHIVE_INTERVAL_SECONDS)
+
+
+def collect_documents():
+    """Delete documents that are no longer attached to any shipment."""
+    interval = settings.DOCUMENT_GC_INTERVAL_SECONDS
+    if not redis_service.acquire_lock("lock:document_gc", interval):
+        return
+    
+    db = SessionLocal()
+    try:
+        document_service.collect_garbage(db, settings.DOCUMENT_GC_GRACE_SECONDS)
+    except Exception as e:
+        logger.error(f"Document garbage collection failed: {e}")
+    finally:
+        db.close()
+
+
+async def collect_documents_periodically():
+    """Run collect_documents every DOCUMENT_GC_INTERVAL_SECONDS."""
+    while True:
+        await run_in_threadpool(collect_documents)
+        await asyncio.sleep(settings.DOCUMENT_GC_INTERVAL_SECONDS)
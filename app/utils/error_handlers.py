@@ -12,7 +12,8 @@ from app.utils.exceptions import (
     ResourceNotFoundException,
     UnauthorizedException,
     ValidationException,
-    DuplicateResourceException
+    DuplicateResourceException,
+    UploadTooLargeException
 )
 
 logger = logging.getLogger(__name__)
@@ -30,6 +31,8 @@ async def globalship_exception_handler(request: Request, exc: GlobalShipExceptio
         status_code = status.HTTP_401_UNAUTHORIZED
     elif isinstance(exc, DuplicateResourceException):
         status_code = status.HTTP_409_CONFLICT
+    elif isinstance(exc, UploadTooLargeException):
+        status_code = status.HTTP_413_REQUEST_ENTITY_TOO_LARGE
     
     return JSONResponse(
         status_code=status_code,
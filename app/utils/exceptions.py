@@ -30,6 +30,13 @@ class ValidationException(GlobalShipException):
         super().__init__(self.message)
 
 
+class UploadTooLargeException(GlobalShipException):
+    """Uploaded file or request body over the size limit."""
+    def __init__(self, max_size: int):
+        self.message = f"File too large. Max size: {max_size} bytes"
+        super().__init__(self.message)
+
+
 class DuplicateResourceException(GlobalShipException):
     """Duplicate resource exception."""
     def __init__(self, resource: str, field: str, value: str):
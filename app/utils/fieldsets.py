@@ -0,0 +1,81 @@
+"""
+Sparse fieldsets for list endpoints.
+
+A `fields=tracking_number,status,estimated_delivery` query parameter picks
+which fields of a response schema are returned. The listing query only
+loads those columns (see the fields argument of the pagination helpers)
+and the rows are serialized with a trimmed copy of the schema, built once
+per distinct fieldset and cached.
+"""
+from functools import lru_cache
+from typing import List, Optional, Tuple, Type
+
+from fastapi import Response
+from pydantic import BaseModel, ConfigDict, TypeAdapter, create_model
+
+from app.utils.exceptions import ValidationException
+
+# Fieldset models kept per schema; requests can name any combination
+FIELDSET_CACHE_SIZE = 128
+
+
+def parse_fields(fields: Optional[str], schema: Type[BaseModel]) -> Optional[Tuple[str, ...]]:
+    """
+    Parse a comma-separated fields parameter against a response schema.
+
+    Returns:
+        Field names in schema order, or None when fields is empty
+
+    Raises:
+        ValidationException: If a field is not in the schema
+    """
+    if not fields:
+        return None
+
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested - set(schema.model_fields)
+    if unknown:
+        raise ValidationException(f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    return tuple(name for name in schema.model_fields if name in requested) or None
+
+
+@lru_cache(maxsize=FIELDSET_CACHE_SIZE)
+def fieldset_model(schema: Type[BaseModel], fields: Tuple[str, ...]) -> Type[BaseModel]:
+    """Copy of schema with only the given fields (as returned by parse_fields)."""
+    return create_model(
+        f"{schema.__name__}Fields",
+        __config__=ConfigDict(from_attributes=True),
+        **{
+            name: (schema.model_fields[name].annotation, schema.model_fields[name])
+            for name in fields
+        }
+    )
+
+
+@lru_cache(maxsize=FIELDSET_CACHE_SIZE)
+def fieldset_page_model(
+    page_schema: Type[BaseModel],
+    schema: Type[BaseModel],
+    fields: Tuple[str, ...]
+) -> Type[BaseModel]:
+    """Copy of a paginated list schema whose items use fieldset_model(schema, fields)."""
+    return create_model(
+        f"{page_schema.__name__}Fields",
+        __base__=page_schema,
+        items=(List[fieldset_model(schema, fields)], ...)
+    )
+
+
+@lru_cache(maxsize=FIELDSET_CACHE_SIZE)
+def fieldset_list_adapter(schema: Type[BaseModel], fields: Tuple[str, ...]) -> TypeAdapter:
+    """Adapter for a plain list of fieldset_model(schema, fields) items."""
+    return TypeAdapter(List[fieldset_model(schema, fields)])
+
+
+def json_response(content: bytes) -> Response:
+    """
+    Wrap JSON serialized by a fieldset model. Returning a Response skips
+    the endpoint's declared (full) response_model.
+    """
+    return Response(content=content, media_type="application/json")
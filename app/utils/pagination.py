@@ -0,0 +1,179 @@
+"""
+Keyset (cursor) pagination helpers.
+
+Listings are ordered by (created_at DESC, id DESC). A cursor is the opaque,
+URL-safe encoding of the last row's (created_at, id); the next page is
+everything strictly after it in that order, so deep pages cost the same as
+the first one instead of scanning and discarding `skip` rows.
+
+Totals are computed according to a CountMode chosen per request.
+
+Listings can be restricted to a sparse fieldset: only those columns (plus
+created_at and id, for the cursor) are selected, and reading any other
+attribute of the returned objects raises instead of lazy-loading it.
+"""
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from typing import Any, List, NamedTuple, Optional, Sequence, Tuple, TypeVar
+from uuid import UUID
+import enum
+import json
+
+from sqlalchemy import Select, desc, func, select, tuple_
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import aliased, load_only
+from sqlalchemy.sql.expression import ClauseElement, Executable
+
+from app.utils.exceptions import ValidationException
+
+T = TypeVar("T")
+
+# Always loaded by sparse fieldsets: split_page builds the cursor from them
+CURSOR_FIELDS = ("created_at", "id")
+
+
+class CountMode(str, enum.Enum):
+    """How the total of a paginated listing is computed."""
+    EXACT = "exact"          # count(*) OVER () in the page query
+    ESTIMATED = "estimated"  # planner row estimate, no scan
+    CACHED = "cached"        # exact count cached in Redis per owner
+    NONE = "none"            # no total
+
+
+class Page(NamedTuple):
+    """One page of a listing."""
+    items: List[Any]
+    total: Optional[int]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(created_at: datetime, id: UUID) -> str:
+    """Encode a (created_at, id) position as an opaque cursor."""
+    raw = f"{created_at.isoformat()}|{id}".encode()
+    return urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, UUID]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        ValidationException: If the cursor is malformed
+    """
+    try:
+        raw = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, id = raw.split("|")
+        return datetime.fromisoformat(created_at), UUID(id)
+    except ValueError as e:
+        raise ValidationException("Invalid pagination cursor") from e
+
+
+def _fieldset_columns(entity: Any, fields: Sequence[str]) -> List[Any]:
+    """Attributes of entity to load for a fieldset, cursor columns included."""
+    names = dict.fromkeys((*CURSOR_FIELDS, *fields))
+    return [getattr(entity, name) for name in names]
+
+
+def paginate(
+    stmt: Select,
+    model: Any,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None
+) -> Select:
+    """
+    Apply ordering and pagination to a listing query.
+
+    With a cursor, rows after the cursor position are selected; otherwise
+    the legacy offset is applied. One extra row is fetched so split_page can
+    tell whether another page exists.
+
+    Args:
+        stmt: Filtered select over model
+        model: Mapped class with created_at and id columns
+        skip: Number of rows to skip (ignored when cursor is given)
+        limit: Page size
+        cursor: Cursor returned with the previous page
+        fields: Only load these attributes of model (sparse fieldset)
+    """
+    if fields:
+        stmt = stmt.options(load_only(*_fieldset_columns(model, fields), raiseload=True))
+
+    if cursor:
+        created_at, id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(model.created_at, model.id) < tuple_(created_at, id))
+    elif skip:
+        stmt = stmt.offset(skip)
+
+    return stmt.order_by(desc(model.created_at), desc(model.id)).limit(limit + 1)
+
+
+def split_page(rows: Sequence[T], limit: int) -> Tuple[List[T], Optional[str]]:
+    """
+    Split rows fetched by paginate into the page and the next cursor.
+
+    Returns:
+        Tuple of (items, next_cursor); next_cursor is None on the last page
+    """
+    items = list(rows[:limit])
+    if len(rows) <= limit:
+        return items, None
+
+    last = items[-1]
+    return items, encode_cursor(last.created_at, last.id)
+
+
+def paginate_with_total(
+    stmt: Select,
+    model: Any,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    fields: Optional[Sequence[str]] = None
+) -> Select:
+    """
+    Like paginate, but every row also carries the total of the unpaginated
+    query as a `total` column (count(*) OVER ()), so the page and its total
+    come back in a single round trip.
+
+    Rows are (model instance, total).
+    """
+    total = func.count().over().label("total")
+    if fields:
+        # Narrow the inner query too, not just the outer one
+        windowed = stmt.with_only_columns(*_fieldset_columns(model, fields), total).subquery()
+    else:
+        windowed = stmt.add_columns(total).subquery()
+    entity = aliased(model, windowed)
+    return paginate(select(entity, windowed.c.total), entity, skip, limit, cursor, fields)
+
+
+def count_statement(stmt: Select) -> Select:
+    """Build an exact count(*) over a listing query."""
+    return select(func.count()).select_from(stmt.order_by(None).subquery())
+
+
+class Explain(Executable, ClauseElement):
+    """EXPLAIN (FORMAT JSON) of a statement; bound parameters are preserved."""
+
+    inherit_cache = False
+
+    def __init__(self, statement: Select):
+        self.statement = statement
+
+
+@compiles(Explain, "postgresql")
+def _compile_explain(element: Explain, compiler, **kw) -> str:
+    return "EXPLAIN (FORMAT JSON) " + compiler.process(element.statement, **kw)
+
+
+def planned_rows(plan: Any) -> int:
+    """
+    Extract the planner's row estimate from an EXPLAIN (FORMAT JSON) result.
+
+    psycopg2 returns the plan parsed, asyncpg as a JSON string.
+    """
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]["Plan"]["Plan Rows"])
@@ -0,0 +1,74 @@
+"""
+Streaming writes of uploaded files.
+
+save_upload copies an UploadFile to disk in UPLOAD_CHUNK_BYTES chunks. It
+hashes the file (SHA-256) on the way and stops as soon as the size limit
+is crossed, so an upload is never held in memory whole. Reading, hashing
+and writing each chunk happen in a worker thread, off the event loop.
+
+Requests whose declared Content-Length is already too large are rejected
+before their body is read, and chunked bodies are cut off once over
+MAX_REQUEST_BODY_SIZE, by BodySizeLimitMiddleware.
+"""
+from pathlib import Path
+from typing import BinaryIO, NamedTuple
+import hashlib
+import os
+
+from fastapi import UploadFile
+from starlette.concurrency import run_in_threadpool
+
+from app.utils.exceptions import UploadTooLargeException
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+class StoredUpload(NamedTuple):
+    """An upload written to disk."""
+    path: Path
+    size: int
+    sha256: str
+
+
+def _copy_chunk(source: BinaryIO, target: BinaryIO, digest: "hashlib._Hash", remaining: int) -> int:
+    """
+    Copy one chunk from source to target, hashing it, and return its size.
+    Reads at most one byte more than remaining; a chunk over remaining is
+    not written.
+    """
+    chunk = source.read(min(UPLOAD_CHUNK_BYTES, remaining + 1))
+    if chunk and len(chunk) <= remaining:
+        digest.update(chunk)
+        target.write(chunk)
+    return len(chunk)
+
+
+async def save_upload(file: UploadFile, path: Path, max_size: int) -> StoredUpload:
+    """
+    Write an uploaded file to path, chunk by chunk.
+
+    Raises:
+        UploadTooLargeException: As soon as more than max_size bytes have
+            been read; the partial file is removed
+    """
+    digest = hashlib.sha256()
+    size = 0
+    await file.seek(0)
+    target = await run_in_threadpool(open, path, "wb")
+    try:
+        while True:
+            copied = await run_in_threadpool(
+                _copy_chunk, file.file, target, digest, max_size - size
+            )
+            if not copied:
+                break
+            size += copied
+            if size > max_size:
+                raise UploadTooLargeException(max_size)
+    except BaseException:
+        await run_in_threadpool(target.close)
+        await run_in_threadpool(os.remove, path)
+        raise
+
+    await run_in_threadpool(target.close)
+    return StoredUpload(path, size, digest.hexdigest())
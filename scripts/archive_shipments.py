@@ -0,0 +1,46 @@
+"""
+Archive finished shipments.
+
+The API archives shipments periodically; use this script to run a pass
+by hand, e.g. with a shorter age after changing ARCHIVE_AFTER_DAYS.
+
+Usage:
+    python scripts/archive_shipments.py [--days N] [--batch-size N]
+"""
+import argparse
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.archive_service import archive_service
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive finished shipments")
+    parser.add_argument(
+        "--days", type=int, default=settings.ARCHIVE_AFTER_DAYS,
+        help="Archive shipments delivered or cancelled more than this many days ago"
+    )
+    parser.add_argument("--batch-size", type=int, default=settings.ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"Archiving shipments finished more than {args.days} days ago")
+    print("=" * 60)
+
+    db = SessionLocal()
+    try:
+        archived = archive_service.archive_finished(db, args.days, args.batch_size)
+        print(f"Archived {archived} shipments")
+    finally:
+        db.close()
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Microbenchmark: pure ASGI RateLimitMiddleware vs the previous
+BaseHTTPMiddleware implementation.
+
+Both variants apply the same policy and headers and share a limiter, so the
+numbers isolate middleware overhead. By default the limiter is an in-memory
+stand-in; pass --redis to go through the real Lua limiter (requires Redis).
+
+Usage:
+    python scripts/bench_rate_limit.py [--requests 20000] [--concurrency 50] [--redis]
+"""
+import sys
+import os
+import argparse
+import asyncio
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from fastapi import FastAPI, Request, status
+from fastapi.responses import JSONResponse, PlainTextResponse
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.services.rate_limiter import RateLimiter, RateLimitResult
+
+
+class InMemoryRateLimiter(RateLimiter):
+    """Limiter that always allows, without touching Redis."""
+
+    async def hit(self, identifier: str) -> RateLimitResult:
+        return RateLimitResult(
+            allowed=True,
+            limit=self.limit,
+            remaining=self.limit - 1,
+            reset_after=1,
+            retry_after=0,
+        )
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    """The BaseHTTPMiddleware implementation replaced by RateLimitMiddleware."""
+
+    def __init__(self, app, limiter: RateLimiter):
+        super().__init__(app)
+        self.limiter = limiter
+
+    async def dispatch(self, request: Request, call_next):
+        if request.url.path in ["/health", "/", "/api/v1/docs", "/api/v1/openapi.json"]:
+            return await call_next(request)
+
+        result = await self.limiter.hit(request.client.host)
+        if result is None:
+            return await call_next(request)
+
+        headers = RateLimitMiddleware._headers(result)
+        if not result.allowed:
+            return JSONResponse(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": "Too many requests. Please try again later."},
+                headers=headers,
+            )
+
+        response = await call_next(request)
+        response.headers.update(headers)
+        return response
+
+
+def build_app(variant: str, limiter: RateLimiter) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return PlainTextResponse("pong")
+
+    if variant == "asgi":
+        app.add_middleware(RateLimitMiddleware)
+        # Swap in the benchmark limiter on the built middleware instance
+        app.middleware_stack = app.build_middleware_stack()
+        middleware = app.middleware_stack
+        while not isinstance(middleware, RateLimitMiddleware):
+            middleware = middleware.app
+        middleware.limiter = limiter
+    else:
+        app.add_middleware(LegacyRateLimitMiddleware, limiter=limiter)
+
+    return app
+
+
+async def run(app: FastAPI, total: int, concurrency: int) -> float:
+    transport = httpx.ASGITransport(app=app, client=("10.0.0.1", 1234))
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # Warm up
+        for _ in range(100):
+            await client.get("/ping")
+
+        remaining = total
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                response = await client.get("/ping")
+                assert response.status_code == 200
+                assert "x-ratelimit-remaining" in response.headers
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return total / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--redis", action="store_true", help="use the real Redis limiter")
+    args = parser.parse_args()
+
+    if args.redis:
+        limiter = RateLimiter(limit=10 ** 9, window_seconds=60, key_prefix="bench_rate_limit")
+    else:
+        limiter = InMemoryRateLimiter(limit=10 ** 9, window_seconds=60)
+
+    print("=" * 60)
+    print("Rate limit middleware benchmark")
+    print(f"Requests: {args.requests}  Concurrency: {args.concurrency}  "
+          f"Limiter: {'redis' if args.redis else 'in-memory'}")
+    print("=" * 60)
+
+    results = {}
+    for variant in ("legacy", "asgi"):
+        rps = asyncio.run(run(build_app(variant, limiter), args.requests, args.concurrency))
+        results[variant] = rps
+        print(f"{variant:>8}: {rps:10.0f} req/s")
+
+    print("-" * 60)
+    print(f"Speedup: {results['asgi'] / results['legacy']:.2f}x")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Manage the monthly partitions of shipment_events.
+
+The API runs ensure and retain periodically; use this script to inspect
+partitions, pre-create them for a backfill, or expire data by hand.
+
+Usage:
+    python scripts/manage_partitions.py list
+    python scripts/manage_partitions.py ensure [--months-ahead N]
+    python scripts/manage_partitions.py retain [--months N] [--drop]
+"""
+import argparse
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.partition_service import partition_service
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage shipment_events partitions")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="List month partitions")
+
+    ensure = commands.add_parser("ensure", help="Create partitions ahead of time")
+    ensure.add_argument(
+        "--months-ahead", type=int, default=settings.EVENT_PARTITION_PREMAKE_MONTHS
+    )
+
+    retain = commands.add_parser("retain", help="Detach partitions past retention")
+    retain.add_argument("--months", type=int, default=settings.EVENT_RETENTION_MONTHS)
+    retain.add_argument(
+        "--drop", action="store_true", default=settings.EVENT_RETENTION_DROP,
+        help="Drop detached partitions instead of keeping them as tables"
+    )
+
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print(f"shipment_events partitions: {args.command}")
+    print("=" * 60)
+
+    db = SessionLocal()
+    try:
+        if args.command == "list":
+            for month, name in partition_service.list_partitions(db).items():
+                print(f"  {month:%Y-%m}  {name}")
+        elif args.command == "ensure":
+            created = partition_service.ensure_partitions(db, args.months_ahead)
+            print(f"Created {len(created)} partitions: {', '.join(created) or '-'}")
+        elif args.command == "retain":
+            if args.months <= 0:
+                print("Retention disabled (months <= 0)")
+            else:
+                expired = partition_service.apply_retention(db, args.months, drop=args.drop)
+                action = "Dropped" if args.drop else "Detached"
+                print(f"{action} {len(expired)} partitions: {', '.join(expired) or '-'}")
+    finally:
+        db.close()
+
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+"""
+Recompute the admin system stats counters from the source tables.
+
+The API does this periodically; run it by hand after bulk data changes
+made outside the services (imports, manual SQL, seeding).
+
+Usage:
+    python scripts/reconcile_stats.py
+"""
+import sys
+import os
+
+# Add parent directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.db.session import SessionLocal
+import app.models  # noqa: F401  (register all mappers)
+from app.services.stats_service import stats_service
+
+
+def main():
+    print("=" * 60)
+    print("Reconciling system stats counters")
+    print("=" * 60)
+
+    db = SessionLocal()
+    try:
+        corrections = stats_service.reconcile(db)
+    finally:
+        db.close()
+
+    if corrections:
+        for name, drift in sorted(corrections.items()):
+            print(f"  {name:<40} {drift:+}")
+    else:
+        print("No drift")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
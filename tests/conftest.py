@@ -2,13 +2,21 @@
 Pytest configuration and fixtures.
 """
 import pytest
+import pytest_asyncio
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
 from app.main import app
 from app.db.base import Base
-from app.db.session import get_db
+from app.db.session import get_db, get_async_db, get_read_db, get_async_read_db, to_async_url
 from app.core.config import settings
+from app.core.security import create_access_token
+from app.models.user import User
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.redis_service import redis_service
+from app.services.async_redis_service import async_redis_service
 
 # Test database URL
 TEST_DATABASE_URL = settings.DATABASE_URL.replace("globalship_db", "test_db")
@@ -16,6 +24,12 @@ TEST_DATABASE_URL = settings.DATABASE_URL.replace("globalship_db", "test_db")
 engine = create_engine(TEST_DATABASE_URL)
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# NullPool: TestClient runs each request on its own event loop
+async_engine = create_async_engine(to_async_url(TEST_DATABASE_URL), poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(
+    async_engine, autoflush=False, expire_on_commit=False
+)
+
 
 @pytest.fixture(scope="function")
 def db():
@@ -29,6 +43,13 @@ def db():
         Base.metadata.drop_all(bind=engine)
 
 
+@pytest_asyncio.fixture(scope="function")
+async def async_db(db):
+    """AsyncSession on the test database, for the async services."""
+    async with TestingAsyncSessionLocal() as async_db:
+        yield async_db
+
+
 @pytest.fixture(scope="function")
 def client(db):
     """Create test client."""
@@ -38,6 +59,59 @@ def client(db):
         finally:
             pass
     
+    async def override_get_async_db():
+        async with TestingAsyncSessionLocal() as async_db:
+            yield async_db
+    
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_async_db] = override_get_async_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_async_read_db] = override_get_async_db
     yield TestClient(app)
     app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="function")
+def superuser(db):
+    """An active superuser in the test database."""
+    user = User(
+        email="admin-test@test.com",
+        hashed_password="x",
+        is_active=True,
+        is_verified=True,
+        is_superuser=True,
+    )
+    db.add(user)
+    db.commit()
+    return user
+
+
+@pytest.fixture(scope="function")
+def superuser_headers(superuser):
+    """Authorization headers with an access token for the superuser."""
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': str(superuser.id)})}"}
+
+
+@pytest.fixture(scope="function")
+def fake_redis(monkeypatch):
+    """
+    Point both Redis services at an in-memory fakeredis server (Lua
+    scripts run on lupa), with a fresh circuit breaker. Returns a client
+    on the same server.
+    """
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")
+    server = fakeredis.FakeServer()
+    breaker = CircuitBreaker(
+        "redis-test",
+        failure_threshold=settings.REDIS_CIRCUIT_FAILURE_THRESHOLD,
+        recovery_timeout=settings.REDIS_CIRCUIT_RECOVERY_SECONDS,
+    )
+    for service, client in (
+        (redis_service, fakeredis.FakeRedis(server=server, decode_responses=True)),
+        (async_redis_service, fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)),
+    ):
+        monkeypatch.setattr(service, "redis_client", client)
+        monkeypatch.setattr(service, "breaker", breaker)
+        monkeypatch.setattr(service, "_scripts", {})
+    return fakeredis.FakeRedis(server=server, decode_responses=True)
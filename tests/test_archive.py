@@ -0,0 +1,169 @@
+"""
+Shipment archiving tests.
+
+Archives finished shipments and checks that they move with their events,
+stay reachable through the shipment lookups and keep counting in the
+dashboard and admin stats.
+"""
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.user import User
+from app.models.shipment import Shipment, ShipmentStatus, ServiceType
+from app.models.shipment_event import ShipmentEvent
+from app.models.archive import ArchivedShipment, ArchivedShipmentEvent
+from app.services.archive_service import ArchiveService
+from app.services.dashboard_service import DashboardService
+from app.services.shipment_service import ShipmentService
+from app.services.stats_service import StatsService
+
+OLD = datetime.utcnow() - timedelta(days=200)
+CUTOFF = datetime.utcnow() - timedelta(days=180)
+
+
+def shipment_row(user_id, number, status, finished_at, cost=None):
+    """A shipments row; IDs are ordered by number."""
+    return {
+        "id": uuid.UUID(int=number),
+        "tracking_number": f"GSARCHIVE{number:05d}",
+        "user_id": user_id,
+        "origin_city": "Nairobi",
+        "origin_country": "Kenya",
+        "destination_city": "Mombasa",
+        "destination_country": "Kenya",
+        "service_type": ServiceType.AIR,
+        "status": status,
+        "package_count": 1,
+        "actual_cost": cost,
+        "currency": "USD",
+        "insurance": False,
+        "signature_required": False,
+        "created_at": finished_at - timedelta(days=5),
+        "updated_at": finished_at,
+        "actual_delivery": finished_at if status == ShipmentStatus.DELIVERED else None,
+    }
+
+
+@pytest.fixture(scope="function")
+def user_id(db):
+    """A user with old finished shipments, a recent one and an active one."""
+    user = User(
+        id=uuid.uuid4(),
+        email="archive-test@test.com",
+        hashed_password="x",
+        is_active=True,
+        is_verified=True,
+        is_superuser=False,
+    )
+    db.add(user)
+    db.flush()
+
+    db.execute(Shipment.__table__.insert(), [
+        shipment_row(user.id, 1, ShipmentStatus.DELIVERED, OLD, Decimal("10.00")),
+        shipment_row(user.id, 2, ShipmentStatus.CANCELLED, OLD),
+        shipment_row(user.id, 3, ShipmentStatus.DELIVERED, OLD, Decimal("5.50")),
+        shipment_row(user.id, 4, ShipmentStatus.DELIVERED, datetime.utcnow(), Decimal("7.00")),
+        shipment_row(user.id, 5, ShipmentStatus.IN_TRANSIT, OLD),
+    ])
+    db.execute(ShipmentEvent.__table__.insert(), [
+        {
+            "id": uuid.uuid4(),
+            "shipment_id": uuid.UUID(int=number),
+            "event_type": event_type,
+            "timestamp": OLD - timedelta(hours=hours),
+            "created_at": OLD,
+        }
+        for number in (1, 2, 3, 4, 5)
+        for hours, event_type in ((2, "picked_up"), (1, "in_transit"))
+    ])
+    db.commit()
+    StatsService.reconcile(db)
+    return user.id
+
+
+def count(db, model, *where):
+    return db.scalar(select(func.count()).select_from(model).where(*where))
+
+
+def test_archive_batch_moves_shipments_with_events(db, user_id):
+    """Old finished shipments and their events leave the hot tables."""
+    batch = ArchiveService.archive_batch(db, CUTOFF, batch_size=10)
+
+    assert batch.archived == 3
+    assert batch.failed == []
+    assert batch.last_id == uuid.UUID(int=3)
+
+    archived_ids = [uuid.UUID(int=number) for number in (1, 2, 3)]
+    assert count(db, Shipment, Shipment.id.in_(archived_ids)) == 0
+    assert count(db, ShipmentEvent, ShipmentEvent.shipment_id.in_(archived_ids)) == 0
+    assert count(db, ArchivedShipment) == 3
+    assert count(db, ArchivedShipmentEvent) == 6
+    assert db.scalar(select(func.min(ArchivedShipment.archived_at))) is not None
+
+    # Recent and active shipments stay
+    assert count(db, Shipment) == 2
+    assert count(db, ShipmentEvent) == 4
+
+    assert ArchiveService.archive_batch(db, CUTOFF, 10, after=batch.last_id).last_id is None
+
+
+def test_archived_shipments_found_by_lookups(db, user_id):
+    """get_by_id and get_by_tracking_number fall through to the archive."""
+    ArchiveService.archive_batch(db, CUTOFF, batch_size=10)
+
+    shipment = ShipmentService.get_by_id(db, uuid.UUID(int=1))
+    assert isinstance(shipment, ArchivedShipment)
+    assert shipment.actual_cost == Decimal("10.00")
+
+    shipment = ShipmentService.get_by_tracking_number(db, "GSARCHIVE00002")
+    assert isinstance(shipment, ArchivedShipment)
+    assert shipment.status == ShipmentStatus.CANCELLED
+
+    assert isinstance(ShipmentService.get_by_id(db, uuid.UUID(int=4)), Shipment)
+
+
+def test_archiving_keeps_stats_totals(db, user_id):
+    """Dashboard and admin stats are the same before and after archiving."""
+    dashboard_before = db.execute(DashboardService.stats_statement(user_id)).one()
+    stats_before = StatsService.get_system_stats(db)
+
+    ArchiveService.archive_finished(db, older_than_days=180, batch_size=2)
+
+    dashboard_after = db.execute(DashboardService.stats_statement(user_id)).one()
+    assert dashboard_after.delivered_shipments == dashboard_before.delivered_shipments == 3
+    assert dashboard_after.total_spent == dashboard_before.total_spent == Decimal("22.50")
+    assert dashboard_after.active_shipments == dashboard_before.active_shipments
+
+    assert StatsService.get_system_stats(db) == stats_before
+    # The recount (hot plus archive) agrees with the counters
+    assert StatsService.reconcile(db) == {}
+
+
+def test_unmovable_shipment_does_not_stall_archiving(db, user_id):
+    """A shipment that cannot be moved is skipped; the rest are archived."""
+    # A clashing archive row makes shipment 1 (first in ID order) unmovable
+    db.execute(ArchivedShipment.__table__.insert(), [
+        {**shipment_row(user_id, 99, ShipmentStatus.DELIVERED, OLD), "tracking_number": "GSARCHIVE00001"}
+    ])
+    db.commit()
+
+    batch = ArchiveService.archive_batch(db, CUTOFF, batch_size=10)
+    assert batch.archived == 2
+    assert batch.failed == [uuid.UUID(int=1)]
+    assert count(db, Shipment, Shipment.id == uuid.UUID(int=1)) == 1
+    assert count(db, ShipmentEvent, ShipmentEvent.shipment_id == uuid.UUID(int=1)) == 2
+
+
+def test_archive_finished_walks_past_failures(db, user_id):
+    """With batches of one, a failing first shipment does not end the pass."""
+    db.execute(ArchivedShipment.__table__.insert(), [
+        {**shipment_row(user_id, 99, ShipmentStatus.DELIVERED, OLD), "tracking_number": "GSARCHIVE00001"}
+    ])
+    db.commit()
+
+    assert ArchiveService.archive_finished(db, older_than_days=180, batch_size=1) == 2
+    assert count(db, ArchivedShipment) == 3
@@ -0,0 +1,71 @@
+"""
+Request body size limit tests.
+"""
+import pytest
+from fastapi import FastAPI, File, Request, UploadFile
+
+from app.middleware.body_limit import BodySizeLimitMiddleware
+
+MAX_SIZE = 1024
+
+
+@pytest.fixture(scope="module")
+def client():
+    """TestClient for an app behind a 1 KiB body limit."""
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    app = FastAPI()
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        return {"size": len(await request.body())}
+
+    @app.post("/upload")
+    async def upload(file: UploadFile = File(...)):
+        return {"size": len(await file.read())}
+
+    app.add_middleware(BodySizeLimitMiddleware, max_size=MAX_SIZE)
+    return TestClient(app)
+
+
+def chunked(size, chunk=256):
+    """A body without a Content-Length (sent with Transfer-Encoding: chunked)."""
+    for start in range(0, size, chunk):
+        yield b"x" * min(chunk, size - start)
+
+
+def test_body_under_limit(client):
+    """Bodies within the limit reach the app, declared or chunked."""
+    assert client.post("/echo", content=b"x" * MAX_SIZE).json() == {"size": MAX_SIZE}
+    assert client.post("/echo", content=chunked(MAX_SIZE)).json() == {"size": MAX_SIZE}
+
+
+def test_declared_body_over_limit(client):
+    """A Content-Length over the limit is rejected up front."""
+    response = client.post("/echo", content=b"x" * (MAX_SIZE + 1))
+    assert response.status_code == 413
+
+
+def test_chunked_body_over_limit(client):
+    """A chunked body is cut off with 413 once it passes the limit."""
+    response = client.post("/echo", content=chunked(MAX_SIZE + 1))
+    assert response.status_code == 413
+    assert "Max size" in response.json()["detail"]
+
+
+def test_chunked_multipart_over_limit(client):
+    """A chunked multipart upload gets 413, not the form parser's 400."""
+    boundary = "limit-test"
+    body = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="big.pdf"\r\n'
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode() + b"x" * (MAX_SIZE * 4) + f"\r\n--{boundary}--\r\n".encode()
+
+    response = client.post(
+        "/upload",
+        content=iter([body[i:i + 256] for i in range(0, len(body), 256)]),
+        headers={"Content-Type": f"multipart/form-data; boundary={boundary}"}
+    )
+    assert response.status_code == 413
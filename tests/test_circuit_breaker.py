@@ -0,0 +1,193 @@
+"""
+Circuit breaker and Redis fail-open tests.
+"""
+import pytest
+import redis
+
+from app.core.config import settings
+from app.services import circuit_breaker as circuit_breaker_module
+from app.services.async_redis_service import async_redis_service
+from app.services.circuit_breaker import CircuitBreaker, CircuitState
+from app.services.redis_service import redis_service
+
+THRESHOLD = 3
+RECOVERY = 5.0
+
+
+class Clock:
+    """Stand-in for the time module; advance it by hand."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture(scope="function")
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker_module, "time", clock)
+    return clock
+
+
+@pytest.fixture(scope="function")
+def breaker(clock):
+    """A breaker that records each time it opens."""
+    breaker = CircuitBreaker("test", failure_threshold=THRESHOLD, recovery_timeout=RECOVERY)
+    breaker.opened = 0
+
+    def count_open():
+        breaker.opened += 1
+
+    breaker.on_open(count_open)
+    return breaker
+
+
+def trip(breaker):
+    for _ in range(THRESHOLD):
+        breaker.record_failure()
+
+
+def test_opens_after_consecutive_failures(breaker):
+    """Failures below the threshold keep the circuit closed; a success resets them."""
+    for _ in range(THRESHOLD - 1):
+        breaker.record_failure()
+    breaker.record_success()
+    for _ in range(THRESHOLD - 1):
+        breaker.record_failure()
+    assert breaker.state is CircuitState.CLOSED
+    assert breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+    assert breaker.opened == 1
+    assert not breaker.allow_request()
+
+
+def test_open_circuit_waits_for_recovery_timeout(breaker, clock):
+    """An open circuit rejects calls until the recovery timeout elapses."""
+    trip(breaker)
+
+    clock.now += RECOVERY - 0.1
+    assert not breaker.allow_request()
+    assert breaker.state is CircuitState.OPEN
+
+    clock.now += 0.1
+    assert breaker.allow_request()
+    assert breaker.state is CircuitState.HALF_OPEN
+
+
+def test_half_open_allows_one_trial(breaker, clock):
+    """Only one caller gets the half-open trial call."""
+    trip(breaker)
+    clock.now += RECOVERY
+
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    assert not breaker.allow_request()
+
+
+def test_half_open_success_closes(breaker, clock):
+    """A successful trial closes the circuit and clears the failure count."""
+    trip(breaker)
+    clock.now += RECOVERY
+    breaker.allow_request()
+
+    breaker.record_success()
+    assert breaker.state is CircuitState.CLOSED
+    assert breaker.allow_request()
+
+    # The count starts over, so one failure does not reopen it
+    breaker.record_failure()
+    assert breaker.state is CircuitState.CLOSED
+
+
+def test_half_open_failure_reopens(breaker, clock):
+    """A failed trial opens the circuit again for another recovery timeout."""
+    trip(breaker)
+    clock.now += RECOVERY
+    breaker.allow_request()
+
+    breaker.record_failure()
+    assert breaker.state is CircuitState.OPEN
+    assert breaker.opened == 2
+    assert not breaker.allow_request()
+
+    clock.now += RECOVERY
+    assert breaker.allow_request()
+    assert breaker.state is CircuitState.HALF_OPEN
+
+
+class Unreachable:
+    """Redis client whose every command fails with the given error."""
+
+    def __init__(self, error):
+        self.error = error
+        self.calls = 0
+
+    def __getattr__(self, name):
+        def command(*args, **kwargs):
+            self.calls += 1
+            raise self.error("Redis unavailable")
+        return command
+
+
+class AsyncUnreachable(Unreachable):
+    def __getattr__(self, name):
+        async def command(*args, **kwargs):
+            self.calls += 1
+            raise self.error("Redis unavailable")
+        return command
+
+
+def test_execute_fails_open(fake_redis, monkeypatch):
+    """Connection errors return the default and open the circuit, which stops calls."""
+    client = Unreachable(redis.ConnectionError)
+    monkeypatch.setattr(redis_service, "redis_client", client)
+
+    for _ in range(settings.REDIS_CIRCUIT_FAILURE_THRESHOLD):
+        assert redis_service.get("key") is None
+        assert redis_service.set("key", 1) is False
+    assert redis_service.breaker.state is CircuitState.OPEN
+
+    calls = client.calls
+    assert redis_service.get("key") is None
+    assert redis_service.exists("key") is False
+    assert client.calls == calls
+
+
+def test_execute_command_errors_keep_circuit_closed(fake_redis, monkeypatch):
+    """Errors Redis answers with return the default without opening the circuit."""
+    monkeypatch.setattr(redis_service, "redis_client", Unreachable(redis.ResponseError))
+
+    for _ in range(settings.REDIS_CIRCUIT_FAILURE_THRESHOLD + 1):
+        assert redis_service.increment("key") is None
+    assert redis_service.breaker.state is CircuitState.CLOSED
+
+
+def test_execute_without_client(fake_redis, monkeypatch):
+    """A client that could not be created means defaults, not exceptions."""
+    monkeypatch.setattr(redis_service, "redis_client", None)
+
+    assert redis_service.get("key") is None
+    assert redis_service.set("key", 1) is False
+
+
+@pytest.mark.asyncio
+async def test_async_execute_fails_open(fake_redis, monkeypatch):
+    """The async service fails open the same way, on the shared breaker."""
+    client = AsyncUnreachable(redis.ConnectionError)
+    monkeypatch.setattr(async_redis_service, "redis_client", client)
+
+    for _ in range(settings.REDIS_CIRCUIT_FAILURE_THRESHOLD):
+        assert await async_redis_service.get("key") is None
+    assert async_redis_service.breaker.state is CircuitState.OPEN
+
+    # The sync service shares the breaker, so it short-circuits too
+    assert redis_service.breaker is async_redis_service.breaker
+    assert redis_service.get("key") is None
+
+    calls = client.calls
+    assert await async_redis_service.get("key") is None
+    assert client.calls == calls
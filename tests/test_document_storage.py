@@ -0,0 +1,180 @@
+"""
+Content-addressed document storage and attachment tests.
+"""
+import hashlib
+import uuid
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError, OperationalError
+
+from app.models.document import Document
+from app.models.shipment import ServiceType
+from app.schemas.shipment import ShipmentCreate
+from app.schemas.user import UserCreate
+from app.services.document_service import DocumentService
+from app.services.document_storage import (
+    LocalDocumentStorage,
+    S3DocumentStorage,
+    shard_key,
+)
+from app.services.shipment_service import ShipmentService
+from app.services.user_service import UserService
+from app.utils.uploads import StoredUpload
+
+
+def stage(storage, content):
+    """Write content to a staging path and return (digest, path)."""
+    path = storage.staging_path()
+    path.write_bytes(content)
+    return hashlib.sha256(content).hexdigest(), path
+
+
+def test_shard_key():
+    """Blobs are sharded by the first two byte pairs of their digest."""
+    digest = hashlib.sha256(b"invoice").hexdigest()
+    assert shard_key(digest) == f"{digest[:2]}/{digest[2:4]}/{digest}"
+
+
+def test_local_storage_roundtrip(tmp_path):
+    """put moves the staged file into its sharded path; delete removes it."""
+    storage = LocalDocumentStorage(tmp_path)
+    digest, staged = stage(storage, b"invoice")
+
+    assert not storage.exists(digest)
+    storage.put(digest, staged)
+
+    assert storage.exists(digest)
+    assert not staged.exists()
+    assert storage.path(digest) == tmp_path / shard_key(digest)
+    assert storage.path(digest).read_bytes() == b"invoice"
+    assert storage.local_path(digest) == storage.path(digest)
+    assert storage.download_url(digest, "invoice.pdf") is None
+
+    storage.delete(digest)
+    assert not storage.exists(digest)
+    storage.delete(digest)  # Missing blobs are not an error
+
+
+def test_local_storage_same_content_stored_once(tmp_path):
+    """Storing the same content twice keeps a single blob."""
+    storage = LocalDocumentStorage(tmp_path)
+    for _ in range(2):
+        digest, staged = stage(storage, b"invoice")
+        storage.put(digest, staged)
+
+    blobs = [path for path in tmp_path.rglob("*") if path.is_file()]
+    assert blobs == [storage.path(digest)]
+
+
+def test_s3_storage_roundtrip(tmp_path, monkeypatch):
+    """The S3 backend against moto's in-memory S3."""
+    boto3 = pytest.importorskip("boto3")
+    moto = pytest.importorskip("moto")
+
+    monkeypatch.setenv("AWS_ACCESS_KEY_ID", "testing")
+    monkeypatch.setenv("AWS_SECRET_ACCESS_KEY", "testing")
+    monkeypatch.setenv("AWS_DEFAULT_REGION", "us-east-1")
+
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="us-east-1")
+        client.create_bucket(Bucket="documents")
+        storage = S3DocumentStorage("documents", prefix="docs/", client=client)
+        storage.staging_dir = tmp_path
+
+        digest, staged = stage(storage, b"customs declaration")
+        assert not storage.exists(digest)
+
+        storage.put(digest, staged)
+        assert storage.exists(digest)
+        assert not staged.exists()
+        body = client.get_object(Bucket="documents", Key=f"docs/{shard_key(digest)}")["Body"]
+        assert body.read() == b"customs declaration"
+
+        url = storage.download_url(digest, "declaration.pdf", "application/pdf")
+        assert f"docs/{shard_key(digest)}" in url
+        assert storage.local_path(digest) is None
+
+        storage.delete(digest)
+        assert not storage.exists(digest)
+
+
+NEW_SHIPMENT = ShipmentCreate(
+    origin_city="Nairobi",
+    origin_country="Kenya",
+    destination_city="Mombasa",
+    destination_country="Kenya",
+    service_type=ServiceType.ROAD,
+)
+
+
+@pytest.fixture(scope="function")
+def service(tmp_path):
+    return DocumentService(LocalDocumentStorage(tmp_path))
+
+
+@pytest.fixture(scope="function")
+def shipment_ids(db):
+    """Two shipments of one user."""
+    user = UserService.create(db, UserCreate(email="documents-test@test.com", password="secret123"))
+    return [ShipmentService.create(db, user.id, NEW_SHIPMENT).id for _ in range(2)]
+
+
+def upload(service, content):
+    digest, path = stage(service.storage, content)
+    return StoredUpload(path, len(content), digest)
+
+
+def document(db, digest):
+    db.expire_all()
+    return db.scalar(select(Document).where(Document.sha256 == digest))
+
+
+def test_attach_stores_content_once(db, service, shipment_ids):
+    """Each shipment references the same blob; attaching twice is a no-op."""
+    for shipment_id in shipment_ids + shipment_ids[:1]:
+        staged = upload(service, b"invoice")
+        attachment = service.attach(db, shipment_id, None, staged, "invoice.pdf")
+        assert attachment.shipment_id == shipment_id
+        assert not staged.path.exists()
+
+    assert service.storage.exists(staged.sha256)
+    assert document(db, staged.sha256).ref_count == 2
+
+
+def test_failed_attach_stores_nothing(db, service, shipment_ids):
+    """Content is only stored once the attachment row was inserted."""
+    staged = upload(service, b"invoice")
+
+    with pytest.raises(IntegrityError):
+        # No such uploader
+        service.attach(db, shipment_ids[0], uuid.uuid4(), staged, "invoice.pdf")
+
+    assert not service.storage.exists(staged.sha256)
+    assert not staged.path.exists()
+    assert document(db, staged.sha256) is None
+
+
+def test_failed_commit_deletes_new_content(db, service, shipment_ids, monkeypatch):
+    """A blob stored for a document row that was rolled back is deleted again."""
+    def lost_connection():
+        raise OperationalError("COMMIT", {}, Exception("connection lost"))
+
+    staged = upload(service, b"invoice")
+    with monkeypatch.context() as patch:
+        patch.setattr(db, "commit", lost_connection)
+        with pytest.raises(OperationalError):
+            service.attach(db, shipment_ids[0], None, staged, "invoice.pdf")
+
+    assert not service.storage.exists(staged.sha256)
+    assert document(db, staged.sha256) is None
+
+    # Content other attachments already reference is kept
+    service.attach(db, shipment_ids[0], None, upload(service, b"invoice"), "invoice.pdf")
+    with monkeypatch.context() as patch:
+        patch.setattr(db, "commit", lost_connection)
+        with pytest.raises(OperationalError):
+            service.attach(db, shipment_ids[1], None, upload(service, b"invoice"), "invoice.pdf")
+
+    assert service.storage.exists(staged.sha256)
+    assert document(db, staged.sha256).ref_count == 1
@@ -0,0 +1,96 @@
+"""
+Range and conditional download tests.
+"""
+import pytest
+
+from app.utils.downloads import (
+    RangeNotSatisfiable,
+    content_disposition,
+    etag_matches,
+    file_download_response,
+    parse_range,
+)
+
+ETAG = '"abc123"'
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("bytes=0-99", (0, 99)),
+    ("bytes=100-", (100, 999)),
+    ("bytes=-100", (900, 999)),
+    ("bytes=-5000", (0, 999)),
+    ("bytes=900-5000", (900, 999)),
+    ("bytes=0-1,5-9", None),
+    ("bytes=9-5", None),
+    ("bytes=-", None),
+    ("items=0-9", None),
+])
+def test_parse_range(header, expected):
+    """Single byte ranges are parsed; anything else serves the whole file."""
+    assert parse_range(header, 1000) == expected
+
+
+@pytest.mark.parametrize("header, size", [
+    ("bytes=1000-", 1000),
+    ("bytes=-0", 1000),
+    ("bytes=0-", 0),
+])
+def test_parse_range_not_satisfiable(header, size):
+    """Ranges starting past the end of the file are not satisfiable."""
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range(header, size)
+
+
+def test_etag_matches():
+    """If-None-Match lists, wildcards and weak tags match."""
+    assert etag_matches(ETAG, ETAG)
+    assert etag_matches(f'"other", W/{ETAG}', ETAG)
+    assert etag_matches("*", ETAG)
+    assert not etag_matches('"other"', ETAG)
+    assert not etag_matches(None, ETAG)
+
+
+def test_content_disposition_non_ascii():
+    """Non-ASCII filenames get an ASCII fallback and an RFC 5987 name."""
+    header = content_disposition('zoll "ä".pdf')
+    assert header == "attachment; filename=\"zoll ___.pdf\"; filename*=UTF-8''zoll%20%22%C3%A4%22.pdf"
+
+
+def download_client(path):
+    """TestClient for an app serving path with file_download_response."""
+    pytest.importorskip("httpx")
+    from starlette.applications import Starlette
+    from starlette.routing import Route
+    from starlette.testclient import TestClient
+
+    def endpoint(request):
+        return file_download_response(request, path, path.stat().st_size, ETAG, "manifest.pdf", "application/pdf")
+
+    return TestClient(Starlette(routes=[Route("/", endpoint, methods=["GET", "HEAD"])]))
+
+
+def test_file_download_full_and_partial(tmp_path):
+    """Whole files are 200; a Range resumes with 206 and Content-Range."""
+    path = tmp_path / "manifest.pdf"
+    path.write_bytes(bytes(range(256)) * 1024)
+    client = download_client(path)
+
+    response = client.get("/")
+    assert response.status_code == 200
+    assert response.content == path.read_bytes()
+    assert response.headers["etag"] == ETAG
+    assert response.headers["accept-ranges"] == "bytes"
+
+    response = client.get("/", headers={"Range": "bytes=1000-"})
+    assert response.status_code == 206
+    assert response.content == path.read_bytes()[1000:]
+    assert response.headers["content-range"] == "bytes 1000-262143/262144"
+
+    response = client.get("/", headers={"Range": "bytes=1000-", "If-Range": '"stale"'})
+    assert response.status_code == 200
+    assert len(response.content) == 262144
+
+    response = client.get("/", headers={"Range": "bytes=262144-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == "bytes */262144"
@@ -0,0 +1,140 @@
+"""
+Index usage tests for the per-user listing and dashboard queries.
+
+Seeds a dataset large enough for the planner to prefer indexes, then
+asserts each service query plan reads shipments/quotes through an index
+rather than a sequential scan.
+"""
+import uuid
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+from sqlalchemy import text
+
+from app.models.user import User
+from app.models.shipment import Shipment, ShipmentStatus, ServiceType
+from app.models.quote import Quote, QuoteStatus
+from app.services.shipment_service import ShipmentService
+from app.services.quote_service import QuoteService
+from app.services.dashboard_service import DashboardService
+from app.utils.pagination import Explain, paginate, paginate_with_total
+
+USERS = 100
+ROWS_PER_USER = 50
+
+
+def _plan_nodes(plan):
+    """Yield every node of an EXPLAIN (FORMAT JSON) plan tree."""
+    stack = [plan[0]["Plan"]]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(node.get("Plans", []))
+
+
+def assert_index_scan(db, stmt, table):
+    """Assert the plan reads table through an index, never a seq scan."""
+    nodes = list(_plan_nodes(db.scalar(Explain(stmt))))
+    relation_scans = [node for node in nodes if node.get("Relation Name") == table]
+    index_names = [node["Index Name"] for node in nodes if "Index Name" in node]
+
+    assert not any(node["Node Type"] == "Seq Scan" for node in relation_scans), nodes
+    assert any(name.startswith(f"ix_{table}_user_id") for name in index_names), nodes
+
+
+@pytest.fixture(scope="function")
+def seeded_user_id(db):
+    """Seed users with shipments and quotes; return one user's ID."""
+    users = [
+        User(
+            id=uuid.uuid4(),
+            email=f"index-test-{i}@test.com",
+            hashed_password="x",
+            is_active=True,
+            is_verified=True,
+            is_superuser=False,
+        )
+        for i in range(USERS)
+    ]
+    db.add_all(users)
+    db.flush()
+
+    statuses = list(ShipmentStatus)
+    quote_statuses = list(QuoteStatus)
+    start = datetime.utcnow() - timedelta(days=365)
+    shipments = []
+    quotes = []
+    for user in users:
+        for i in range(ROWS_PER_USER):
+            shipments.append({
+                "id": uuid.uuid4(),
+                "tracking_number": f"GS{uuid.uuid4().hex[:12].upper()}",
+                "user_id": user.id,
+                "origin_city": "Nairobi",
+                "origin_country": "Kenya",
+                "destination_city": "Mombasa",
+                "destination_country": "Kenya",
+                "service_type": ServiceType.AIR,
+                "status": statuses[i % len(statuses)],
+                "package_count": 1,
+                "actual_cost": Decimal("10.00") if i % 3 == 0 else None,
+                "currency": "USD",
+                "insurance": False,
+                "signature_required": False,
+                "created_at": start + timedelta(hours=i),
+                "updated_at": start + timedelta(hours=i),
+            })
+            quotes.append({
+                "id": uuid.uuid4(),
+                "user_id": user.id,
+                "origin": "Nairobi",
+                "destination": "Mombasa",
+                "service_type": "air",
+                "package_count": 1,
+                "currency": "USD",
+                "status": quote_statuses[i % len(quote_statuses)],
+                "created_at": start + timedelta(hours=i),
+                "updated_at": start + timedelta(hours=i),
+            })
+
+    db.execute(Shipment.__table__.insert(), shipments)
+    db.execute(Quote.__table__.insert(), quotes)
+    db.commit()
+    db.execute(text("ANALYZE users, shipments, quotes"))
+
+    return users[0].id
+
+
+def test_user_shipments_uses_index(db, seeded_user_id):
+    """Shipment listing (with exact total) is served by an index."""
+    stmt = ShipmentService.user_shipments_statement(seeded_user_id)
+    assert_index_scan(db, paginate_with_total(stmt, Shipment, limit=10), "shipments")
+    assert_index_scan(db, paginate(stmt, Shipment, limit=10), "shipments")
+
+
+def test_user_shipments_by_status_uses_index(db, seeded_user_id):
+    """Status-filtered shipment listing is served by an index."""
+    stmt = ShipmentService.user_shipments_statement(seeded_user_id, ShipmentStatus.IN_TRANSIT)
+    assert_index_scan(db, paginate(stmt, Shipment, limit=10), "shipments")
+
+
+def test_dashboard_stats_use_indexes(db, seeded_user_id):
+    """Dashboard stats aggregate and recent shipments are served by indexes."""
+    assert_index_scan(db, DashboardService.stats_statement(seeded_user_id), "shipments")
+    assert_index_scan(db, DashboardService.stats_statement(seeded_user_id), "quotes")
+    assert_index_scan(db, DashboardService.recent_shipments_statement(seeded_user_id), "shipments")
+
+
+def test_user_quotes_uses_index(db, seeded_user_id):
+    """Quote listing is served by an index."""
+    stmt = QuoteService.user_quotes_statement(seeded_user_id)
+    assert_index_scan(db, paginate_with_total(stmt, Quote, limit=10), "quotes")
+
+    stmt = QuoteService.user_quotes_statement(seeded_user_id, QuoteStatus.APPROVED)
+    assert_index_scan(db, paginate(stmt, Quote, limit=10), "quotes")
+
+
+def test_pending_count_uses_index(db, seeded_user_id):
+    """Pending quote count is served by an index."""
+    assert_index_scan(db, QuoteService.pending_count_statement(seeded_user_id), "quotes")
@@ -0,0 +1,271 @@
+"""
+Listing pagination and total-count mode tests.
+"""
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import text
+
+from app.core.security import create_access_token
+from app.models.user import User
+from app.models.shipment import Shipment, ShipmentStatus, ServiceType
+from app.services.listing_counts import CountScope, ListingCounter, fetch_page
+from app.services.shipment_service import ShipmentService
+from app.utils.pagination import CURSOR_FIELDS, CountMode, paginate_with_total
+
+OWNER = uuid.uuid4()
+SHIPMENTS = 25
+
+
+@pytest.fixture(scope="function")
+def counter():
+    return ListingCounter("test", ttl=60)
+
+
+def test_cached_total_roundtrip(fake_redis, counter):
+    """A total stored at the current generation is served back."""
+    total, generation = counter.get(OWNER, "all")
+    assert total is None
+
+    counter.set(OWNER, "all", 42, generation)
+    assert counter.get(OWNER, "all").total == 42
+    assert counter.get(OWNER, "pending").total is None
+
+
+def test_invalidate_drops_every_variant(fake_redis, counter):
+    """invalidate clears the totals of all filter variants."""
+    for variant, total in (("all", 10), ("pending", 3)):
+        counter.set(OWNER, variant, total, counter.get(OWNER, variant).generation)
+
+    counter.invalidate(OWNER)
+
+    assert counter.get(OWNER, "all").total is None
+    assert counter.get(OWNER, "pending").total is None
+
+
+def test_total_counted_before_invalidate_is_not_cached(fake_redis, counter):
+    """A reader racing a write cannot put its stale total back."""
+    _, generation = counter.get(OWNER, "all")
+    counter.invalidate(OWNER)  # A write lands while the reader counts
+    counter.set(OWNER, "all", 10, generation)
+
+    assert counter.get(OWNER, "all").total is None
+
+    _, generation = counter.get(OWNER, "all")
+    counter.set(OWNER, "all", 11, generation)
+    assert counter.get(OWNER, "all").total == 11
+
+
+def test_key_expires(fake_redis, counter):
+    """Totals expire after the counter's TTL."""
+    counter.set(OWNER, "all", 5, counter.get(OWNER, "all").generation)
+    assert 0 < fake_redis.ttl(counter.key(OWNER)) <= 60
+
+
+@pytest.mark.asyncio
+async def test_async_cached_total(fake_redis, counter):
+    """aget/aset share the sync counter's keys and generation check."""
+    total, generation = await counter.aget(OWNER, "all")
+    assert total is None
+
+    counter.invalidate(OWNER)
+    await counter.aset(OWNER, "all", 7, generation)
+    assert (await counter.aget(OWNER, "all")).total is None
+
+    _, generation = await counter.aget(OWNER, "all")
+    await counter.aset(OWNER, "all", 7, generation)
+    assert counter.get(OWNER, "all").total == 7
+
+
+@pytest.fixture(scope="function")
+def user_id(db):
+    """A user with SHIPMENTS shipments created a minute apart."""
+    user = User(
+        id=uuid.uuid4(),
+        email="listing-test@test.com",
+        hashed_password="x",
+        is_active=True,
+        is_verified=True,
+        is_superuser=False,
+    )
+    db.add(user)
+    db.flush()
+
+    start = datetime.utcnow() - timedelta(days=1)
+    db.execute(Shipment.__table__.insert(), [
+        {
+            "id": uuid.uuid4(),
+            "tracking_number": f"GSLISTING{i:05d}",
+            "user_id": user.id,
+            "origin_city": "Nairobi",
+            "origin_country": "Kenya",
+            "destination_city": "Mombasa",
+            "destination_country": "Kenya",
+            "service_type": ServiceType.AIR,
+            "status": ShipmentStatus.PENDING if i % 5 else ShipmentStatus.DELIVERED,
+            "package_count": 1,
+            "currency": "USD",
+            "insurance": False,
+            "signature_required": False,
+            # Pairs share created_at, so the id tie-break is exercised
+            "created_at": start + timedelta(minutes=i // 2),
+            "updated_at": start,
+        }
+        for i in range(SHIPMENTS)
+    ])
+    db.commit()
+    db.execute(text("ANALYZE shipments"))
+    return user.id
+
+
+def walk(db, user_id, count, limit=10):
+    """Fetch every page by cursor; returns (pages, ids in order)."""
+    stmt = ShipmentService.user_shipments_statement(user_id)
+    pages, ids, cursor = [], [], None
+    while True:
+        page = fetch_page(db, stmt, Shipment, limit=limit, cursor=cursor, count=count)
+        pages.append(page)
+        ids.extend(shipment.id for shipment in page.items)
+        cursor = page.next_cursor
+        if cursor is None:
+            return pages, ids
+
+
+@pytest.mark.parametrize("count", [CountMode.EXACT, CountMode.NONE])
+def test_cursor_pages_cover_listing_once(db, user_id, count):
+    """Cursor pages return every row once, newest first."""
+    pages, ids = walk(db, user_id, count)
+
+    assert [len(page.items) for page in pages] == [10, 10, 5]
+    assert len(set(ids)) == SHIPMENTS
+
+    rows = [item for page in pages for item in page.items]
+    keys = [(row.created_at, row.id) for row in rows]
+    assert keys == sorted(keys, reverse=True)
+
+    expected_total = SHIPMENTS if count is CountMode.EXACT else None
+    assert all(page.total == expected_total for page in pages)
+
+
+def test_paginate_with_total_counts_whole_listing(db, user_id):
+    """The windowed total is the listing total, on every page."""
+    stmt = ShipmentService.user_shipments_statement(user_id, ShipmentStatus.PENDING)
+    rows = db.execute(paginate_with_total(stmt, Shipment, limit=3)).all()
+
+    assert len(rows) == 4  # limit + 1 to detect a next page
+    assert {row.total for row in rows} == {20}
+
+
+def test_exact_total_past_the_end(db, user_id):
+    """A page past the last row still reports the total."""
+    stmt = ShipmentService.user_shipments_statement(user_id)
+    page = fetch_page(db, stmt, Shipment, skip=100, limit=10)
+
+    assert page.items == []
+    assert page.total == SHIPMENTS
+
+
+def test_estimated_total(db, user_id):
+    """ESTIMATED reports the planner's estimate without counting."""
+    stmt = ShipmentService.user_shipments_statement(user_id)
+    page = fetch_page(db, stmt, Shipment, limit=10, count=CountMode.ESTIMATED)
+
+    assert len(page.items) == 10
+    assert isinstance(page.total, int) and page.total > 0
+
+
+def test_cached_total(db, user_id, fake_redis, counter):
+    """CACHED counts once, then serves the cached total until invalidated."""
+    stmt = ShipmentService.user_shipments_statement(user_id)
+    scope = CountScope(counter, user_id, "all")
+
+    assert fetch_page(db, stmt, Shipment, limit=5, count=CountMode.CACHED, scope=scope).total == SHIPMENTS
+
+    db.execute(text("DELETE FROM shipments WHERE tracking_number = 'GSLISTING00000'"))
+    db.commit()
+    assert fetch_page(db, stmt, Shipment, limit=5, count=CountMode.CACHED, scope=scope).total == SHIPMENTS
+
+    counter.invalidate(user_id)
+    assert fetch_page(db, stmt, Shipment, limit=5, count=CountMode.CACHED, scope=scope).total == SHIPMENTS - 1
+
+
+FIELDS = ("tracking_number", "status")
+
+
+def test_paginate_with_total_narrows_window_to_fieldset(db, user_id):
+    """With fields, the count(*) OVER () subquery reads only those and the cursor columns."""
+    stmt = ShipmentService.user_shipments_statement(user_id, ShipmentStatus.PENDING)
+    paginated = paginate_with_total(stmt, Shipment, limit=3, fields=FIELDS)
+
+    windowed = paginated.get_final_froms()[0]
+    assert set(windowed.c.keys()) == {*CURSOR_FIELDS, *FIELDS, "total"}
+
+    rows = db.execute(paginated).all()
+    assert len(rows) == 4
+    assert {row.total for row in rows} == {20}
+    assert {row[0].status for row in rows} == {ShipmentStatus.PENDING}
+
+
+@pytest.fixture(scope="function")
+def user_headers(user_id):
+    return {"Authorization": f"Bearer {create_access_token(data={'sub': str(user_id)})}"}
+
+
+def listing_order(db, user_id):
+    """Tracking numbers in listing order, newest first."""
+    stmt = ShipmentService.user_shipments_statement(user_id)
+    return [shipment.tracking_number for shipment in db.scalars(
+        stmt.order_by(Shipment.created_at.desc(), Shipment.id.desc())
+    )]
+
+
+def test_read_shipments_fields(client, fake_redis, db, user_id, user_headers):
+    """fields= trims every item; next_cursor walks the projected listing once."""
+    tracking_numbers, cursor = [], None
+    while True:
+        params = {"limit": 10, "fields": "status, tracking_number"}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/shipments/", params=params, headers=user_headers)
+        assert response.status_code == 200
+
+        page = response.json()
+        assert page["total"] == SHIPMENTS
+        assert all(list(item) == list(FIELDS) for item in page["items"])
+        tracking_numbers.extend(item["tracking_number"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+
+    assert tracking_numbers == listing_order(db, user_id)
+
+
+def test_read_shipments_unknown_field(client, fake_redis, user_headers):
+    """Fields outside the response schema are refused."""
+    response = client.get("/api/v1/shipments/", params={"fields": "status,hashed_password"}, headers=user_headers)
+
+    assert response.status_code == 400
+    assert "hashed_password" in response.text
+
+
+def test_admin_shipments_fields(client, fake_redis, db, user_id, superuser_headers):
+    """The admin listing trims items too and returns the next cursor in X-Next-Cursor."""
+    tracking_numbers, cursor = [], None
+    while True:
+        params = {"limit": 10, "fields": ",".join(FIELDS)}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/api/v1/admin/shipments", params=params, headers=superuser_headers)
+        assert response.status_code == 200
+
+        assert all(list(item) == list(FIELDS) for item in response.json())
+        tracking_numbers.extend(item["tracking_number"] for item in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert tracking_numbers == listing_order(db, user_id)
+
+    response = client.get("/api/v1/admin/shipments", params={"fields": "nope"}, headers=superuser_headers)
+    assert response.status_code == 400
@@ -0,0 +1,141 @@
+"""
+shipment_events partition maintenance tests.
+"""
+import uuid
+from datetime import date, datetime
+
+import pytest
+from sqlalchemy import delete, func, select, text
+
+from app.models.user import User
+from app.models.shipment import Shipment, ShipmentStatus, ServiceType
+from app.models.shipment_event import ShipmentEvent
+from app.services.partition_service import DEFAULT_PARTITION, PartitionService
+
+TODAY = date(2030, 5, 17)
+
+
+@pytest.fixture(scope="function")
+def shipment_id(db):
+    """A shipment to hang events on."""
+    user = User(
+        id=uuid.uuid4(),
+        email="partition-test@test.com",
+        hashed_password="x",
+        is_active=True,
+        is_verified=True,
+        is_superuser=False,
+    )
+    db.add(user)
+    db.flush()
+
+    shipment_id = uuid.uuid4()
+    db.execute(Shipment.__table__.insert(), [{
+        "id": shipment_id,
+        "tracking_number": "GSPARTITION01",
+        "user_id": user.id,
+        "origin_city": "Nairobi",
+        "origin_country": "Kenya",
+        "destination_city": "Mombasa",
+        "destination_country": "Kenya",
+        "service_type": ServiceType.AIR,
+        "status": ShipmentStatus.DELIVERED,
+        "package_count": 1,
+        "currency": "USD",
+        "insurance": False,
+        "signature_required": False,
+        "created_at": datetime(2020, 1, 1),
+        "updated_at": datetime(2020, 1, 1),
+    }])
+    db.commit()
+    return shipment_id
+
+
+@pytest.fixture(scope="function")
+def detached_tables(db):
+    """Drop partitions left detached by a test (drop_all only sees attached ones)."""
+    names = []
+    yield names
+    db.rollback()
+    for name in names:
+        db.execute(text(f"DROP TABLE IF EXISTS {name}"))
+    db.commit()
+
+
+def add_event(db, shipment_id, timestamp):
+    db.execute(ShipmentEvent.__table__.insert(), [{
+        "id": uuid.uuid4(),
+        "shipment_id": shipment_id,
+        "event_type": "in_transit",
+        "timestamp": timestamp,
+        "created_at": timestamp,
+    }])
+    db.commit()
+
+
+def rows_in(db, table):
+    return db.scalar(text(f"SELECT count(*) FROM {table}"))
+
+
+def test_create_partition(db):
+    """A month partition is created and listed."""
+    assert PartitionService.create_partition(db, date(2030, 5, 1)) == "shipment_events_p203005"
+    assert PartitionService.list_partitions(db) == {date(2030, 5, 1): "shipment_events_p203005"}
+
+
+def test_create_partition_moves_rows_from_default(db, shipment_id):
+    """Rows stranded in the default partition move into the new month."""
+    add_event(db, shipment_id, datetime(2020, 1, 15))
+    add_event(db, shipment_id, datetime(2020, 2, 1))
+    assert rows_in(db, DEFAULT_PARTITION) == 2
+
+    PartitionService.create_partition(db, date(2020, 1, 1))
+
+    assert rows_in(db, "shipment_events_p202001") == 1
+    assert rows_in(db, DEFAULT_PARTITION) == 1
+    assert db.scalar(select(func.count()).select_from(ShipmentEvent)) == 2
+
+
+def test_ensure_partitions(db):
+    """The current month and months_ahead months are created once."""
+    created = PartitionService.ensure_partitions(db, months_ahead=2, today=TODAY)
+    assert created == [
+        "shipment_events_p203005",
+        "shipment_events_p203006",
+        "shipment_events_p203007",
+    ]
+    assert PartitionService.ensure_partitions(db, months_ahead=2, today=TODAY) == []
+
+
+def test_apply_retention_detaches_old_partitions(db, shipment_id, detached_tables):
+    """Expired months are detached and no longer hold shipments in place."""
+    PartitionService.create_partition(db, date(2020, 1, 1))
+    PartitionService.ensure_partitions(db, months_ahead=0, today=TODAY)
+    add_event(db, shipment_id, datetime(2020, 1, 15))
+
+    detached_tables.append("shipment_events_p202001")
+    assert PartitionService.apply_retention(db, 24, today=TODAY) == ["shipment_events_p202001"]
+
+    assert list(PartitionService.list_partitions(db)) == [date(2030, 5, 1)]
+    assert rows_in(db, "shipment_events_p202001") == 1
+    assert db.scalar(select(func.count()).select_from(ShipmentEvent)) == 0
+
+    foreign_keys = db.scalar(text(
+        "SELECT count(*) FROM pg_constraint "
+        "WHERE conrelid = CAST('shipment_events_p202001' AS regclass) AND contype = 'f'"
+    ))
+    assert foreign_keys == 0
+
+    # The shipment is no longer referenced
+    db.execute(delete(Shipment).where(Shipment.id == shipment_id))
+    db.commit()
+
+
+def test_apply_retention_drop(db, shipment_id):
+    """With drop, expired partitions are deleted."""
+    PartitionService.create_partition(db, date(2020, 1, 1))
+    add_event(db, shipment_id, datetime(2020, 1, 15))
+
+    assert PartitionService.apply_retention(db, 24, drop=True, today=TODAY) == ["shipment_events_p202001"]
+    assert db.scalar(text("SELECT to_regclass('shipment_events_p202001')")) is None
+    assert PartitionService.apply_retention(db, 24, drop=True, today=TODAY) == []
@@ -0,0 +1,162 @@
+"""
+Principal cache tests: codec round trip, invalidation across workers and
+loads racing an invalidation.
+"""
+import json
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import pytest
+
+from app.schemas.user import UserCreate
+from app.services.principal_cache import Principal, PrincipalCache, principal_cache
+from app.services.redis_service import redis_service
+from app.services.user_service import AsyncUserService, UserService
+
+PRINCIPAL = Principal(
+    id=uuid.uuid4(),
+    email="principal-test@test.com",
+    company_name=None,
+    phone="+254 700 000000",
+    full_name="Principal Test",
+    is_active=True,
+    is_verified=False,
+    is_superuser=False,
+    created_at=datetime(2024, 1, 2, 3, 4, 5, 678901),
+    updated_at=datetime(2024, 2, 3, 4, 5, 6),
+    last_login=None,
+)
+
+
+@pytest.fixture(scope="function")
+def cache(fake_redis):
+    """The global principal cache, with an empty local tier."""
+    principal_cache._local.clear()
+    yield principal_cache
+    principal_cache._local.clear()
+
+
+@pytest.fixture(scope="function")
+def user_id(db):
+    user = UserService.create(db, UserCreate(email="principal-user@test.com", password="secret123"))
+    return user.id
+
+
+def refuse_load():
+    raise AssertionError("principal should have been served from the cache")
+
+
+def test_codec_round_trip(cache):
+    """Principals come back field for field, through JSON and through Redis."""
+    codec = cache._remote.codec
+    assert codec.decode(json.loads(json.dumps(codec.encode(PRINCIPAL)))) == PRINCIPAL
+
+    assert cache._remote.set(PRINCIPAL.id, PRINCIPAL)
+    assert cache.get(PRINCIPAL.id) == PRINCIPAL
+
+
+def test_loaded_principal_served_from_redis(cache, db, user_id):
+    """A principal loaded from the database is served from Redis after the local tier is dropped."""
+    principal = UserService.get_principal(db, user_id)
+    assert principal.id == user_id and principal.is_active
+
+    cache._local.clear()
+    assert cache.get_or_load(user_id, refuse_load) == principal
+
+
+def test_invalidation_reaches_other_workers(cache, db, user_id):
+    """Deactivating a user evicts the local copy held by another worker."""
+    worker = PrincipalCache()
+    worker.start_listener()
+    try:
+        principal = worker.get_or_load(user_id, lambda: UserService.get_by_id(db, user_id))
+        assert worker._local.get(user_id) == principal
+
+        UserService.deactivate(db, user_id)
+
+        deadline = time.monotonic() + 5
+        while worker._local.get(user_id) is not None and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert worker._local.get(user_id) is None
+        assert not worker.get_or_load(user_id, lambda: UserService.get_by_id(db, user_id)).is_active
+    finally:
+        worker.stop_listener()
+
+
+def test_load_racing_an_invalidation_is_not_cached(cache, db, user_id):
+    """A principal loaded before the user was deactivated is returned but not cached."""
+    def load_then_deactivate():
+        principal = cache._remote.codec.from_object(UserService.get_by_id(db, user_id))
+        UserService.deactivate(db, user_id)
+        return principal
+
+    assert cache.get_or_load(user_id, load_then_deactivate).is_active
+    assert cache.get(user_id) is None
+    assert not UserService.get_principal(db, user_id).is_active
+
+
+@pytest.mark.asyncio
+async def test_async_load_racing_an_invalidation_is_not_cached(cache, db, async_db, user_id):
+    """The async path refuses stale principals the same way."""
+    async def load_then_deactivate():
+        user = await AsyncUserService.get_by_id(async_db, user_id)
+        principal = cache._remote.codec.from_object(user)
+        UserService.deactivate(db, user_id)
+        return principal
+
+    assert (await cache.aget_or_load(user_id, load_then_deactivate)).is_active
+    assert await cache.aget(user_id) is None
+
+
+class Timer:
+    """Stand-in for threading.Timer that fires only when told to."""
+    created = []
+
+    def __init__(self, interval, function):
+        self.interval = interval
+        self.function = function
+        self.daemon = False
+        self.created.append(self)
+
+    def start(self):
+        pass
+
+    def cancel(self):
+        pass
+
+    def fire(self):
+        self.function()
+
+
+def test_listener_retries_until_redis_is_reachable(cache, fake_redis, monkeypatch):
+    """A listener started while Redis is down keeps retrying, and subscribes once it is back."""
+    fakeredis = pytest.importorskip("fakeredis")
+    monkeypatch.setattr(threading, "Timer", Timer)
+    monkeypatch.setattr(Timer, "created", [])
+    client = redis_service.redis_client
+    down = fakeredis.FakeServer()
+    down.connected = False
+
+    worker = PrincipalCache()
+    monkeypatch.setattr(redis_service, "redis_client", None)
+    worker.start_listener()
+    assert worker._listener is None and len(Timer.created) == 1
+
+    monkeypatch.setattr(redis_service, "redis_client", fakeredis.FakeRedis(server=down))
+    Timer.created[-1].fire()
+    assert worker._listener is None and len(Timer.created) == 2
+
+    monkeypatch.setattr(redis_service, "redis_client", client)
+    Timer.created[-1].fire()
+    try:
+        assert worker._listener is not None
+        assert len(Timer.created) == 2
+    finally:
+        worker.stop_listener()
+
+    # A retry that fires after the listener was stopped does nothing
+    worker._retry_timer = None
+    Timer.created[0].fire()
+    assert worker._listener is None
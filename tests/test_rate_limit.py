@@ -0,0 +1,146 @@
+"""
+Token bucket rate limiter and middleware tests.
+"""
+import pytest
+from fastapi import FastAPI
+
+from app.core.config import settings
+from app.middleware.rate_limit import RateLimitMiddleware
+from app.services.async_redis_service import async_redis_service
+from app.services.rate_limiter import RateLimiter
+
+LIMIT = 3
+WINDOW = 60
+TOKEN_MS = WINDOW * 1000 // LIMIT  # Time to refill one token
+
+
+@pytest.fixture(scope="function")
+def limiter():
+    return RateLimiter(LIMIT, WINDOW, key_prefix="rate_limit_test")
+
+
+def rewind(fake_redis, limiter, identifier, milliseconds):
+    """Move a bucket's last refill back, as if that much time had passed."""
+    key = limiter.key(identifier)
+    fake_redis.hset(key, "ts", int(fake_redis.hget(key, "ts")) - milliseconds)
+
+
+@pytest.mark.asyncio
+async def test_first_hit_takes_one_token(fake_redis, limiter):
+    """A new bucket starts full, and always gets a TTL."""
+    result = await limiter.hit("10.0.0.1")
+
+    assert result.allowed
+    assert (result.limit, result.remaining) == (LIMIT, LIMIT - 1)
+    assert result.reset_after == TOKEN_MS // 1000
+    assert result.retry_after == 0
+    assert 0 < fake_redis.pttl(limiter.key("10.0.0.1")) <= WINDOW * 1000
+
+
+@pytest.mark.asyncio
+async def test_exhausted_bucket_rejects(fake_redis, limiter):
+    """Once the tokens are used up, requests are refused until one refills."""
+    for remaining in range(LIMIT - 1, -1, -1):
+        result = await limiter.hit("10.0.0.1")
+        assert result.allowed and result.remaining == remaining
+
+    result = await limiter.hit("10.0.0.1")
+    assert not result.allowed
+    assert result.remaining == 0
+    assert result.retry_after == TOKEN_MS // 1000
+    assert result.reset_after == WINDOW
+
+    # Other clients have their own bucket
+    assert (await limiter.hit("10.0.0.2")).allowed
+
+
+@pytest.mark.asyncio
+async def test_bucket_refills_over_time(fake_redis, limiter):
+    """Tokens come back continuously, up to the capacity."""
+    for _ in range(LIMIT + 1):
+        await limiter.hit("10.0.0.1")
+
+    rewind(fake_redis, limiter, "10.0.0.1", TOKEN_MS)
+    result = await limiter.hit("10.0.0.1")
+    assert result.allowed and result.remaining == 0
+    assert not (await limiter.hit("10.0.0.1")).allowed
+
+    rewind(fake_redis, limiter, "10.0.0.1", WINDOW * 1000 * 10)
+    assert (await limiter.hit("10.0.0.1")).remaining == LIMIT - 1
+
+
+@pytest.mark.asyncio
+async def test_redis_unavailable(fake_redis, limiter, monkeypatch):
+    """Without Redis there is no result, so callers can fail open."""
+    async def unavailable(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(async_redis_service, "run_script", unavailable)
+    assert await limiter.hit("10.0.0.1") is None
+
+
+@pytest.fixture(scope="function")
+def client(fake_redis, monkeypatch):
+    """TestClient for an app behind the rate limit middleware, LIMIT per minute."""
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(settings, "RATE_LIMIT_PER_MINUTE", LIMIT)
+    app = FastAPI()
+
+    @app.get("/health")
+    def health():
+        return {"status": "ok"}
+
+    @app.get("/items")
+    def items():
+        return []
+
+    app.add_middleware(RateLimitMiddleware)
+    # One event loop for every request, as the fake async client is bound to it
+    with TestClient(app) as client:
+        yield client
+
+
+def test_middleware_adds_rate_limit_headers(client):
+    """Allowed responses carry the bucket state."""
+    for remaining in range(LIMIT - 1, -1, -1):
+        response = client.get("/items")
+        assert response.status_code == 200
+        assert response.headers["X-RateLimit-Limit"] == str(LIMIT)
+        assert response.headers["X-RateLimit-Remaining"] == str(remaining)
+        assert int(response.headers["X-RateLimit-Reset"]) > 0
+        assert "Retry-After" not in response.headers
+
+
+def test_middleware_rejects_with_retry_after(client):
+    """Requests over the limit get 429 with Retry-After."""
+    for _ in range(LIMIT):
+        client.get("/items")
+
+    response = client.get("/items")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == str(TOKEN_MS // 1000)
+    assert response.headers["X-RateLimit-Remaining"] == "0"
+    assert response.json()["retry_after"] == TOKEN_MS // 1000
+
+
+def test_middleware_skips_exempt_paths(client):
+    """Health checks are never limited or counted."""
+    for _ in range(LIMIT + 1):
+        response = client.get("/health")
+        assert response.status_code == 200
+        assert "X-RateLimit-Limit" not in response.headers
+    assert client.get("/items").headers["X-RateLimit-Remaining"] == str(LIMIT - 1)
+
+
+def test_middleware_fails_open(client, monkeypatch):
+    """Requests pass without rate limit headers when Redis is unavailable."""
+    async def unavailable(*args, **kwargs):
+        return None
+
+    monkeypatch.setattr(async_redis_service, "run_script", unavailable)
+    for _ in range(LIMIT + 1):
+        response = client.get("/items")
+        assert response.status_code == 200
+        assert "X-RateLimit-Limit" not in response.headers
@@ -0,0 +1,117 @@
+"""
+Bulk shipment creation tests.
+"""
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+
+from app.core.config import settings
+from app.models.user import User
+from app.models.shipment import DEFAULT_CURRENCY, Shipment, ShipmentStatus
+from app.services.shipment_service import BULK_INSERT_CHUNK_ROWS, ShipmentService
+from app.services.stats_service import StatsService
+from app.services.tracking_numbers import tracking_numbers
+from app.utils.exceptions import ValidationException
+
+VALID_ROW = {
+    "origin_city": "Nairobi",
+    "origin_country": "Kenya",
+    "destination_city": "Mombasa",
+    "destination_country": "Kenya",
+    "service_type": "air",
+}
+
+
+@pytest.fixture(scope="function")
+def user_id(db):
+    """The user creating shipments."""
+    user = User(
+        id=uuid.uuid4(),
+        email="bulk-test@test.com",
+        hashed_password="x",
+        is_active=True,
+        is_verified=True,
+        is_superuser=False,
+    )
+    db.add(user)
+    db.commit()
+    StatsService.reconcile(db)
+    return user.id
+
+
+def shipments_of(db, user_id):
+    return db.scalars(select(Shipment).where(Shipment.user_id == user_id)).all()
+
+
+def test_create_bulk_reports_invalid_rows_by_index(db, user_id):
+    """Valid rows are created; invalid ones are reported at their index."""
+    rows = [
+        VALID_ROW,
+        {**VALID_ROW, "service_type": "rocket"},
+        {**VALID_ROW, "destination_city": "Kisumu", "weight": "2.50"},
+        {key: value for key, value in VALID_ROW.items() if key != "origin_country"},
+        {**VALID_ROW, "destination_city": "Lamu"},
+    ]
+
+    result = ShipmentService.create_bulk(db, user_id, rows)
+
+    assert [item["index"] for item in result["created"]] == [0, 2, 4]
+    assert [item["index"] for item in result["errors"]] == [1, 3]
+    assert all(item["errors"] for item in result["errors"])
+
+    shipments = {shipment.id: shipment for shipment in shipments_of(db, user_id)}
+    assert set(shipments) == {item["id"] for item in result["created"]}
+    for item in result["created"]:
+        shipment = shipments[item["id"]]
+        assert shipment.tracking_number == item["tracking_number"]
+        assert shipment.status == ShipmentStatus.PENDING
+        assert shipment.currency == DEFAULT_CURRENCY
+    assert StatsService.reconcile(db) == {}
+
+
+def test_create_bulk_all_invalid(db, user_id):
+    """A request with no valid rows creates nothing."""
+    result = ShipmentService.create_bulk(db, user_id, [{}, {**VALID_ROW, "origin_city": "X"}])
+
+    assert result["created"] == []
+    assert [item["index"] for item in result["errors"]] == [0, 1]
+    assert shipments_of(db, user_id) == []
+
+
+def test_create_bulk_inserts_in_chunks(db, user_id):
+    """Requests over one chunk are inserted in several statements."""
+    count = BULK_INSERT_CHUNK_ROWS * 2 + 5
+
+    result = ShipmentService.create_bulk(db, user_id, [VALID_ROW] * count)
+
+    assert [item["index"] for item in result["created"]] == list(range(count))
+    assert len({item["tracking_number"] for item in result["created"]}) == count
+    assert db.scalar(
+        select(func.count()).select_from(Shipment).where(Shipment.user_id == user_id)
+    ) == count
+    assert StatsService.get_system_stats(db)["shipments"]["total"] == count
+
+
+def test_create_bulk_retries_taken_tracking_numbers(db, user_id, monkeypatch):
+    """Rows whose tracking number is already taken get a fresh one."""
+    taken = ShipmentService.create_bulk(db, user_id, [VALID_ROW])["created"][0]["tracking_number"]
+
+    issue = tracking_numbers.next
+    numbers = iter([taken])
+    monkeypatch.setattr(tracking_numbers, "next", lambda db: next(numbers, None) or issue(db))
+
+    result = ShipmentService.create_bulk(db, user_id, [VALID_ROW, VALID_ROW])
+
+    assert [item["index"] for item in result["created"]] == [0, 1]
+    assert taken not in {item["tracking_number"] for item in result["created"]}
+    assert len(shipments_of(db, user_id)) == 3
+
+
+def test_create_bulk_row_limit(db, user_id, monkeypatch):
+    """Requests over BULK_SHIPMENT_MAX_ROWS are refused outright."""
+    monkeypatch.setattr(settings, "BULK_SHIPMENT_MAX_ROWS", 2)
+
+    with pytest.raises(ValidationException):
+        ShipmentService.create_bulk(db, user_id, [VALID_ROW] * 3)
+    assert shipments_of(db, user_id) == []
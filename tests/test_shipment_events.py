@@ -0,0 +1,314 @@
+"""
+Carrier event batch ingestion tests.
+"""
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import func, select
+
+from app.models.user import User
+from app.models.shipment import Shipment, ShipmentStatus, ServiceType
+from app.models.shipment_event import ShipmentEvent
+from app.schemas.shipment_event import CarrierEvent, ShipmentEventCreate
+from app.services.shipment_event_service import (
+    TIMELINE_LOOKBACK,
+    AsyncShipmentEventService,
+    ShipmentEventService,
+    advanced_status,
+    timeline_cache,
+)
+from app.services.stats_service import StatsService
+from app.utils.exceptions import ValidationException
+
+SCANNED_AT = datetime.utcnow() - timedelta(hours=6)
+
+
+@pytest.mark.parametrize("current, event_type, expected", [
+    (ShipmentStatus.PENDING, "picked_up", ShipmentStatus.PICKED_UP),
+    (ShipmentStatus.PICKED_UP, "delivered", ShipmentStatus.DELIVERED),
+    (ShipmentStatus.ON_HOLD, "in_transit", ShipmentStatus.IN_TRANSIT),
+    (ShipmentStatus.IN_TRANSIT, "picked_up", None),
+    (ShipmentStatus.IN_TRANSIT, "in_transit", None),
+    (ShipmentStatus.IN_TRANSIT, "on_hold", None),
+    (ShipmentStatus.IN_TRANSIT, "arrived_at_hub", None),
+    (ShipmentStatus.DELIVERED, "out_for_delivery", None),
+    (ShipmentStatus.CANCELLED, "in_transit", None),
+])
+def test_advanced_status(current, event_type, expected):
+    """Events only move a shipment forward, and never out of a final status."""
+    assert advanced_status(current, event_type) == expected
+
+
+def shipment_row(user_id, number, status):
+    return {
+        "id": uuid.uuid4(),
+        "tracking_number": f"GSEVENTS{number:05d}",
+        "user_id": user_id,
+        "origin_city": "Nairobi",
+        "origin_country": "Kenya",
+        "destination_city": "Mombasa",
+        "destination_country": "Kenya",
+        "service_type": ServiceType.AIR,
+        "status": status,
+        "package_count": 1,
+        "currency": "USD",
+        "insurance": False,
+        "signature_required": False,
+        "created_at": SCANNED_AT - timedelta(days=1),
+        "updated_at": SCANNED_AT - timedelta(days=1),
+    }
+
+
+@pytest.fixture(scope="function")
+def shipments(db):
+    """Shipments GSEVENTS00001-3: pending, in transit and cancelled."""
+    user = User(
+        id=uuid.uuid4(),
+        email="events-test@test.com",
+        hashed_password="x",
+        is_active=True,
+        is_verified=True,
+        is_superuser=False,
+    )
+    db.add(user)
+    db.flush()
+
+    rows = [
+        shipment_row(user.id, 1, ShipmentStatus.PENDING),
+        shipment_row(user.id, 2, ShipmentStatus.IN_TRANSIT),
+        shipment_row(user.id, 3, ShipmentStatus.CANCELLED),
+    ]
+    db.execute(Shipment.__table__.insert(), rows)
+    db.commit()
+    StatsService.reconcile(db)
+    return {row["tracking_number"]: row["id"] for row in rows}
+
+
+def event(number, event_type, minutes=0, location="Nairobi"):
+    return CarrierEvent(
+        tracking_number=f"GSEVENTS{number:05d}",
+        event_type=event_type,
+        location=location,
+        timestamp=SCANNED_AT + timedelta(minutes=minutes),
+    )
+
+
+def status_of(db, shipment_id):
+    db.expire_all()
+    return db.get(Shipment, shipment_id)
+
+
+def events_of(db, shipment_id):
+    return db.scalar(
+        select(func.count()).select_from(ShipmentEvent).where(ShipmentEvent.shipment_id == shipment_id)
+    )
+
+
+def test_ingest_batch_skips_duplicates(db, shipments):
+    """Events repeated in the batch or already stored are counted as duplicates."""
+    first = ShipmentEventService.ingest_batch(db, [
+        event(1, "arrived_at_hub"),
+        event(1, "arrived_at_hub"),
+        event(1, "arrived_at_hub", location="Mombasa"),
+    ])
+    assert (first["received"], first["inserted"], first["duplicates"]) == (3, 2, 1)
+
+    second = ShipmentEventService.ingest_batch(db, [
+        event(1, "arrived_at_hub"),
+        event(1, "arrived_at_hub", minutes=5),
+    ])
+    assert (second["inserted"], second["duplicates"]) == (1, 1)
+    assert events_of(db, shipments["GSEVENTS00001"]) == 3
+
+
+def test_ingest_batch_without_location_dedupes(db, shipments):
+    """A missing location is part of the natural key like any other value."""
+    result = ShipmentEventService.ingest_batch(db, [
+        event(2, "arrived_at_hub", location=None),
+        event(2, "arrived_at_hub", location=None),
+    ])
+    assert (result["inserted"], result["duplicates"]) == (1, 1)
+
+
+def test_ingest_batch_moves_status_forward_only(db, shipments):
+    """Shipments take the furthest new status; older and final ones stay."""
+    result = ShipmentEventService.ingest_batch(db, [
+        event(1, "picked_up"),
+        event(1, "in_transit", minutes=30),
+        event(2, "picked_up"),
+        event(3, "delivered"),
+    ])
+
+    assert result["inserted"] == 4
+    assert result["status_updates"] == 1
+    assert status_of(db, shipments["GSEVENTS00001"]).status == ShipmentStatus.IN_TRANSIT
+    assert status_of(db, shipments["GSEVENTS00002"]).status == ShipmentStatus.IN_TRANSIT
+    assert status_of(db, shipments["GSEVENTS00003"]).status == ShipmentStatus.CANCELLED
+
+    # A repeated event that does not insert moves nothing
+    again = ShipmentEventService.ingest_batch(db, [event(1, "in_transit", minutes=30)])
+    assert (again["inserted"], again["status_updates"]) == (0, 0)
+
+
+def test_ingest_batch_sets_actual_delivery(db, shipments):
+    """A delivered event records when the shipment was delivered."""
+    ShipmentEventService.ingest_batch(db, [event(2, "delivered", minutes=90)])
+
+    shipment = status_of(db, shipments["GSEVENTS00002"])
+    assert shipment.status == ShipmentStatus.DELIVERED
+    assert shipment.actual_delivery == SCANNED_AT + timedelta(minutes=90)
+
+
+def test_ingest_batch_reports_unknown_tracking_numbers(db, shipments):
+    """Events for unknown tracking numbers are reported, not stored."""
+    result = ShipmentEventService.ingest_batch(db, [
+        event(1, "picked_up"),
+        event(99, "picked_up"),
+        event(98, "in_transit"),
+        event(99, "in_transit"),
+    ])
+
+    assert result["received"] == 4
+    assert result["inserted"] == 1
+    assert result["duplicates"] == 0
+    assert result["unknown_tracking_numbers"] == ["GSEVENTS00098", "GSEVENTS00099"]
+
+
+def test_ingest_batch_records_stats(db, shipments):
+    """Status changes are applied to the admin counters as they commit."""
+    before = StatsService.get_system_stats(db)["shipments"]
+    assert before == {"total": 3, "active": 2, "delivered": 0}
+
+    ShipmentEventService.ingest_batch(db, [
+        event(1, "in_transit"),
+        event(2, "delivered"),
+    ])
+
+    assert StatsService.get_system_stats(db)["shipments"] == {"total": 3, "active": 1, "delivered": 1}
+    assert StatsService.reconcile(db) == {}
+
+
+def timeline(db, shipment_id):
+    """The shipment's timeline as read, bounded by its creation time."""
+    created_at = db.scalar(select(Shipment.created_at).where(Shipment.id == shipment_id))
+    return db.scalars(ShipmentEventService.timeline_statement(
+        shipment_id, 100, shipment_created_at=created_at
+    )).all()
+
+
+def test_ingest_batch_rejects_events_before_timeline_window(db, shipments):
+    """Events too old to show on the timeline are rejected, not stored."""
+    booked_minutes = -24 * 60  # Shipments were created a day before SCANNED_AT
+    lookback_minutes = int(TIMELINE_LOOKBACK.total_seconds() // 60)
+
+    result = ShipmentEventService.ingest_batch(db, [
+        event(1, "picked_up", minutes=booked_minutes - lookback_minutes - 1),
+        event(1, "arrived_at_hub", minutes=booked_minutes - lookback_minutes + 1),
+        event(1, "in_transit"),
+    ])
+
+    assert (result["inserted"], result["duplicates"], result["rejected"]) == (2, 0, 1)
+    assert status_of(db, shipments["GSEVENTS00001"]).status == ShipmentStatus.IN_TRANSIT
+
+    # Every stored event is on the timeline
+    shipment_id = shipments["GSEVENTS00001"]
+    assert len(timeline(db, shipment_id)) == events_of(db, shipment_id) == 2
+
+
+def test_create_rejects_events_before_timeline_window(db, shipments):
+    """Single events are held to the same bound as carrier batches."""
+    shipment_id = shipments["GSEVENTS00002"]
+    created_at = db.scalar(select(Shipment.created_at).where(Shipment.id == shipment_id))
+
+    with pytest.raises(ValidationException):
+        ShipmentEventService.create(db, ShipmentEventCreate(
+            shipment_id=shipment_id,
+            event_type="arrived_at_hub",
+            timestamp=created_at - TIMELINE_LOOKBACK - timedelta(seconds=1),
+        ))
+
+    ShipmentEventService.create(db, ShipmentEventCreate(
+        shipment_id=shipment_id,
+        event_type="arrived_at_hub",
+        timestamp=created_at - TIMELINE_LOOKBACK,
+    ))
+    assert len(timeline(db, shipment_id)) == events_of(db, shipment_id) == 1
+
+
+def test_event_timestamps_stored_as_naive_utc():
+    """Timestamps with an offset are converted to naive UTC."""
+    scanned = CarrierEvent(
+        tracking_number="GSEVENTS00001",
+        event_type="in_transit",
+        timestamp=datetime(2030, 5, 17, 12, 0, tzinfo=timezone(timedelta(hours=3))),
+    )
+    assert scanned.timestamp == datetime(2030, 5, 17, 9, 0)
+
+
+def cache_timeline(db, shipment_id):
+    generation = timeline_cache.get(shipment_id).generation
+    rows = db.scalars(select(ShipmentEvent).where(ShipmentEvent.shipment_id == shipment_id)).all()
+    assert timeline_cache.store(
+        shipment_id, [timeline_cache.codec.from_object(row) for row in rows], generation
+    )
+
+
+def test_ingest_batch_invalidates_timelines(db, shipments, fake_redis):
+    """Cached timelines of shipments that got new events are dropped."""
+    ShipmentEventService.ingest_batch(db, [event(1, "picked_up"), event(2, "arrived_at_hub")])
+    cache_timeline(db, shipments["GSEVENTS00001"])
+    cache_timeline(db, shipments["GSEVENTS00002"])
+
+    ShipmentEventService.ingest_batch(db, [event(1, "in_transit", minutes=30)])
+
+    assert timeline_cache.get(shipments["GSEVENTS00001"]).items is None
+    assert len(timeline_cache.get(shipments["GSEVENTS00002"]).items) == 1
+
+
+def test_store_after_a_write_is_refused(db, shipments, fake_redis):
+    """A list loaded before an append or invalidation is not cached."""
+    shipment_id = shipments["GSEVENTS00001"]
+    ShipmentEventService.ingest_batch(db, [event(1, "picked_up")])
+    rows = db.scalars(select(ShipmentEvent).where(ShipmentEvent.shipment_id == shipment_id)).all()
+    snapshots = [timeline_cache.codec.from_object(row) for row in rows]
+
+    generation = timeline_cache.get(shipment_id).generation
+    timeline_cache.append(shipment_id, snapshots[0])  # Not cached, but still a write
+    assert not timeline_cache.store(shipment_id, snapshots, generation)
+
+    generation = timeline_cache.get(shipment_id).generation
+    timeline_cache.invalidate(shipment_id)
+    assert not timeline_cache.store(shipment_id, snapshots, generation)
+
+    generation = timeline_cache.get(shipment_id).generation
+    assert timeline_cache.store(shipment_id, snapshots, generation)
+    assert timeline_cache.get(shipment_id).items == snapshots
+
+
+@pytest.mark.asyncio
+async def test_timeline_load_racing_a_create_is_not_cached(db, async_db, shipments, fake_redis):
+    """A timeline read that loaded rows before a new event committed does not cache them."""
+    shipment_id = shipments["GSEVENTS00001"]
+    ShipmentEventService.ingest_batch(db, [event(1, "picked_up")])
+
+    load = async_db.scalars
+
+    async def load_then_create(stmt):
+        rows = await load(stmt)
+        ShipmentEventService.create(db, ShipmentEventCreate(
+            shipment_id=shipment_id,
+            event_type="in_transit",
+            timestamp=SCANNED_AT + timedelta(minutes=30),
+        ))
+        return rows
+
+    async_db.scalars = load_then_create
+    page = await AsyncShipmentEventService.get_shipment_timeline(async_db, shipment_id)
+    assert [item.event_type for item in page.items] == ["picked_up"]
+    assert timeline_cache.get(shipment_id).items is None
+
+    async_db.scalars = load
+    page = await AsyncShipmentEventService.get_shipment_timeline(async_db, shipment_id)
+    assert [item.event_type for item in page.items] == ["picked_up", "in_transit"]
+    assert timeline_cache.get(shipment_id).items == page.items
@@ -0,0 +1,131 @@
+"""
+Admin shipment export endpoint tests.
+"""
+import csv
+import io
+import json
+import uuid
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.models.shipment import Shipment, ShipmentStatus, ServiceType
+from app.schemas.shipment import ShipmentResponse
+from app.services import export_service
+
+EXPORT_URL = "/api/v1/admin/shipments/export"
+
+# Text a spreadsheet would run as a formula, one per column
+FORMULAS = {
+    "origin_city": '=HYPERLINK("http://evil.example","Nairobi")',
+    "destination_city": "@SUM(A1:A9)",
+    "origin_address": "+254 Moi Avenue",
+    "destination_address": "-1+1",
+    "origin_postal_code": "\t00100",
+    "special_instructions": "\rcmd|' /C calc'!A0",
+}
+
+
+@pytest.fixture(scope="function")
+def export_db(db, monkeypatch):
+    """Point the export's own session at the test database."""
+    monkeypatch.setattr(export_service, "ReadSessionLocal", lambda replica=None: Session(bind=db.get_bind()))
+    return db
+
+
+def add_shipment(db, user_id, **values):
+    shipment = Shipment(**{
+        "id": uuid.uuid4(),
+        "tracking_number": f"GSEXPORT{uuid.uuid4().hex[:8].upper()}",
+        "user_id": user_id,
+        "origin_city": "Nairobi",
+        "origin_country": "Kenya",
+        "destination_city": "Mombasa",
+        "destination_country": "Kenya",
+        "service_type": ServiceType.ROAD,
+        "status": ShipmentStatus.PENDING,
+        "package_count": 1,
+        "currency": "USD",
+        "insurance": False,
+        "signature_required": False,
+        "created_at": datetime(2024, 5, 1, 12, 0),
+        "updated_at": datetime(2024, 5, 1, 12, 0),
+        **values,
+    })
+    db.add(shipment)
+    db.commit()
+    return shipment
+
+
+def read_csv(response):
+    return list(csv.reader(io.StringIO(response.text)))
+
+
+def read_ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_csv_export_defuses_formulas(client, fake_redis, export_db, superuser, superuser_headers):
+    """Text cells starting like a formula are quoted; other values are exported as they are."""
+    shipment = add_shipment(export_db, superuser.id, weight=Decimal("12.50"), **FORMULAS)
+
+    response = client.get(EXPORT_URL, headers=superuser_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"].startswith('attachment; filename="shipments-')
+    header, row = read_csv(response)
+    assert header == list(ShipmentResponse.model_fields)
+    row = dict(zip(header, row))
+    for name, value in FORMULAS.items():
+        assert row[name] == "'" + value
+    assert row["tracking_number"] == shipment.tracking_number
+    assert row["origin_country"] == "Kenya"
+    assert row["weight"] == "12.50"
+    assert row["status"] == ShipmentStatus.PENDING.value
+
+
+def test_ndjson_export_keeps_values(client, fake_redis, export_db, superuser, superuser_headers):
+    """NDJSON is not read by spreadsheets, so values are not altered."""
+    add_shipment(export_db, superuser.id, **FORMULAS)
+    add_shipment(export_db, superuser.id)
+
+    response = client.get(EXPORT_URL, params={"format": "ndjson"}, headers=superuser_headers)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = read_ndjson(response)
+    assert len(rows) == 2
+    assert all(list(row) == list(ShipmentResponse.model_fields) for row in rows)
+    assert FORMULAS["origin_city"] in {row["origin_city"] for row in rows}
+
+
+def test_empty_export(client, fake_redis, export_db, superuser_headers):
+    """An empty CSV export is just the header; an empty NDJSON export is empty."""
+    response = client.get(EXPORT_URL, headers=superuser_headers)
+    assert response.status_code == 200
+    assert read_csv(response) == [list(ShipmentResponse.model_fields)]
+
+    response = client.get(EXPORT_URL, params={"format": "ndjson"}, headers=superuser_headers)
+    assert response.status_code == 200
+    assert response.text == ""
+
+
+def test_export_fields_projection(client, fake_redis, export_db, superuser, superuser_headers):
+    """fields= limits both formats to those columns, in schema order."""
+    shipment = add_shipment(export_db, superuser.id, origin_city="=1+1")
+    params = {"fields": "tracking_number, origin_city"}
+
+    response = client.get(EXPORT_URL, params=params, headers=superuser_headers)
+    assert read_csv(response) == [
+        ["origin_city", "tracking_number"],
+        ["'=1+1", shipment.tracking_number],
+    ]
+
+    response = client.get(EXPORT_URL, params={**params, "format": "ndjson"}, headers=superuser_headers)
+    assert read_ndjson(response) == [{"origin_city": "=1+1", "tracking_number": shipment.tracking_number}]
+
+    response = client.get(EXPORT_URL, params={"fields": "tracking_number,hashed_password"}, headers=superuser_headers)
+    assert response.status_code == 400
@@ -0,0 +1,154 @@
+"""
+CSV shipment import tests.
+"""
+import copy
+import os
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.user import User
+from app.models.shipment import Shipment, ShipmentStatus, ServiceType
+from app.services import shipment_import_service as import_module
+from app.services.shipment_import_service import ShipmentImportService
+
+HEADER = "origin_city,origin_country,destination_city,destination_country,service_type,weight,dimensions"
+
+
+@pytest.fixture(scope="function")
+def user_id(db):
+    """The importing user."""
+    user = User(
+        id=uuid.uuid4(),
+        email="import-test@test.com",
+        hashed_password="x",
+        is_active=True,
+        is_verified=True,
+        is_superuser=False,
+    )
+    db.add(user)
+    db.commit()
+    return user.id
+
+
+@pytest.fixture(scope="function")
+def saved_jobs(monkeypatch):
+    """Record every job progress update instead of writing it to Redis."""
+    saved = []
+    monkeypatch.setattr(
+        ShipmentImportService, "_save_job", staticmethod(lambda job: saved.append(copy.deepcopy(job)))
+    )
+    return saved
+
+
+def write_csv(tmp_path, *lines):
+    path = tmp_path / "shipments.csv"
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_import_copies_valid_rows_and_reports_errors(db, user_id, saved_jobs, tmp_path, monkeypatch):
+    """Valid rows are COPYed in chunks; invalid ones are reported by line."""
+    monkeypatch.setattr(settings, "SHIPMENT_IMPORT_CHUNK_ROWS", 2)
+    path = write_csv(
+        tmp_path,
+        HEADER,
+        'Nairobi,Kenya,Mombasa,Kenya,air,2.50,"{""length"": 1, ""width"": 2, ""height"": 3}"',
+        "Nairobi,Kenya,Mombasa,Kenya,rocket,,",
+        "Kisumu,Kenya,Kampala,Uganda,road,,",
+        ",Kenya,Mombasa,Kenya,sea,,",
+        "Lagos,Nigeria,Accra,Ghana,sea,10,",
+    )
+
+    job = ShipmentImportService.run(db, uuid.uuid4(), user_id, path)
+
+    assert job["status"] == "completed"
+    assert (job["processed_rows"], job["created"], job["rejected"]) == (5, 3, 2)
+    assert [error["row"] for error in job["errors"]] == [3, 5]
+    assert not os.path.exists(path)
+
+    shipments = db.scalars(
+        select(Shipment).where(Shipment.user_id == user_id).order_by(Shipment.origin_city)
+    ).all()
+    assert [shipment.origin_city for shipment in shipments] == ["Kisumu", "Lagos", "Nairobi"]
+    assert all(shipment.status == ShipmentStatus.PENDING for shipment in shipments)
+    assert len({shipment.tracking_number for shipment in shipments}) == 3
+    assert shipments[2].service_type == ServiceType.AIR
+    assert shipments[2].dimensions == {"length": 1, "width": 2, "height": 3}
+    assert shipments[1].weight == 10
+
+
+def test_import_reports_progress_per_chunk(db, user_id, saved_jobs, tmp_path, monkeypatch):
+    """Progress is saved when the job starts and after every chunk."""
+    monkeypatch.setattr(settings, "SHIPMENT_IMPORT_CHUNK_ROWS", 2)
+    path = write_csv(tmp_path, HEADER, *["Nairobi,Kenya,Mombasa,Kenya,air,,"] * 5)
+
+    ShipmentImportService.run(db, uuid.uuid4(), user_id, path)
+
+    assert [job["status"] for job in saved_jobs] == ["running"] * 4 + ["completed"]
+    assert [job["processed_rows"] for job in saved_jobs] == [0, 2, 4, 5, 5]
+    assert [job["created"] for job in saved_jobs] == [0, 2, 4, 5, 5]
+    assert saved_jobs[-1]["finished_at"] is not None
+
+
+def test_import_missing_columns_fails(db, user_id, saved_jobs, tmp_path):
+    """A file without the required columns fails without importing anything."""
+    path = write_csv(tmp_path, "origin_city,destination_city", "Nairobi,Mombasa")
+
+    job = ShipmentImportService.run(db, uuid.uuid4(), user_id, path)
+
+    assert job["status"] == "failed"
+    assert "origin_country" in job["error"]
+    assert db.scalars(select(Shipment).where(Shipment.user_id == user_id)).all() == []
+
+
+def job_state(status, heartbeat):
+    return {
+        "job_id": str(uuid.uuid4()),
+        "status": status,
+        "error": None,
+        "created_at": heartbeat.isoformat(),
+        "heartbeat_at": heartbeat.isoformat(),
+    }
+
+
+def test_stale_jobs_reported_failed():
+    """Unfinished jobs without a recent heartbeat read as failed."""
+    long_ago = datetime.utcnow() - timedelta(seconds=settings.SHIPMENT_IMPORT_STALE_SECONDS + 60)
+
+    assert import_module._checked(job_state("running", long_ago))["status"] == "failed"
+    assert import_module._checked(job_state("queued", long_ago))["error"] == "Import interrupted"
+    assert import_module._checked(job_state("running", datetime.utcnow()))["status"] == "running"
+    assert import_module._checked(job_state("completed", long_ago))["status"] == "completed"
+    assert import_module._checked(None) is None
+
+
+def test_clean_up_stale_jobs(tmp_path, saved_jobs, monkeypatch):
+    """Staged files of interrupted jobs are deleted and their jobs failed."""
+    monkeypatch.setattr(import_module, "STAGING_DIR", tmp_path)
+    long_ago = datetime.utcnow() - timedelta(seconds=settings.SHIPMENT_IMPORT_STALE_SECONDS + 60)
+
+    interrupted = job_state("running", long_ago)
+    jobs = {f"import:shipments:{interrupted['job_id']}": interrupted}
+    monkeypatch.setattr(import_module.redis_service, "get", lambda key: copy.deepcopy(jobs.get(key)))
+
+    stale = tmp_path / f"{interrupted['job_id']}.csv"
+    orphan = tmp_path / f"{uuid.uuid4()}.csv"
+    running = tmp_path / f"{uuid.uuid4()}.csv"
+    for path in (stale, orphan, running):
+        path.write_text(HEADER)
+    old_mtime = time.time() - settings.SHIPMENT_IMPORT_STALE_SECONDS - 60
+    for path in (stale, orphan):
+        os.utime(path, (old_mtime, old_mtime))
+
+    assert ShipmentImportService.clean_up_stale_jobs() == 2
+
+    assert not stale.exists() and not orphan.exists()
+    assert running.exists()
+    assert [(saved["job_id"], saved["status"]) for saved in saved_jobs] == [
+        (interrupted["job_id"], "failed")
+    ]
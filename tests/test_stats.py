@@ -0,0 +1,81 @@
+"""
+Admin system statistics counter tests.
+
+The counters are maintained incrementally by each write path; after every
+kind of write they must agree with a full recount.
+"""
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import pytest
+
+from app.models.shipment import ServiceType, ShipmentStatus
+from app.schemas.shipment import ShipmentCreate, ShipmentUpdate
+from app.schemas.user import UserCreate
+from app.services.archive_service import ArchiveService
+from app.services.shipment_service import ShipmentService
+from app.services.stats_service import StatsService, shipment_contribution
+from app.services.user_service import UserService
+
+NEW_SHIPMENT = ShipmentCreate(
+    origin_city="Nairobi",
+    origin_country="Kenya",
+    destination_city="Mombasa",
+    destination_country="Kenya",
+    service_type=ServiceType.ROAD,
+)
+
+
+def assert_counters_match_recount(db):
+    """The stored counters need no correction and read the same after a recount."""
+    stats = StatsService.get_system_stats(db)
+    assert StatsService.reconcile(db) == {}
+    assert StatsService.get_system_stats(db) == stats
+    return stats
+
+
+@pytest.fixture(scope="function")
+def user_id(db):
+    """A user created through the service, so the user counters are recorded."""
+    user = UserService.create(db, UserCreate(email="stats-test@test.com", password="secret123"))
+    return user.id
+
+
+def test_counters_after_user_writes(db, user_id):
+    """Creating and deactivating users keeps the user counters exact."""
+    stats = assert_counters_match_recount(db)
+    assert stats["users"] == {"total": 1, "active": 1, "new_last_30_days": 1}
+
+    UserService.deactivate(db, user_id)
+    assert assert_counters_match_recount(db)["users"]["active"] == 0
+
+
+def test_counters_after_shipment_writes(db, user_id):
+    """Created, updated, deleted and archived shipments keep the counters exact."""
+    first = ShipmentService.create(db, user_id, NEW_SHIPMENT)
+    second = ShipmentService.create(db, user_id, NEW_SHIPMENT)
+    ShipmentService.create_bulk(db, user_id, [NEW_SHIPMENT.model_dump(mode="json")] * 3)
+    stats = assert_counters_match_recount(db)
+    assert stats["shipments"] == {"total": 5, "active": 5, "delivered": 0}
+
+    ShipmentService.update(db, first.id, ShipmentUpdate(status=ShipmentStatus.IN_TRANSIT))
+    ShipmentService.update(db, first.id, ShipmentUpdate(
+        status=ShipmentStatus.DELIVERED,
+        actual_cost=Decimal("12.50"),
+        actual_delivery=datetime.utcnow() - timedelta(days=10),
+    ))
+    ShipmentService.update(db, second.id, ShipmentUpdate(status=ShipmentStatus.ON_HOLD))
+    stats = assert_counters_match_recount(db)
+    assert stats["shipments"] == {"total": 5, "active": 3, "delivered": 1}
+    assert stats["revenue"]["total"] == 12.50
+
+    # Deletes record the row's contribution as removed
+    StatsService.record(db, shipment_contribution(second), None)
+    db.delete(second)
+    db.commit()
+    stats = assert_counters_match_recount(db)
+    assert stats["shipments"] == {"total": 4, "active": 3, "delivered": 1}
+
+    # Archived shipments keep counting
+    assert ArchiveService.archive_finished(db, older_than_days=1, batch_size=10) == 1
+    assert assert_counters_match_recount(db) == stats
@@ -0,0 +1,73 @@
+"""
+Tracking number generator tests.
+"""
+import re
+
+import pytest
+
+from app.core.config import Settings
+from app.services.tracking_numbers import (
+    FeistelPermutation,
+    TrackingNumberGenerator,
+    TRACKING_NUMBER_BITS,
+)
+
+
+class FakeSequence:
+    """Stands in for the session; returns successive block starts."""
+
+    def __init__(self, block_size):
+        self.block_size = block_size
+        self.calls = 0
+
+    def scalar(self, stmt):
+        start = self.calls * self.block_size
+        self.calls += 1
+        return start
+
+
+def test_permutation_is_invertible():
+    """decrypt undoes encrypt, including at the range edges."""
+    permutation = FeistelPermutation("test-key")
+    for value in [0, 1, 2, 999, 1000, (1 << TRACKING_NUMBER_BITS) - 1]:
+        assert permutation.decrypt(permutation.encrypt(value)) == value
+
+
+def test_permutation_has_no_collisions():
+    """Consecutive sequence values map to distinct, scattered numbers."""
+    permutation = FeistelPermutation("test-key")
+    encrypted = [permutation.encrypt(value) for value in range(50000)]
+    assert len(set(encrypted)) == len(encrypted)
+    assert encrypted != sorted(encrypted)
+
+
+def test_permutation_depends_on_key():
+    """A different key gives a different permutation."""
+    assert FeistelPermutation("key-a").encrypt(42) != FeistelPermutation("key-b").encrypt(42)
+
+
+def test_generator_reserves_blocks():
+    """One sequence round trip per block; numbers are well formed and unique."""
+    db = FakeSequence(block_size=10)
+    generator = TrackingNumberGenerator(FeistelPermutation("test-key"), block_size=10)
+
+    numbers = [generator.next(db) for _ in range(25)]
+
+    assert db.calls == 3
+    assert len(set(numbers)) == 25
+    assert all(re.fullmatch(r"GS[0-9A-F]{12}", number) for number in numbers)
+
+
+def test_tracking_number_key_required_outside_testing(monkeypatch):
+    """Settings refuse to load without a key, except when testing."""
+    monkeypatch.delenv("TRACKING_NUMBER_KEY", raising=False)
+    database_url = "postgresql://localhost/test_db"
+
+    with pytest.raises(ValueError, match="TRACKING_NUMBER_KEY"):
+        Settings(_env_file=None, DATABASE_URL=database_url, ENVIRONMENT="production")
+
+    settings = Settings(
+        _env_file=None, DATABASE_URL=database_url, ENVIRONMENT="production", TRACKING_NUMBER_KEY="key"
+    )
+    assert settings.TRACKING_NUMBER_KEY == "key"
+    assert Settings(_env_file=None, DATABASE_URL=database_url, ENVIRONMENT="testing").TRACKING_NUMBER_KEY